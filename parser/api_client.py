@@ -0,0 +1,520 @@
+"""
+asyncio client for the contents, prompts and tasks APIs.
+
+AsyncApiClient speaks HTTP/1.1 over asyncio streams, so it needs nothing
+outside the standard library. Connections are kept alive and pooled per
+host, at most limit_per_host requests run against a host at once (the rest
+wait their turn), and every connect and read is bounded by a timeout. List
+responses are decoded while they arrive: iter_* methods yield each item as
+soon as its closing brace has been read, without holding the whole body.
+
+    async with AsyncApiClient("http://localhost:3000") as api:
+        async for content in api.contents.iter():
+            ...
+        created = await asyncio.gather(*(api.contents.create(data) for data in documents))
+
+Requires Python 3.7+.
+"""
+import asyncio
+import codecs
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import urlencode, urlsplit
+
+try:
+    from .serializer import dumps
+except ImportError:
+    from serializer import dumps
+
+DEFAULT_LIMIT_PER_HOST = 16
+DEFAULT_TIMEOUT = 30.0
+
+# Bytes read from the socket at a time while streaming a body
+READ_SIZE = 64 * 1024
+
+USER_AGENT = "wordexporter-api-client"
+
+# Methods that can be sent again after the server may already have received them
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Statuses whose responses never have a body, whatever their headers say
+NO_BODY_STATUSES = frozenset({204, 304})
+
+JSONDict = Dict[str, Any]
+
+class ApiError(Exception):
+    """
+    Error response from the API.
+
+    Attributes:
+        status (int): HTTP status
+        message (str): The "message" of the JSON error body, or the raw body
+        body: Decoded error body, if it was JSON
+    """
+
+    def __init__(self, status, message, body=None):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.message = message
+        self.body = body
+
+class JsonArrayDecoder:
+    """
+    Incremental decoder of a JSON array: feed() it bytes as they arrive and
+    it returns the items completed so far.
+
+    An item is only attempted again once a closing bracket has arrived, so
+    a large item is not re-parsed for every chunk.
+    """
+
+    def __init__(self):
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        # "start", "first" (item or "]"), "item", "separator" or "done"
+        self._state = "start"
+        self._waiting = False
+
+    def feed(self, data: bytes, final: bool = False) -> List[Any]:
+        """Adds data and returns the newly completed items. Pass final=True with the last data."""
+        text = self._text.decode(data, final)
+        if self._waiting and not final and "}" not in text and "]" not in text:
+            self._buffer += text
+            return []
+        self._buffer = self._buffer[self._position:] + text
+        self._position = 0
+        self._waiting = False
+        items = []
+        buffer = self._buffer
+        while True:
+            position = self._position
+            while position < len(buffer) and buffer[position] in " \t\r\n":
+                position += 1
+            self._position = position
+            if position == len(buffer):
+                break
+            char = buffer[position]
+            if self._state == "start":
+                if char != "[":
+                    raise ValueError(f"Expected a JSON array, got {char!r}")
+                self._state = "first"
+                self._position += 1
+            elif char == "]" and self._state in ("first", "separator"):
+                self._state = "done"
+                self._position += 1
+            elif self._state == "separator":
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']' in JSON array, got {char!r}")
+                self._state = "item"
+                self._position += 1
+            elif self._state in ("first", "item"):
+                try:
+                    item, end = self._json.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    self._waiting = True
+                    break
+                # A number at the end of the buffer may continue in the next chunk
+                if end == len(buffer) and not final:
+                    break
+                items.append(item)
+                self._state = "separator"
+                self._position = end
+            else:
+                raise ValueError("Data after the end of the JSON array")
+        if final and self._state != "done":
+            raise ValueError("Truncated JSON array")
+        return items
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def usable(self):
+        return not self.reader.at_eof() and not self.writer.is_closing()
+
+    def close(self):
+        self.writer.close()
+
+class _Response:
+    """Status, headers and a body that is read from the connection on demand."""
+
+    def __init__(self, client, connection, method, status, headers):
+        self.client = client
+        self.connection = connection
+        self.method = method
+        self.status = status
+        self.headers = headers
+        # Whether the connection can serve another request once the body is read
+        self.keep_alive = headers.get("connection", "").lower() != "close"
+
+    async def chunks(self):
+        reader = self.connection.reader
+        read = self.client._read
+        if self.method == "HEAD" or self.status in NO_BODY_STATUSES or self.status < 200:
+            # Empty by definition: reading until EOF would wait on a kept-alive connection
+            return
+        if self.headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await read(reader.readline())).split(b";")[0], 16)
+                if size == 0:
+                    # Trailers end with an empty line
+                    while (await read(reader.readline())) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return
+                yield await read(reader.readexactly(size))
+                await read(reader.readline())
+        elif "content-length" in self.headers:
+            remaining = int(self.headers["content-length"])
+            while remaining:
+                chunk = await read(reader.read(min(remaining, READ_SIZE)))
+                if not chunk:
+                    raise ConnectionError("Connection closed before the end of the response")
+                remaining -= len(chunk)
+                yield chunk
+        else:
+            self.keep_alive = False
+            while True:
+                chunk = await read(reader.read(READ_SIZE))
+                if not chunk:
+                    return
+                yield chunk
+
+    async def read(self):
+        return b"".join([chunk async for chunk in self.chunks()])
+
+class AsyncApiClient:
+    """
+    Pooled asyncio HTTP client for the API.
+
+    Args:
+        base_url (str): Server URL, e.g. http://localhost:3000
+        limit_per_host (int): Maximum concurrent requests (and pooled
+            connections) per host
+        timeout (float): Seconds allowed for connecting and for each read
+            from the server
+
+    Attributes:
+        contents (ContentsApi): /api/contents
+        prompts (PromptsApi): /api/prompts
+        tasks (TasksApi): /api/tasks
+    """
+
+    def __init__(self, base_url: str = "http://localhost:3000", limit_per_host: int = DEFAULT_LIMIT_PER_HOST,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        # (scheme, host, port) -> idle connections, and the semaphore limiting requests
+        self._idle = {}
+        self._limits = {}
+        self.contents = ContentsApi(self)
+        self.prompts = PromptsApi(self)
+        self.tasks = TasksApi(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Closes every pooled connection."""
+        for connections in self._idle.values():
+            for connection in connections:
+                connection.close()
+        self._idle.clear()
+
+    async def _read(self, awaitable):
+        return await asyncio.wait_for(awaitable, self.timeout)
+
+    def _limit(self, key):
+        limit = self._limits.get(key)
+        if limit is None:
+            limit = self._limits[key] = asyncio.Semaphore(self.limit_per_host)
+        return limit
+
+    async def _connect(self, key):
+        """Returns (connection, reused): an idle pooled connection or a new one."""
+        idle = self._idle.get(key, [])
+        while idle:
+            connection = idle.pop()
+            if connection.usable():
+                return connection, True
+            connection.close()
+        scheme, host, port = key
+        reader, writer = await self._read(asyncio.open_connection(host, port, ssl=scheme == "https" or None))
+        return _Connection(reader, writer), False
+
+    def _release(self, key, connection, reusable):
+        if reusable and connection.usable():
+            self._idle.setdefault(key, []).append(connection)
+        else:
+            connection.close()
+
+    async def _send(self, connection, method, url, body):
+        await self._write(connection, method, url, body)
+        return await self._read_head(connection, method)
+
+    async def _write(self, connection, method, url, body):
+        target = url.path or "/"
+        if url.query:
+            target += "?" + url.query
+        lines = [
+            f"{method} {target} HTTP/1.1",
+            f"Host: {url.netloc}",
+            f"User-Agent: {USER_AGENT}",
+            "Accept: application/json",
+            "Connection: keep-alive",
+        ]
+        if body is not None:
+            lines.append("Content-Type: application/json; charset=utf-8")
+            lines.append(f"Content-Length: {len(body)}")
+        connection.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b""))
+        await self._read(connection.writer.drain())
+
+    async def _read_head(self, connection, method):
+        reader = connection.reader
+        status_line = await self._read(reader.readline())
+        if not status_line:
+            raise ConnectionResetError("Connection closed by the server")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self._read(reader.readline())
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return _Response(self, connection, method, status, headers)
+
+    def _url(self, path, params):
+        url = self.base_url + path
+        params = {name: value for name, value in (params or {}).items() if value is not None}
+        if params:
+            url += "?" + urlencode(params)
+        return urlsplit(url)
+
+    @asynccontextmanager
+    async def _stream(self, method, path, params=None, payload=None):
+        """
+        Sends a request and returns its response for a with block, holding
+        the connection and a slot of the host's limit until the block ends.
+        """
+        url = self._url(path, params)
+        key = (url.scheme, url.hostname, url.port or (443 if url.scheme == "https" else 80))
+        body = dumps(payload, compact=True).encode("utf-8") if payload is not None else None
+        async with self._limit(key):
+            connection, reused = await self._connect(key)
+            written = False
+            try:
+                await self._write(connection, method, url, body)
+                written = True
+                response = await self._read_head(connection, method)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                connection.close()
+                # Once written, a POST or PATCH may have been applied before the
+                # connection dropped, so only idempotent requests are resent
+                if not reused or (written and method not in IDEMPOTENT_METHODS):
+                    raise
+                # The server closed an idle keep-alive connection: retry once on a new one
+                connection, _ = await self._connect(key)
+                response = await self._send(connection, method, url, body)
+            except BaseException:
+                connection.close()
+                raise
+            done = False
+            try:
+                yield response
+                done = True
+            finally:
+                self._release(key, connection, done and response.keep_alive)
+
+    async def _error(self, response):
+        body = await response.read()
+        try:
+            decoded = json.loads(body)
+        except ValueError:
+            return ApiError(response.status, body.decode("utf-8", "replace")[:200])
+        message = decoded.get("message", "") if isinstance(decoded, dict) else str(decoded)
+        return ApiError(response.status, message, decoded)
+
+    async def request(self, method: str, path: str, params: Optional[JSONDict] = None,
+                      payload: Any = None) -> Any:
+        """
+        Sends one request and returns its decoded JSON body (None if empty).
+
+        Args:
+            method (str): HTTP method
+            path (str): Path under base_url, e.g. /api/contents
+            params (dict): Query parameters; None values are left out
+            payload: JSON-compatible request body
+
+        Raises:
+            ApiError: On a 4xx/5xx response
+        """
+        async with self._stream(method, path, params, payload) as response:
+            if response.status >= 400:
+                raise await self._error(response)
+            body = await response.read()
+        return json.loads(body) if body.strip() else None
+
+    async def iter_list(self, path: str, params: Optional[JSONDict] = None) -> AsyncIterator[Any]:
+        """
+        GETs a list endpoint and yields its items while the response is
+        still arriving. The connection is held until the iterator is
+        exhausted or closed; when stopping early, close it (e.g. with
+        contextlib.aclosing) to return the connection right away.
+
+        Raises:
+            ApiError: On a 4xx/5xx response
+        """
+        async with self._stream("GET", path, params) as response:
+            if response.status >= 400:
+                raise await self._error(response)
+            decoder = JsonArrayDecoder()
+            async for chunk in response.chunks():
+                for item in decoder.feed(chunk):
+                    yield item
+            for item in decoder.feed(b"", final=True):
+                yield item
+
+    async def get_list(self, path: str, params: Optional[JSONDict] = None) -> List[Any]:
+        """Like iter_list, but returns every item in a list."""
+        return [item async for item in self.iter_list(path, params)]
+
+class ContentsApi:
+    """Calls to /api/contents."""
+
+    path = "/api/contents"
+
+    def __init__(self, client: AsyncApiClient):
+        self.client = client
+
+    def iter(self, published: Optional[bool] = None, updated_since: Optional[str] = None) -> AsyncIterator[JSONDict]:
+        """
+        Yields every content, newest first, as it is decoded.
+
+        Args:
+            published (bool): Only contents published in some language (True)
+                or in none (False)
+            updated_since (str): ISO date; only contents saved since then
+        """
+        params = {"updatedSince": updated_since}
+        if published is not None:
+            params["published"] = "true" if published else "false"
+        return self.client.iter_list(self.path, params)
+
+    async def list(self, published: Optional[bool] = None, updated_since: Optional[str] = None) -> List[JSONDict]:
+        """Returns every content; see iter()."""
+        return [content async for content in self.iter(published, updated_since)]
+
+    async def get(self, content_id: str) -> JSONDict:
+        return await self.client.request("GET", f"{self.path}/{content_id}")
+
+    async def create(self, data: JSONDict) -> JSONDict:
+        """Creates a content from a payload such as build_create_payload(parsed_data)."""
+        return await self.client.request("POST", self.path, payload=data)
+
+    async def update(self, content_id: str, data: JSONDict) -> JSONDict:
+        """Replaces the fields present in data, e.g. build_update_payload(parsed_data)."""
+        return await self.client.request("PUT", f"{self.path}/{content_id}", payload=data)
+
+    async def patch(self, content_id: str, fields: JSONDict) -> JSONDict:
+        """
+        Updates only the given fields: publication fields (publishedEs/En,
+        publishedDateEs/En, statusEs/En), the title, the text fields and tags.
+        """
+        return await self.client.request("PATCH", f"{self.path}/{content_id}", payload=fields)
+
+    async def delete(self, content_id: str) -> JSONDict:
+        return await self.client.request("DELETE", f"{self.path}/{content_id}")
+
+    async def search(self, query: str) -> List[JSONDict]:
+        """Server-side search of titles, tags and descriptions (at most 100 results)."""
+        return await self.client.get_list(f"{self.path}/search", {"q": query})
+
+    async def kanban(self) -> List[JSONDict]:
+        """Returns the contents as kanban tasks ({"id", "title", "status", ...})."""
+        return await self.client.get_list(f"{self.path}/kanban")
+
+    async def move_kanban(self, content_id: str, status: str) -> JSONDict:
+        """Moves a content to a kanban column: draft, castellano, ingles or finalizado."""
+        return await self.client.request("PUT", f"{self.path}/kanban/{content_id}", payload={"status": status})
+
+    async def remove_kanban(self, content_id: str) -> JSONDict:
+        """Takes a content off the board by returning it to draft; the content is kept."""
+        return await self.client.request("DELETE", f"{self.path}/kanban/{content_id}")
+
+class PromptsApi:
+    """Calls to /api/prompts."""
+
+    path = "/api/prompts"
+
+    def __init__(self, client: AsyncApiClient):
+        self.client = client
+
+    def iter(self, search: Optional[str] = None, tag: Optional[str] = None,
+             sort: Optional[str] = None) -> AsyncIterator[JSONDict]:
+        """
+        Yields prompts as they are decoded.
+
+        Args:
+            search (str): Text search
+            tag (str): Only prompts with this tag
+            sort (str): "title" or "updated" (default: newest first)
+        """
+        return self.client.iter_list(self.path, {"search": search, "tag": tag, "sort": sort})
+
+    async def list(self, search: Optional[str] = None, tag: Optional[str] = None,
+                   sort: Optional[str] = None) -> List[JSONDict]:
+        return [prompt async for prompt in self.iter(search, tag, sort)]
+
+    async def get(self, prompt_id: str) -> JSONDict:
+        return await self.client.request("GET", f"{self.path}/{prompt_id}")
+
+    async def create(self, data: JSONDict) -> JSONDict:
+        """Creates a prompt from {"title", "body", "description", "tags"}."""
+        return await self.client.request("POST", self.path, payload=data)
+
+    async def update(self, prompt_id: str, data: JSONDict) -> JSONDict:
+        return await self.client.request("PUT", f"{self.path}/{prompt_id}", payload=data)
+
+    async def delete(self, prompt_id: str) -> JSONDict:
+        return await self.client.request("DELETE", f"{self.path}/{prompt_id}")
+
+class TasksApi:
+    """Calls to /api/tasks."""
+
+    path = "/api/tasks"
+
+    def __init__(self, client: AsyncApiClient):
+        self.client = client
+
+    def iter(self) -> AsyncIterator[JSONDict]:
+        """Yields every task, newest first, as it is decoded."""
+        return self.client.iter_list(self.path)
+
+    async def list(self) -> List[JSONDict]:
+        return [task async for task in self.iter()]
+
+    async def get(self, task_id: str) -> JSONDict:
+        return await self.client.request("GET", f"{self.path}/{task_id}")
+
+    async def create(self, data: JSONDict) -> JSONDict:
+        """Creates a task; data needs the "contentId" it belongs to."""
+        return await self.client.request("POST", self.path, payload=data)
+
+    async def update(self, task_id: str, data: JSONDict) -> JSONDict:
+        return await self.client.request("PUT", f"{self.path}/{task_id}", payload=data)
+
+    async def set_status(self, task_id: str, status: str) -> JSONDict:
+        """Sets the status of a task: draft, in-progress or done."""
+        return await self.client.request("PATCH", f"{self.path}/{task_id}", payload={"status": status})
+
+    async def delete(self, task_id: str) -> JSONDict:
+        return await self.client.request("DELETE", f"{self.path}/{task_id}")
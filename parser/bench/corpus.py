@@ -0,0 +1,183 @@
+"""
+Deterministic generator of synthetic bilingual documents for benchmarks.
+
+The same (format, size, sections, seed) always produces the same text, so
+benchmark runs on different machines or commits parse identical input.
+"""
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+SPANISH_WORDS = (
+    "inteligencia artificial tecnología programación código análisis futuro "
+    "empresa anuncio vídeo canal comentario suscríbete educación creatividad "
+    "herramienta práctica modelo datos rendimiento revolución pregunta opinión "
+    "cómo qué por qué también además sin embargo nuestra nuestras humanidad"
+).split()
+
+ENGLISH_WORDS = (
+    "artificial intelligence technology programming code analysis future "
+    "company advert video channel comment subscribe education creativity "
+    "practical tool model data performance revolution question opinion "
+    "how what why also however without our humanity share thoughts"
+).split()
+
+HASHTAGS_ES = ["#InteligenciaArtificial", "#OpenAI", "#Tecnología", "#Programación", "#Futuro"]
+HASHTAGS_EN = ["#ArtificialIntelligence", "#OpenAI", "#Technology", "#Programming", "#Future"]
+
+# (numbered-format title, language) for each kind of section, in document order
+NUMBERED_SECTIONS = [
+    ("Script de Teleprompter (Español)", "es"),
+    ("Script de Teleprompter (Inglés)", "en"),
+    ("Título Atractivo (SEO)", "title"),
+    ("Descripción para YouTube (Español)", "es"),
+    ("Descripción para YouTube (Inglés)", "en"),
+    ("Lista de Tags (Español)", "tags_es"),
+    ("Lista de Tags (Inglés)", "tags_en"),
+    ("Comentario Pineado (Español)", "es"),
+    ("Comentario Pineado (Inglés)", "en"),
+    ("Descripción para TikTok (Español)", "es"),
+    ("Descripción para TikTok (Inglés)", "en"),
+    ("Post para X (Español)", "es"),
+    ("Post para X (Inglés)", "en"),
+    ("Descripción para Facebook (Español)", "es"),
+    ("Descripción para Facebook (Inglés)", "en"),
+]
+
+# Original-format headers; each section carries both languages
+ORIGINAL_SECTIONS = [
+    "Teleprompter",
+    "Descripción optimizada para SEO",
+    "Lista de tags",
+    "Comentario para pinear",
+    "Descripción simplificada para TikTok",
+    "Descripción para X",
+    "Descripción para Facebook",
+]
+
+FORMATS = ("numbered", "original")
+
+def sentence(rng, words, hashtags):
+    """Returns one sentence of 8-20 words, sometimes ending in hashtags."""
+    text = " ".join(rng.choice(words) for _ in range(rng.randint(8, 20)))
+    text = text[0].upper() + text[1:] + "."
+    if rng.random() < 0.2:
+        text += " " + " ".join(rng.sample(hashtags, 2))
+    return text
+
+def paragraph(rng, language, size):
+    """Returns lines of text in language totalling roughly size characters."""
+    words, hashtags = (SPANISH_WORDS, HASHTAGS_ES) if language == "es" else (ENGLISH_WORDS, HASHTAGS_EN)
+    lines = []
+    total = 0
+    while total < size or not lines:
+        line = " ".join(sentence(rng, words, hashtags) for _ in range(rng.randint(1, 4)))
+        lines.append(line)
+        total += len(line) + 1
+    return lines
+
+def tag_list(rng, language, size):
+    """Returns a comma-separated tag line of roughly size characters."""
+    words = SPANISH_WORDS if language == "es" else ENGLISH_WORDS
+    tags = []
+    total = 0
+    while total < size or not tags:
+        tag = " ".join(rng.sample(words, rng.randint(1, 3)))
+        tags.append(tag)
+        total += len(tag) + 2
+    return [", ".join(tags)]
+
+def generate_document(document_format="numbered", size=16 * 1024, sections=15, seed=0):
+    """
+    Generates a synthetic document.
+
+    Args:
+        document_format (str): "numbered" or "original"
+        size (int): Approximate size in characters
+        sections (int): Number of sections; section kinds repeat if it exceeds
+            the number of distinct kinds
+        seed (int): Random seed
+
+    Returns:
+        str: The document text
+    """
+    if document_format not in FORMATS:
+        raise ValueError(f"Unknown format: {document_format}")
+    rng = random.Random(f"{document_format}:{size}:{sections}:{seed}")
+    section_size = max(1, size // max(1, sections))
+    out = []
+
+    if document_format == "numbered":
+        for number in range(sections):
+            title, kind = NUMBERED_SECTIONS[number % len(NUMBERED_SECTIONS)]
+            out.append(f"{number + 1}. {title}")
+            if kind == "title":
+                out.append("Español: " + sentence(rng, SPANISH_WORDS, HASHTAGS_ES))
+                out.append("Inglés: " + sentence(rng, ENGLISH_WORDS, HASHTAGS_EN))
+            elif kind.startswith("tags_"):
+                out.extend(tag_list(rng, kind[-2:], section_size))
+            else:
+                out.extend(paragraph(rng, kind, section_size))
+            out.append("")
+    else:
+        out.append(sentence(rng, SPANISH_WORDS, HASHTAGS_ES))
+        for number in range(sections):
+            header = ORIGINAL_SECTIONS[number % len(ORIGINAL_SECTIONS)]
+            out.append(header)
+            for marker, language in (("Español:", "es"), ("Ingles:", "en")):
+                out.append(marker)
+                if header == "Lista de tags":
+                    out.extend(tag_list(rng, language, section_size // 2))
+                else:
+                    out.extend(paragraph(rng, language, section_size // 2))
+            out.append("")
+
+    return "\n".join(out)
+
+def generate_corpus(count, document_format="numbered", size=16 * 1024, sections=15, seed=0):
+    """Returns count distinct documents generated with consecutive seeds."""
+    return [generate_document(document_format, size, sections, seed + n) for n in range(count)]
+
+# Minimal package parts for a .docx that Word opens
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+def docx_paragraph(line):
+    """Returns the w:p XML of one line, split into runs the way Word often stores text."""
+    if not line:
+        return "<w:p/>"
+    words = line.split(" ")
+    half = len(words) // 2
+    runs = [" ".join(words[:half]) + (" " if half else ""), " ".join(words[half:])]
+    return "<w:p>" + "".join(
+        f'<w:r><w:t xml:space="preserve">{escape(run)}</w:t></w:r>' for run in runs if run
+    ) + "</w:p>"
+
+def write_docx(path, text):
+    """Writes text to a .docx file at path, one paragraph per line."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", DOCX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", DOCX_RELS)
+        with archive.open("word/document.xml", "w") as document:
+            document.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+            )
+            for line in text.split("\n"):
+                document.write(docx_paragraph(line).encode("utf-8"))
+            document.write(b"<w:sectPr/></w:body></w:document>")
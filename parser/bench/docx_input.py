@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark of .docx input: streaming paragraphs into the parser versus
+extracting the whole text first.
+
+"extract-first" reads word/document.xml into a full ElementTree, joins the
+paragraph texts and parses the resulting string, as a copy-paste or
+text-export step would. "streaming" is docx_reader.parse_docx. Both must
+produce the same parsed data; the benchmark reports time and peak memory
+for documents of 100+ pages.
+
+Run from the repository root:
+    python -m parser.bench.docx_input
+    python -m parser.bench.docx_input --pages 400 --repeat 5
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import zipfile
+import xml.etree.ElementTree as ET
+
+from parser.bench.corpus import generate_document, write_docx
+from parser.docx_reader import DOCUMENT_PART, PARAGRAPH, paragraph_text, parse_docx
+from parser.wordexporter import parse_word_text
+
+KB = 1024
+
+# Characters of text on a typical page of a Word document
+PAGE_CHARS = 3000
+
+def extract_then_parse(path):
+    with zipfile.ZipFile(path) as archive:
+        root = ET.fromstring(archive.read(DOCUMENT_PART))
+    text = "\n".join(paragraph_text(paragraph) for paragraph in root.iter(PARAGRAPH))
+    return parse_word_text(text)
+
+def measure(function, path, repeat):
+    """Returns (best seconds, peak traced bytes, result) of function(path)."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(path)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    tracemalloc.start()
+    function(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming .docx parsing against extracting text first")
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 250, 500],
+                        help="Document sizes in pages (default: 100 250 500)")
+    parser.add_argument("--format", choices=["numbered", "original"], default="numbered",
+                        help="Document format (default: numbered)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per size; the best is kept (default: 3)")
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'docx KB':>9} {'method':<14} {'seconds':>9} {'peak KB':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for pages in args.pages:
+            path = os.path.join(directory, f"{pages}.docx")
+            write_docx(path, generate_document(args.format, pages * PAGE_CHARS, sections=15))
+            size = os.path.getsize(path) / KB
+            results = []
+            for name, function in (("extract-first", extract_then_parse), ("streaming", parse_docx)):
+                seconds, peak, result = measure(function, path, args.repeat)
+                results.append(result)
+                print(f"{pages:>6} {size:>9.0f} {name:<14} {seconds:>9.3f} {peak / KB:>10.0f}")
+            if results[0] != results[1]:
+                raise SystemExit(f"Parsed data differs between methods for {pages} pages")
+
+if __name__ == "__main__":
+    main()
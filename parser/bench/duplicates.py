@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the near-duplicate index.
+
+Indexes N generated documents, then looks up lightly edited copies of a
+sample of them, both through DuplicateIndex.query and by scoring every
+indexed signature (a linear scan). Reports build time per document, query
+time per lookup for both, and the share of copies whose original was found.
+
+Run from the repository root:
+    python -m parser.bench.duplicates
+    python -m parser.bench.duplicates --documents 1000 20000 --size 4096
+"""
+import argparse
+import time
+
+from parser.bench.corpus import generate_document
+from parser.duplicate_index import DEFAULT_THRESHOLD, DuplicateIndex, document_signature, estimate_similarity
+from parser.wordexporter import parse_word_text
+
+# Lookups timed per index size
+QUERIES = 200
+
+def edited_copy(data, every=50):
+    """Returns data with every n-th word of the teleprompter scripts replaced."""
+    copy = dict(data)
+    for field in ("teleprompterEs", "teleprompterEn"):
+        words = data[field].split(" ")
+        for index in range(0, len(words), every):
+            words[index] = "editado"
+        copy[field] = " ".join(words)
+    return copy
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MinHash/LSH near-duplicate index")
+    parser.add_argument("--documents", type=int, nargs="+", default=[1000, 10000],
+                        help="Indexed documents (default: 1000 10000)")
+    parser.add_argument("--size", type=int, default=2048,
+                        help="Approximate size of each document in characters (default: 2048)")
+    args = parser.parse_args()
+
+    print(f"{'documents':>10} {'build ms/doc':>13} {'query ms':>9} {'scan ms':>9} {'found':>7}")
+    for count in args.documents:
+        documents = [parse_word_text(generate_document("numbered", args.size, seed=n)) for n in range(count)]
+        start = time.perf_counter()
+        index = DuplicateIndex()
+        for n, data in enumerate(documents):
+            index.add(n, data)
+        build = time.perf_counter() - start
+
+        step = max(1, count // QUERIES)
+        copies = [(n, document_signature(edited_copy(documents[n]))) for n in range(0, count, step)]
+        start = time.perf_counter()
+        found = sum(
+            any(match["key"] == n for match in index.query(None, signature=signature))
+            for n, signature in copies
+        )
+        query = time.perf_counter() - start
+
+        signatures = [document_signature(data) for data in documents]
+        start = time.perf_counter()
+        for _, signature in copies:
+            [other for other in signatures if estimate_similarity(signature, other) >= DEFAULT_THRESHOLD]
+        scan = time.perf_counter() - start
+
+        print(f"{count:>10} {build / count * 1000:>13.3f} {query / len(copies) * 1000:>9.3f} "
+              f"{scan / len(copies) * 1000:>9.3f} {found / len(copies):>7.1%}")
+
+if __name__ == "__main__":
+    main()
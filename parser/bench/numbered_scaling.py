@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Regression benchmark: parse_numbered_format must scale linearly with input size.
+
+Builds numbered-format documents from 1 KB up to 50 MB, where most of the
+bytes go into a single long teleprompter section, and reports the parse
+time per megabyte. Exits with status 1 if the cost per byte at the largest
+size is more than --max-ratio times the cost at the reference size.
+
+Run from the repository root:
+    python -m parser.bench.numbered_scaling
+"""
+import argparse
+import sys
+import time
+
+from parser.wordexporter import parse_word_text
+
+KB = 1024
+MB = 1024 * KB
+
+SIZES = [1 * KB, 16 * KB, 256 * KB, 1 * MB, 5 * MB, 20 * MB, 50 * MB]
+
+SCRIPT_LINE = "Esta es una línea del guion de prueba para medir el rendimiento del parser."
+
+def build_numbered_document(size):
+    """Returns a numbered-format document of roughly `size` bytes."""
+    header = "1. Script de Teleprompter (Español)\n"
+    footer = (
+        "\n\n2. Título Atractivo (SEO)\n"
+        "Español: Prueba de rendimiento\n"
+        "Inglés: Performance test\n"
+        "\n3. Descripción para YouTube (Inglés)\n"
+        "A short description.\n"
+    )
+    line_bytes = len((SCRIPT_LINE + "\n").encode("utf-8"))
+    line_count = max(1, (size - len(header) - len(footer)) // line_bytes)
+    return header + "\n".join([SCRIPT_LINE] * line_count) + footer
+
+def time_parse(text, repeat):
+    """Returns the best wall time of `repeat` parses of text."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_word_text(text)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the numbered parser scales linearly")
+    parser.add_argument(
+        "--max-size", type=int, default=50 * MB,
+        help="Largest document size in bytes (default: 50 MB)"
+    )
+    parser.add_argument(
+        "--max-ratio", type=float, default=3.0,
+        help="Allowed growth of the per-byte cost between the reference and largest size"
+    )
+    args = parser.parse_args()
+
+    sizes = [size for size in SIZES if size <= args.max_size]
+    reference_size = min(sizes, key=lambda size: abs(size - 256 * KB))
+
+    print(f"{'size':>10} {'seconds':>10} {'MB/s':>10} {'us/KB':>10}")
+    per_kb = {}
+    for size in sizes:
+        text = build_numbered_document(size)
+        actual = len(text.encode("utf-8"))
+        # Small inputs are noisy, so take the best of several runs
+        repeat = 20 if actual < MB else 3
+        seconds = time_parse(text, repeat)
+        per_kb[size] = seconds * 1e6 / (actual / KB)
+        print(f"{actual:>10} {seconds:>10.4f} {actual / MB / seconds:>10.1f} {per_kb[size]:>10.2f}")
+
+    ratio = per_kb[sizes[-1]] / per_kb[reference_size]
+    print(f"\nPer-byte cost ratio (largest / reference): {ratio:.2f}")
+    if ratio > args.max_ratio:
+        print(f"FAIL: parse time grows faster than linearly (ratio > {args.max_ratio})")
+        sys.exit(1)
+    print("OK: parse time scales linearly with input size")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Parser benchmark suite.
+
+Times the parser entry points and payload generation on a deterministic
+synthetic corpus (see corpus.py) and reports throughput and peak memory.
+Results can be saved as a baseline JSON and compared on later runs.
+
+Run from the repository root:
+    python -m parser.bench.run
+    python -m parser.bench.run --save-baseline parser/bench/baseline.json
+    python -m parser.bench.run --baseline parser/bench/baseline.json --fail-on-regression
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from parser.bench.corpus import generate_corpus
+from parser.content import ParsedContent
+from parser.wordexporter import (
+    empty_parsed_data, extract_tags, generate_curl_command, generate_update_curl_command,
+    build_create_payload, parse_content, parse_numbered_format, parse_original_format, parse_word_text,
+)
+
+KB = 1024
+
+API_URL = "http://localhost:3000/api/contents"
+
+def payload_json(parsed):
+    return json.dumps(build_create_payload(parsed), ensure_ascii=False)
+
+def content_payload_json(content):
+    return json.dumps(content.to_payload("create"), ensure_ascii=False)
+
+def curl_commands(parsed):
+    generate_curl_command(parsed, API_URL)
+    generate_update_curl_command(parsed, API_URL, "64a7c2e5f1b5e3d2c1a9b8f7")
+
+def build_benchmarks(docs):
+    """
+    Returns (name, function, inputs) triples. Each function takes one input;
+    the inputs' total size in bytes is what MB/s is measured against.
+    """
+    numbered = docs["numbered"]
+    original = docs["original"]
+    parsed = [parse_word_text(text) for text in numbered + original]
+    contents = [parse_content(text) for text in numbered + original]
+    descriptions = [
+        data["videoDescriptionEs"] + "\n" + data["videoDescriptionEn"] for data in parsed
+    ]
+    return [
+        ("parse_word_text[numbered]", parse_word_text, numbered),
+        ("parse_word_text[original]", parse_word_text, original),
+        ("parse_numbered_format", lambda text: parse_numbered_format(text, empty_parsed_data()), numbered),
+        ("parse_original_format", lambda text: parse_original_format(text, empty_parsed_data()), original),
+        ("extract_tags", extract_tags, descriptions),
+        ("payload_json", payload_json, parsed),
+        ("payload_json[ParsedContent]", content_payload_json, contents),
+        ("curl_commands", curl_commands, parsed),
+    ]
+
+def input_bytes(item):
+    if isinstance(item, str):
+        return len(item.encode("utf-8"))
+    if isinstance(item, ParsedContent):
+        item = item.to_dict()
+    return len(json.dumps(item, ensure_ascii=False).encode("utf-8"))
+
+def run_benchmark(function, inputs, repeat):
+    """Returns the best total seconds over repeat passes and the peak traced memory."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in inputs:
+            function(item)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+
+    # Memory is measured on a separate pass, since tracing slows everything down
+    tracemalloc.start()
+    for item in inputs:
+        function(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+def compare(results, baseline, tolerance):
+    """Prints throughput relative to baseline and returns the names that regressed."""
+    regressions = []
+    print(f"\n{'benchmark':<28} {'MB/s':>9} {'baseline':>9} {'change':>8}")
+    for name, result in results.items():
+        reference = baseline.get("results", {}).get(name)
+        if not reference:
+            print(f"{name:<28} {result['mb_per_s']:>9.2f} {'-':>9} {'new':>8}")
+            continue
+        change = result["mb_per_s"] / reference["mb_per_s"] - 1
+        flag = ""
+        if change < -tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<28} {result['mb_per_s']:>9.2f} {reference['mb_per_s']:>9.2f} {change:>+7.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the wordexporter parser")
+    parser.add_argument("--docs", type=int, default=20, help="Documents per format (default: 20)")
+    parser.add_argument("--size", type=int, default=64 * KB, help="Approximate bytes per document (default: 64 KB)")
+    parser.add_argument("--sections", type=int, default=15, help="Sections per document (default: 15)")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed (default: 0)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed passes per benchmark; the best is kept (default: 5)")
+    parser.add_argument("--only", help="Run only benchmarks whose name contains this text")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", help="Write the results to this baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed throughput drop versus the baseline (default: 0.25)")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Exit with status 1 if any benchmark regressed beyond --tolerance")
+    args = parser.parse_args()
+
+    docs = {
+        document_format: generate_corpus(args.docs, document_format, args.size, args.sections, args.seed)
+        for document_format in ("numbered", "original")
+    }
+
+    results = {}
+    print(f"{'benchmark':<28} {'docs/s':>10} {'MB/s':>9} {'peak KB':>10}")
+    for name, function, inputs in build_benchmarks(docs):
+        if args.only and args.only not in name:
+            continue
+        seconds, peak = run_benchmark(function, inputs, args.repeat)
+        size = sum(input_bytes(item) for item in inputs)
+        results[name] = {
+            "docs_per_s": round(len(inputs) / seconds, 2),
+            "mb_per_s": round(size / (1024 * KB) / seconds, 3),
+            "peak_kb": round(peak / KB, 1),
+        }
+        print(f"{name:<28} {results[name]['docs_per_s']:>10.1f} {results[name]['mb_per_s']:>9.2f} "
+              f"{results[name]['peak_kb']:>10.1f}")
+
+    report = {
+        "config": {key: getattr(args, key) for key in ("docs", "size", "sections", "seed")},
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != report["config"]:
+            print("\nWarning: baseline was recorded with a different corpus configuration", file=sys.stderr)
+        regressions = compare(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if regressions and args.fail_on_regression:
+        print(f"\nRegressed: {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
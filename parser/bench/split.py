@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark of document boundary detection in concatenated exports.
+
+Builds exports of N documents, alternating runs of numbered and original
+documents, and times splitter.document_spans on the text in memory ("str")
+and on the file through a memory map ("mmap"). The number of documents
+found must equal N. Throughput is reported in MB of export per second.
+
+Run from the repository root:
+    python -m parser.bench.split
+    python -m parser.bench.split --documents 100 2000 --size 32768
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from parser.bench.corpus import generate_document
+from parser.splitter import document_spans, file_document_spans
+
+MB = 1024 * 1024
+
+# Consecutive documents of the same format before switching to the other
+RUN_LENGTH = 10
+
+def build_export(count, size):
+    """Returns the text of an export of count documents of about size characters each."""
+    documents = []
+    for n in range(count):
+        if (n // RUN_LENGTH) % 2 == 0:
+            documents.append(generate_document("numbered", size, sections=15, seed=n))
+        else:
+            # Original documents have one section of each kind, as exported
+            documents.append(generate_document("original", size, sections=7, seed=n))
+    return "\n\n".join(documents)
+
+def best_time(function, argument, repeat):
+    """Returns (best seconds, result) of function(argument)."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(argument)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark document boundary detection in concatenated exports")
+    parser.add_argument("--documents", type=int, nargs="+", default=[100, 1000],
+                        help="Documents per export (default: 100 1000)")
+    parser.add_argument("--size", type=int, default=16 * 1024,
+                        help="Approximate size of each document in characters (default: 16384)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per export; the best is kept (default: 3)")
+    args = parser.parse_args()
+
+    print(f"{'documents':>10} {'MB':>8} {'source':<6} {'seconds':>9} {'MB/s':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.documents:
+            text = build_export(count, args.size)
+            path = os.path.join(directory, f"{count}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            size = os.path.getsize(path) / MB
+            for source, function, argument in (("str", document_spans, text), ("mmap", file_document_spans, path)):
+                seconds, spans = best_time(function, argument, args.repeat)
+                if len(spans) != count:
+                    raise SystemExit(f"{source}: found {len(spans)} documents in an export of {count}")
+                print(f"{count:>10} {size:>8.1f} {source:<6} {seconds:>9.4f} {size / seconds:>8.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,431 @@
 Command-line interface for the wordexporter parser.
 """
 import argparse
-import json
+import functools
+import glob
+import os
 import sys
-from wordexporter import parse_word_text, generate_curl_command, generate_update_curl_command
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from wordexporter import parse_word_text, build_create_payload, build_update_payload
+from parse_cache import ParseCache
+from language import format_warnings, language_warnings
+from serializer import dumps, write_curl_command
+from docx_reader import is_docx, parse_docx, read_docx_text
+from mmap_reader import parse_text_file
+from output import DEFAULT_FLUSH_EVERY, FORMATS, duplicate_label, make_writer, open_output, record_label
+from splitter import file_document_spans, read_span
+from duplicate_index import DEFAULT_THRESHOLD as DEFAULT_DUPLICATE_THRESHOLD, DuplicateIndex, document_signature
+from profiling import Profile, format_profile, profiling, stage
+
+# Parse cache used by parse_file; set up once per process by init_worker
+worker_cache = None
+
+def report_language(parsed_data, label=None):
+    """Prints lines that look filed under the wrong language to stderr."""
+    warnings = language_warnings(parsed_data)
+    if warnings:
+        print(format_warnings(warnings, label), file=sys.stderr)
+
+def open_cache(cache_dir):
+    """Opens the parse cache, or returns None with a warning if it is unusable."""
+    try:
+        return ParseCache(cache_dir)
+    except OSError as e:
+        print(f"Warning: parse cache disabled: {e}", file=sys.stderr)
+        return None
+
+def init_worker(use_cache, cache_dir):
+    global worker_cache
+    worker_cache = open_cache(cache_dir) if use_cache else None
+
+def collect_batch_files(batch):
+    """
+    Resolves the --batch argument to a sorted list of input files.
+
+    A directory expands to the .txt and .docx files it contains; anything
+    else is treated as a glob pattern.
+    """
+    if os.path.isdir(batch):
+        paths = glob.glob(os.path.join(batch, "*.txt")) + glob.glob(os.path.join(batch, "*.docx"))
+    else:
+        paths = glob.glob(batch)
+    return sorted(path for path in paths if os.path.isfile(path))
+
+def read_input_file(path):
+    """Returns the text of a .txt file, or of a .docx file one paragraph per line."""
+    if is_docx(path):
+        return read_docx_text(path)
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        return f.read()
+
+def parse_file(path):
+    """
+    Reads and parses one input file. Runs in a worker process during batch mode.
+
+    Returns:
+        tuple: (record, cached). record is {"file": path, "data": parsed_data}
+        on success, or {"file": path, "error": message} if the file could not
+        be read or parsed. cached is True for a cache hit, False for a miss
+        and None when the cache is disabled.
+    """
+    try:
+        if worker_cache is None:
+            # Without the cache the file need not be read whole: .docx
+            # paragraphs stream from the zip, large text files are mapped
+            parse = parse_docx if is_docx(path) else parse_text_file
+            return {"file": path, "data": parse(path)}, None
+        with stage("read"):
+            text = read_input_file(path)
+        hits = worker_cache.hits
+        data = worker_cache.parse(text)
+        return {"file": path, "data": data}, worker_cache.hits > hits
+    except Exception as e:
+        return {"file": path, "error": f"{type(e).__name__}: {e}"}, None
+
+def split_batch_files(paths):
+    """
+    Splits each text file into the documents it contains, for --split.
+
+    Returns:
+        list: (path, number, start, end) tasks, one per document, numbered
+        from 1 within each file. A .docx file, or a file that cannot be
+        scanned, becomes a single (path, None, None, None) task.
+    """
+    tasks = []
+    for path in paths:
+        try:
+            spans = [] if is_docx(path) else file_document_spans(path)
+        except (OSError, UnicodeDecodeError):
+            # parse_file reports the error for the whole file
+            spans = []
+        if not spans:
+            tasks.append((path, None, None, None))
+            continue
+        for number, (start, end) in enumerate(spans, 1):
+            tasks.append((path, number, start, end))
+    return tasks
+
+def parse_document(task):
+    """
+    Reads and parses one document of a split file. Runs in a worker process
+    during batch mode with --split.
+
+    Returns:
+        tuple: (record, cached) as parse_file returns them, with the
+        document's number in the record
+    """
+    path, number, start, end = task
+    if number is None:
+        return parse_file(path)
+    try:
+        with stage("read"):
+            text = read_span(path, start, end)
+        if worker_cache is None:
+            return {"file": path, "document": number, "data": parse_word_text(text)}, None
+        hits = worker_cache.hits
+        data = worker_cache.parse(text)
+        return {"file": path, "document": number, "data": data}, worker_cache.hits > hits
+    except Exception as e:
+        return {"file": path, "document": number, "error": f"{type(e).__name__}: {e}"}, None
+
+def profile_task(worker, task):
+    """
+    Runs worker(task) under a profile of its own.
+
+    Returns:
+        tuple: (record, cached, profile summary)
+    """
+    profile = Profile()
+    with profiling(profile), profile.stage("parse"):
+        record, cached = worker(task)
+    profile.documents += 1
+    return record, cached, profile.summary()
+
+def iter_batch_results(tasks, jobs, order, use_cache=True, cache_dir=None, worker=parse_file, profile=None):
+    """
+    Runs worker on every task across a process pool, yielding results in
+    input or completion order. With a profile, each task is profiled where
+    it runs and the measurements are merged into profile.
+    """
+    if profile is not None:
+        results = iter_batch_results(tasks, jobs, order, use_cache, cache_dir,
+                                     functools.partial(profile_task, worker))
+        for record, cached, summary in results:
+            profile.merge(summary)
+            yield record, cached
+        return
+
+    if jobs == 1:
+        init_worker(use_cache, cache_dir)
+        for task in tasks:
+            yield worker(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                             initargs=(use_cache, cache_dir)) as executor:
+        if order == "input":
+            # Chunking amortizes the IPC cost across many small documents
+            chunksize = max(1, len(tasks) // (jobs * 4))
+            yield from executor.map(worker, tasks, chunksize=chunksize)
+        else:
+            futures = [executor.submit(worker, task) for task in tasks]
+            for future in as_completed(futures):
+                yield future.result()
+
+def run_batch(args, profile=None):
+    """
+    Parses every file matched by --batch and streams one record per file in
+    --format, or one record per document with --split.
+    """
+    paths = collect_batch_files(args.batch)
+    if not paths:
+        print(f"Error: no input files found for --batch {args.batch}", file=sys.stderr)
+        sys.exit(1)
+    if args.split:
+        tasks, worker = split_batch_files(paths), parse_document
+    else:
+        tasks, worker = paths, parse_file
+
+    duplicates = None
+    if args.duplicates is not None:
+        duplicates = load_duplicate_index(args)
+
+    try:
+        out = open_output(args.output_file)
+    except Exception as e:
+        print(f"Error opening output file: {e}", file=sys.stderr)
+        sys.exit(1)
+    writer = make_writer(args.format or "jsonl", out, args.flush_every, api_url=args.curl,
+                         indent=2 if args.pretty else None)
+
+    failures = 0
+    cache_hits = 0
+    cache_misses = 0
+    flagged = 0
+
+    def parsed_documents():
+        nonlocal failures, cache_hits, cache_misses, flagged
+        for result, cached in iter_batch_results(tasks, args.jobs, args.order, not args.no_cache,
+                                                 args.cache_dir, worker, profile):
+            if cached is True:
+                cache_hits += 1
+            elif cached is False:
+                cache_misses += 1
+            label = record_label(result)
+            if "error" in result:
+                failures += 1
+                print(f"Error processing {label}: {result['error']}", file=sys.stderr)
+            elif duplicates is not None and flag_duplicates(duplicates, args.duplicates, label, result):
+                flagged += 1
+            with stage("output"):
+                writer.write(result)
+            if "data" in result and args.check_language:
+                report_language(result["data"], label)
+            if "data" in result and "duplicates" not in result:
+                yield label, result["data"], None
+
+    upload_failed = False
+    try:
+        if args.upload:
+            # Uploads start while later files are still being parsed
+            upload_failed = upload_documents(args, parsed_documents())
+        else:
+            for _ in parsed_documents():
+                pass
+        writer.close()
+    except BrokenPipeError:
+        print("Error: output closed by the reader", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if args.split:
+        print(f"Processed {len(tasks)} documents from {len(paths)} files: "
+              f"{len(tasks) - failures} parsed, {failures} failed", file=sys.stderr)
+    else:
+        print(f"Processed {len(paths)} files: {len(paths) - failures} parsed, {failures} failed", file=sys.stderr)
+    if not args.no_cache:
+        print(f"Parse cache: {cache_hits} hits, {cache_misses} misses", file=sys.stderr)
+    if duplicates is not None:
+        skipped = ", not uploaded" if args.upload else ""
+        print(f"Possible duplicates: {flagged}{skipped}", file=sys.stderr)
+    if failures or upload_failed:
+        sys.exit(1)
+
+def load_duplicate_index(args):
+    """
+    Returns the DuplicateIndex for --duplicates: empty, or with every
+    existing content when uploading, so both earlier documents of the batch
+    and contents already on the server are found.
+    """
+    if not args.upload:
+        return DuplicateIndex()
+    try:
+        return DuplicateIndex.fetch(args.upload)
+    except Exception as e:
+        print(f"Error fetching contents for --duplicates: {e}", file=sys.stderr)
+        sys.exit(1)
+
+def flag_duplicates(index, threshold, label, result):
+    """
+    Looks up a parsed record in the duplicate index, adds its matches to the
+    record as "duplicates" and then indexes it under its label.
+
+    Returns True if the record was flagged.
+    """
+    with stage("duplicates"):
+        signature = document_signature(result["data"], index.num_perm)
+        matches = index.query(result["data"], threshold, signature=signature)
+        index.add(label, result["data"], {"file": label}, signature=signature)
+    if not matches:
+        return False
+    result["duplicates"] = matches
+    for match in matches:
+        print(f"Possible duplicate: {label} ~ {duplicate_label(match)} (similarity {match['score']})",
+              file=sys.stderr)
+    return True
+
+def upload_documents(args, jobs):
+    """
+    Uploads (label, parsed_data, content_id) jobs to the --upload API URL.
+
+    Prints a summary to stderr and returns True if any upload failed.
+    """
+    # requests is only needed when uploading
+    from uploader import ContentUploader, format_summary, summarize
+
+    start = time.perf_counter()
+    with ContentUploader(args.upload, concurrency=args.upload_concurrency,
+                         retries=args.retries, delta=args.delta) as uploader:
+        results = uploader.upload_many(jobs)
+    summary = summarize(results, time.perf_counter() - start)
+    print(format_summary(summary, results), file=sys.stderr)
+    return summary["failed"] > 0
+
+def write_record(args, label, parsed_data):
+    """Writes a single parsed document as a one-record stream in --format."""
+    record = {"file": label, "data": parsed_data}
+    if args.update:
+        record["id"] = args.id
+    try:
+        out = open_output(args.output_file)
+    except Exception as e:
+        print(f"Error opening output file: {e}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        with make_writer(args.format, out, args.flush_every, api_url=args.curl,
+                         indent=2 if args.pretty else None) as writer:
+            writer.write(record)
+    except BrokenPipeError:
+        print("Error: output closed by the reader", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+def report_profile(profile, profile_format):
+    """Prints the --profile summary to stderr as a table or as JSON."""
+    summary = profile.summary()
+    if profile_format == "json":
+        print(dumps(summary, indent=2), file=sys.stderr)
+    else:
+        print(format_profile(summary), file=sys.stderr)
+
+def run_single(args, profile=None):
+    """Parses one document from --input-file or stdin and writes, uploads or prints it."""
+    cache = None if args.no_cache else open_cache(args.cache_dir)
+
+    with stage("parse"):
+        # Without the cache, which keys on the full text, a .docx file is
+        # parsed as its paragraphs are read and a large text file is mapped
+        if args.input_file and cache is None:
+            try:
+                parse = parse_docx if is_docx(args.input_file) else parse_text_file
+                parsed_data = parse(args.input_file)
+            except Exception as e:
+                print(f"Error reading input file: {e}", file=sys.stderr)
+                sys.exit(1)
+        else:
+            # Read input
+            if args.input_file:
+                try:
+                    with stage("read"):
+                        text = read_input_file(args.input_file)
+                except Exception as e:
+                    print(f"Error reading input file: {e}", file=sys.stderr)
+                    sys.exit(1)
+            else:
+                print("Enter your structured text (Ctrl+D to finish):", file=sys.stderr)
+                with stage("read"):
+                    text = sys.stdin.read()
+
+            # Parse text
+            try:
+                if cache:
+                    parsed_data = cache.parse(text)
+                else:
+                    parsed_data = parse_word_text(text)
+            except Exception as e:
+                print(f"Error parsing text: {e}", file=sys.stderr)
+                sys.exit(1)
+    if profile is not None:
+        profile.documents += 1
+
+    if args.check_language:
+        report_language(parsed_data, args.input_file)
+
+    # Upload directly if requested
+    label = args.input_file or "stdin"
+    if args.upload:
+        content_id = args.id if args.update else None
+        if upload_documents(args, [(label, parsed_data, content_id)]):
+            sys.exit(1)
+
+    with stage("output"):
+        if args.format:
+            write_record(args, label, parsed_data)
+            return
+
+        # Format output
+        indent = 2 if args.pretty else None
+        json_output = dumps(parsed_data, indent=indent)
+
+        # The curl command is written straight to the output stream
+        if args.curl:
+            if args.update:
+                curl_request = ("PUT", f"{args.curl}/{args.id}", build_update_payload(parsed_data))
+                command_type = "UPDATE"
+            else:
+                curl_request = ("POST", args.curl, build_create_payload(parsed_data))
+                command_type = "CREATE"
+
+        # Write output
+        if args.output_file:
+            try:
+                with open(args.output_file, 'w', encoding='utf-8') as f:
+                    f.write(json_output)
+                    if args.curl:
+                        f.write(f"\n\n# curl command for {command_type}:\n")
+                        write_curl_command(f, *curl_request)
+            except Exception as e:
+                print(f"Error writing output file: {e}", file=sys.stderr)
+                sys.exit(1)
+        else:
+            out = sys.stdout
+            out.write(json_output)
+            out.write("\n")
+            if args.curl:
+                out.write(f"\n# curl command for {command_type}:\n")
+                write_curl_command(out, *curl_request)
+                out.write("\n")
 
 def main():
     parser = argparse.ArgumentParser(description="Parse structured text from Word documents to JSON format")
     parser.add_argument(
         "--input-file", "-i",
-        help="Input file containing structured text (if not provided, read from stdin)"
+        help="Input .txt or .docx file containing structured text (if not provided, read from stdin)"
     )
     parser.add_argument(
         "--output-file", "-o",
@@ -24,7 +440,7 @@ def main():
     parser.add_argument(
         "--update", "-u",
         action="store_true",
-        help="Generate UPDATE curl command (requires --id)"
+        help="Generate UPDATE curl command, or update with --upload (requires --id)"
     )
     parser.add_argument(
         "--id",
@@ -35,65 +451,160 @@ def main():
         action="store_true",
         help="Pretty-print the JSON output"
     )
+    parser.add_argument(
+        "--batch", "-b",
+        metavar="DIR|GLOB",
+        help="Parse every .txt and .docx file in a directory (or every file matching a glob) and write JSON Lines"
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes for --batch (default: number of CPUs)"
+    )
+    parser.add_argument(
+        "--order",
+        choices=["input", "completion"],
+        default="input",
+        help="Order of --batch results: input file order or as soon as each file completes"
+    )
+    parser.add_argument(
+        "--split",
+        action="store_true",
+        help="With --batch, split each .txt file into the documents it contains (concatenated exports) "
+             "and parse them in parallel, one record per document"
+    )
+    parser.add_argument(
+        "--upload",
+        metavar="API_URL",
+        help="Upload the parsed documents to the given contents API URL instead of generating curl commands"
+    )
+    parser.add_argument(
+        "--upload-concurrency",
+        type=int,
+        default=8,
+        help="Maximum number of concurrent upload requests (default: 8)"
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="Retries per upload request on connection errors and 5xx/429 responses (default: 3)"
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="With --upload and --update, fetch the content and PATCH only the fields that changed "
+             "instead of PUTting the whole document"
+    )
+    parser.add_argument(
+        "--format", "-f",
+        choices=FORMATS,
+        help="Stream records as JSON Lines, a JSON array or a curl shell script (needs --curl). "
+             "Default: jsonl for --batch, the plain JSON document otherwise"
+    )
+    parser.add_argument(
+        "--flush-every",
+        type=int,
+        default=DEFAULT_FLUSH_EVERY,
+        metavar="N",
+        help=f"Flush the output every N records, 0 for only at the end (default: {DEFAULT_FLUSH_EVERY})"
+    )
+    parser.add_argument(
+        "--check-language",
+        action="store_true",
+        help="Warn on stderr about lines that look filed under the wrong language"
+    )
+    parser.add_argument(
+        "--duplicates",
+        nargs="?",
+        type=float,
+        const=DEFAULT_DUPLICATE_THRESHOLD,
+        metavar="THRESHOLD",
+        help="With --batch, flag documents whose teleprompter and description text is similar "
+             f"to an earlier document or, with --upload, an existing content (0-1, default: "
+             f"{DEFAULT_DUPLICATE_THRESHOLD}). Flagged documents are not uploaded"
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="table",
+        choices=["table", "json"],
+        help="Time each parser stage and count section bytes, and print the profile to stderr "
+             "as a table (default) or JSON"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse, without reading or writing the on-disk parse cache"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory of the parse cache (default: ~/.cache/wordexporter)"
+    )
 
     args = parser.parse_args()
 
-    # Validate arguments
-    if args.update and not args.id:
-        print("Error: --update requires --id to be specified", file=sys.stderr)
+    if args.format == "curl-script" and not args.curl:
+        print("Error: --format curl-script requires --curl API_URL", file=sys.stderr)
         sys.exit(1)
 
-    if args.id and not args.update:
-        print("Warning: --id provided but --update not specified. ID will be ignored.", file=sys.stderr)
-
-    # Read input
-    if args.input_file:
-        try:
-            with open(args.input_file, 'r', encoding='utf-8') as f:
-                text = f.read()
-        except Exception as e:
-            print(f"Error reading input file: {e}", file=sys.stderr)
-            sys.exit(1)
-    else:
-        print("Enter your structured text (Ctrl+D to finish):", file=sys.stderr)
-        text = sys.stdin.read()
+    if args.flush_every < 0:
+        print("Error: --flush-every cannot be negative", file=sys.stderr)
+        sys.exit(1)
 
-    # Parse text
-    try:
-        parsed_data = parse_word_text(text)
-    except Exception as e:
-        print(f"Error parsing text: {e}", file=sys.stderr)
+    if args.split and not args.batch:
+        print("Error: --split requires --batch", file=sys.stderr)
         sys.exit(1)
 
-    # Format output
-    indent = 2 if args.pretty else None
-    json_output = json.dumps(parsed_data, indent=indent, ensure_ascii=False)
+    if args.delta and (args.batch or not (args.upload and args.update)):
+        print("Error: --delta requires --upload and --update", file=sys.stderr)
+        sys.exit(1)
 
-    # Generate curl command if requested
-    if args.curl:
-        if args.update:
-            curl_cmd = generate_update_curl_command(parsed_data, args.curl, args.id)
-            command_type = "UPDATE"
-        else:
-            curl_cmd = generate_curl_command(parsed_data, args.curl)
-            command_type = "CREATE"
+    if args.duplicates is not None:
+        if not args.batch:
+            print("Error: --duplicates requires --batch", file=sys.stderr)
+            sys.exit(1)
+        if not 0 < args.duplicates <= 1:
+            print("Error: --duplicates threshold must be between 0 and 1", file=sys.stderr)
+            sys.exit(1)
 
-    # Write output
-    if args.output_file:
-        try:
-            with open(args.output_file, 'w', encoding='utf-8') as f:
-                f.write(json_output)
-                if args.curl:
-                    f.write(f"\n\n# curl command for {command_type}:\n")
-                    f.write(curl_cmd)
-        except Exception as e:
-            print(f"Error writing output file: {e}", file=sys.stderr)
+    if args.batch:
+        if args.input_file:
+            print("Error: --batch cannot be combined with --input-file", file=sys.stderr)
+            sys.exit(1)
+        if args.curl and args.format != "curl-script":
+            print("Error: --batch only accepts --curl with --format curl-script", file=sys.stderr)
+            sys.exit(1)
+        if args.upload and args.curl:
+            print("Error: --upload and --curl cannot be used together", file=sys.stderr)
+            sys.exit(1)
+        if args.jobs < 1:
+            print("Error: --jobs must be at least 1", file=sys.stderr)
             sys.exit(1)
     else:
-        print(json_output)
-        if args.curl:
-            print(f"\n# curl command for {command_type}:")
-            print(curl_cmd)
+        # Validate arguments
+        if args.update and not args.id:
+            print("Error: --update requires --id to be specified", file=sys.stderr)
+            sys.exit(1)
+
+        if args.upload and args.curl:
+            print("Error: --upload and --curl cannot be used together", file=sys.stderr)
+            sys.exit(1)
+
+        if args.id and not args.update:
+            print("Warning: --id provided but --update not specified. ID will be ignored.", file=sys.stderr)
+
+    profile = Profile() if args.profile else None
+    try:
+        with profiling(profile):
+            if args.batch:
+                run_batch(args, profile)
+            else:
+                run_single(args, profile)
+    finally:
+        if profile is not None:
+            report_profile(profile, args.profile)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
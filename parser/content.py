@@ -0,0 +1,169 @@
+"""
+Compact record of one parsed document.
+
+ParsedContent stores the fields of a parse result in __slots__ instead of a
+per-document dict, which matters when a batch holds thousands of parsed
+documents. It builds the API payloads straight from its attributes and
+still supports dict-style access (content["title"], .get, .items) for code
+written against the plain dict returned by parse_word_text.
+"""
+import json
+from collections.abc import MutableMapping
+from operator import attrgetter
+
+# Fields of a parse result, in the order of empty_parsed_data
+PARSED_FIELDS = (
+    "title",
+    "teleprompterEs", "teleprompterEn",
+    "videoDescriptionEs", "videoDescriptionEn",
+    "tagsListEs", "tagsListEn",
+    "pinnedCommentEs", "pinnedCommentEn",
+    "tiktokDescriptionEs", "tiktokDescriptionEn",
+    "twitterPostEs", "twitterPostEn",
+    "facebookDescriptionEs", "facebookDescriptionEn",
+    "tags",
+)
+
+PAYLOAD_MODES = ("create", "update")
+
+# Reads every field in one call, for pickling and to_dict
+get_fields = attrgetter(*PARSED_FIELDS)
+
+class ParsedContent(MutableMapping):
+    """
+    Parsed document with one slot per field.
+
+    Fields not given keep the parser defaults: title None, text fields ""
+    and tags an empty list. Only the fields in PARSED_FIELDS exist; setting
+    any other key raises KeyError.
+    """
+
+    __slots__ = PARSED_FIELDS
+
+    def __init__(self, **fields):
+        self.title = None
+        for field in PARSED_FIELDS[1:-1]:
+            setattr(self, field, "")
+        self.tags = []
+        for field, value in fields.items():
+            self[field] = value
+
+    @classmethod
+    def from_dict(cls, data):
+        """Builds a ParsedContent from a parse result dict, ignoring unknown keys."""
+        return cls.from_pairs(data.items())
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        """Builds a ParsedContent from (field, value) pairs such as parse_word_stream yields."""
+        content = cls()
+        for field, value in pairs:
+            if field in PARSED_FIELDS:
+                setattr(content, field, value)
+        return content
+
+    def __getitem__(self, field):
+        if field not in PARSED_FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __setitem__(self, field, value):
+        if field not in PARSED_FIELDS:
+            raise KeyError(field)
+        setattr(self, field, value)
+
+    def __delitem__(self, field):
+        raise TypeError("ParsedContent fields cannot be deleted")
+
+    def __iter__(self):
+        return iter(PARSED_FIELDS)
+
+    def __len__(self):
+        return len(PARSED_FIELDS)
+
+    def __contains__(self, field):
+        return field in PARSED_FIELDS
+
+    def __repr__(self):
+        return f"ParsedContent(title={self.title!r})"
+
+    # Slots have no instance dict, so pickling (e.g. to and from worker
+    # processes) goes through an explicit state tuple
+    def __getstate__(self):
+        return get_fields(self)
+
+    def __setstate__(self, state):
+        for field, value in zip(PARSED_FIELDS, state):
+            setattr(self, field, value)
+
+    def to_dict(self):
+        """Returns the fields as a plain dict, in the same shape as parse_word_text."""
+        return dict(zip(PARSED_FIELDS, self.__getstate__()))
+
+    def to_payload(self, mode="create"):
+        """
+        Builds the JSON body for the contents API.
+
+        Args:
+            mode (str): "create" for POST /api/contents, which also sets the
+                publication defaults, or "update" for PUT /api/contents/:id
+
+        Returns:
+            dict: The payload; its values are the record's own objects, not copies
+        """
+        if mode == "update":
+            return {
+                "title": self.title,
+                "teleprompterEs": self.teleprompterEs,
+                "teleprompterEn": self.teleprompterEn,
+                "videoDescriptionEs": self.videoDescriptionEs,
+                "videoDescriptionEn": self.videoDescriptionEn,
+                "tagsListEs": self.tagsListEs,
+                "tagsListEn": self.tagsListEn,
+                "pinnedCommentEs": self.pinnedCommentEs,
+                "pinnedCommentEn": self.pinnedCommentEn,
+                "tiktokDescriptionEs": self.tiktokDescriptionEs,
+                "tiktokDescriptionEn": self.tiktokDescriptionEn,
+                "twitterPostEs": self.twitterPostEs,
+                "twitterPostEn": self.twitterPostEn,
+                "facebookDescriptionEs": self.facebookDescriptionEs,
+                "facebookDescriptionEn": self.facebookDescriptionEn,
+                "tags": self.tags,
+            }
+        if mode != "create":
+            raise ValueError(f"Unknown payload mode: {mode} (expected one of {', '.join(PAYLOAD_MODES)})")
+        return {
+            "title": self.title,
+            "publishedEs": False,
+            "publishedEn": False,
+            "publishedDateEs": None,
+            "publishedDateEn": None,
+            "publishedUrlEs": "",
+            "publishedUrlEn": "",
+            "teleprompterEs": self.teleprompterEs,
+            "teleprompterEn": self.teleprompterEn,
+            "videoDescriptionEs": self.videoDescriptionEs,
+            "videoDescriptionEn": self.videoDescriptionEn,
+            "tagsListEs": self.tagsListEs,
+            "tagsListEn": self.tagsListEn,
+            "pinnedCommentEs": self.pinnedCommentEs,
+            "pinnedCommentEn": self.pinnedCommentEn,
+            "tiktokDescriptionEs": self.tiktokDescriptionEs,
+            "tiktokDescriptionEn": self.tiktokDescriptionEn,
+            "twitterPostEs": self.twitterPostEs,
+            "twitterPostEn": self.twitterPostEn,
+            "facebookDescriptionEs": self.facebookDescriptionEs,
+            "facebookDescriptionEn": self.facebookDescriptionEn,
+            "tags": self.tags,
+        }
+
+    def to_json(self, mode=None, indent=None):
+        """
+        Serializes the record, or its payload for mode, to a JSON string.
+
+        Args:
+            mode (str): None for the parse result, "create" or "update" for a payload
+            indent (int): Indentation passed to json.dumps
+        """
+        data = self.to_dict() if mode is None else self.to_payload(mode)
+        return json.dumps(data, indent=indent, ensure_ascii=False)
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Local SQLite mirror of /api/contents with full-text search.
+
+The server's /search route scans every content with case-insensitive
+regexes and returns at most 100 results, and the tools used to call it
+once per document. ContentMirror keeps a copy of every content in a SQLite
+database instead, with an FTS5 index over the title, descriptions, tags and
+teleprompter scripts, so lookups and searches are local and take
+milliseconds.
+
+The first sync() pulls every content. Later syncs only ask for the contents
+whose updatedAt is at or after the newest one already mirrored (minus a
+small overlap for saves that were in flight), and upsert them. Contents
+deleted on the server are only noticed by a full sync (full=True).
+
+Usage:
+    python -m parser.content_mirror sync -a http://localhost:3000/api/contents
+    python -m parser.content_mirror search "inteligencia artificial"
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+
+try:
+    from .parse_cache import default_cache_dir
+    from .title_index import normalize_title
+except ImportError:
+    from parse_cache import default_cache_dir
+    from title_index import normalize_title
+
+# Default database, next to the parse cache
+DEFAULT_MIRROR_NAME = "contents.sqlite3"
+
+# Incremental syncs re-read contents saved this long before the newest
+# mirrored updatedAt, in case a save was still in flight during the last sync
+SYNC_OVERLAP = timedelta(seconds=60)
+
+# Indexed columns with the content fields they are built from, and their
+# bm25 weights: a title hit ranks above a tag hit, above a description hit
+FTS_COLUMNS = (
+    ("title", ("title",), 10.0),
+    ("tags", ("tags", "tagsListEs", "tagsListEn"), 5.0),
+    ("description", ("videoDescriptionEs", "videoDescriptionEn"), 2.0),
+    ("teleprompter", ("teleprompterEs", "teleprompterEn"), 1.0),
+)
+
+SEARCH_TERM_PATTERN = re.compile(r"\w+")
+
+FTS_COLUMN_LIST = ", ".join(column for column, _, _ in FTS_COLUMNS)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS contents (
+    id TEXT PRIMARY KEY,
+    title_key TEXT NOT NULL,
+    created_at TEXT,
+    updated_at TEXT,
+    document TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contents_title_key ON contents (title_key, created_at);
+CREATE INDEX IF NOT EXISTS contents_created_at ON contents (created_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS contents_fts USING fts5 (
+    {FTS_COLUMN_LIST},
+    content = '',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+def default_mirror_path():
+    """Returns contents.sqlite3 in the parse cache directory."""
+    return os.path.join(default_cache_dir(), DEFAULT_MIRROR_NAME)
+
+def content_updated_at(content):
+    """Returns the updatedAt of a content, falling back to createdAt for contents saved before it existed."""
+    return content.get("updatedAt") or content.get("createdAt")
+
+def fts_values(content):
+    """Returns the text of each FTS_COLUMNS column for a content."""
+    values = []
+    for _, fields, _ in FTS_COLUMNS:
+        parts = []
+        for field in fields:
+            value = content.get(field)
+            if isinstance(value, list):
+                parts.extend(str(item) for item in value if item)
+            elif value:
+                parts.append(str(value))
+        values.append("\n".join(parts))
+    return values
+
+def fts_query(text):
+    """
+    Turns free text into an FTS5 query matching every word as a prefix, so
+    user input never needs FTS5 syntax. Returns None if text has no words.
+    """
+    terms = SEARCH_TERM_PATTERN.findall(text)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+class ContentMirror:
+    """
+    SQLite mirror of the contents API.
+
+    Args:
+        path (str): Database file (default: default_mirror_path()), or
+            ":memory:"
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_mirror_path()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        if self.path != ":memory:":
+            # Readers (e.g. another tool) are not blocked while a sync writes
+            self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM contents").fetchone()[0]
+
+    def _state(self, key):
+        row = self.connection.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key, value):
+        self.connection.execute(
+            "INSERT INTO sync_state (key, value) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    @property
+    def watermark(self):
+        """The newest updatedAt mirrored so far (ISO string), or None before the first sync."""
+        return self._state("watermark")
+
+    @property
+    def synced_at(self):
+        """When the last sync finished (ISO string, UTC), or None."""
+        return self._state("synced_at")
+
+    def _upsert(self, content):
+        """Stores one content dict and re-indexes its text. Returns False if it was already mirrored as is."""
+        document = json.dumps(content, ensure_ascii=False, sort_keys=True)
+        row = self.connection.execute(
+            "SELECT rowid, document FROM contents WHERE id = ?", (content["_id"],)
+        ).fetchone()
+        if row and row[1] == document:
+            return False
+        values = (
+            normalize_title(content.get("title")), content.get("createdAt"), content_updated_at(content), document,
+        )
+        if row:
+            rowid = row[0]
+            self.connection.execute(
+                "UPDATE contents SET title_key = ?, created_at = ?, updated_at = ?, document = ? WHERE rowid = ?",
+                (*values, rowid),
+            )
+            self._unindex(rowid, row[1])
+        else:
+            rowid = self.connection.execute(
+                "INSERT INTO contents (id, title_key, created_at, updated_at, document) VALUES (?, ?, ?, ?, ?)",
+                (content["_id"], *values),
+            ).lastrowid
+        self.connection.execute(
+            f"INSERT INTO contents_fts (rowid, {FTS_COLUMN_LIST}) VALUES (?{', ?' * len(FTS_COLUMNS)})",
+            (rowid, *fts_values(content)),
+        )
+        return True
+
+    def _unindex(self, rowid, document):
+        # The index is contentless (it keeps no copy of the text), so removing
+        # a row means replaying the text it was indexed with
+        self.connection.execute(
+            f"INSERT INTO contents_fts (contents_fts, rowid, {FTS_COLUMN_LIST}) "
+            f"VALUES ('delete', ?{', ?' * len(FTS_COLUMNS)})",
+            (rowid, *fts_values(json.loads(document))),
+        )
+
+    def _delete(self, content_id):
+        """Removes a content from the mirror. Returns True if it was there."""
+        row = self.connection.execute(
+            "SELECT rowid, document FROM contents WHERE id = ?", (content_id,)
+        ).fetchone()
+        if not row:
+            return False
+        self._unindex(*row)
+        self.connection.execute("DELETE FROM contents WHERE rowid = ?", (row[0],))
+        return True
+
+    def sync(self, api_url, session=None, timeout=30, full=False):
+        """
+        Brings the mirror up to date with the contents API.
+
+        Args:
+            api_url (str): Contents URL, e.g. http://localhost:3000/api/contents
+            session: requests.Session to reuse (default: a one-off request)
+            timeout (float): Request timeout in seconds
+            full (bool): Pull every content and drop the ones deleted on the
+                server, even if the mirror has synced before
+
+        Returns:
+            dict: {"full", "fetched", "changed", "deleted", "total"}
+        """
+        # requests is only needed to sync
+        import requests
+
+        http = session or requests
+        watermark = None if full else self.watermark
+        params = None
+        if watermark:
+            since = datetime.fromisoformat(watermark.replace("Z", "+00:00")) - SYNC_OVERLAP
+            params = {"updatedSince": since.isoformat().replace("+00:00", "Z")}
+        response = http.get(api_url, params=params, timeout=timeout)
+        response.raise_for_status()
+        contents = response.json()
+
+        changed = deleted = 0
+        with self.connection:
+            if watermark is None:
+                server_ids = {content["_id"] for content in contents}
+                for (content_id,) in self.connection.execute("SELECT id FROM contents").fetchall():
+                    if content_id not in server_ids:
+                        deleted += self._delete(content_id)
+            for content in contents:
+                changed += self._upsert(content)
+            newest = max(filter(None, map(content_updated_at, contents)), default=None)
+            if watermark is None or (newest and newest > watermark):
+                self._set_state("watermark", newest)
+            synced_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            self._set_state("synced_at", synced_at.replace("+00:00", "Z"))
+        return {
+            "full": watermark is None,
+            "fetched": len(contents),
+            "changed": changed,
+            "deleted": deleted,
+            "total": len(self),
+        }
+
+    def store(self, contents):
+        """
+        Stores content dicts returned by the API, e.g. by a create or an
+        update, without waiting for the next sync. Returns how many changed.
+        """
+        with self.connection:
+            return sum(self._upsert(content) for content in contents)
+
+    def get(self, content_id):
+        """Returns the mirrored content with this _id, or None."""
+        row = self.connection.execute("SELECT document FROM contents WHERE id = ?", (content_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_title(self, title):
+        """
+        Returns the most recently created content whose title matches title
+        after normalization (see title_index.normalize_title), or None.
+        """
+        key = normalize_title(title)
+        if not key:
+            return None
+        row = self.connection.execute(
+            "SELECT document FROM contents WHERE title_key = ? ORDER BY created_at DESC LIMIT 1", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def search(self, text, limit=20):
+        """
+        Full-text search over titles, tags, descriptions and teleprompter
+        scripts. Every word must match, as a prefix and ignoring case and
+        accents.
+
+        Returns:
+            list: Content dicts, best match first
+        """
+        query = fts_query(text)
+        if query is None:
+            return []
+        weights = ", ".join(str(weight) for _, _, weight in FTS_COLUMNS)
+        rows = self.connection.execute(
+            f"SELECT contents.document FROM contents_fts "
+            f"JOIN contents ON contents.rowid = contents_fts.rowid "
+            f"WHERE contents_fts MATCH ? ORDER BY bm25(contents_fts, {weights}) LIMIT ?",
+            (query, limit),
+        ).fetchall()
+        return [json.loads(document) for (document,) in rows]
+
+    def contents(self):
+        """Yields every mirrored content, newest first, like GET /api/contents."""
+        for (document,) in self.connection.execute("SELECT document FROM contents ORDER BY created_at DESC"):
+            yield json.loads(document)
+
+def main():
+    parser = argparse.ArgumentParser(description="Mirror /api/contents into SQLite and search it offline")
+    parser.add_argument("--database", help="Mirror database (default: ~/.cache/wordexporter/contents.sqlite3)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    sync_command = commands.add_parser("sync", help="Pull new and changed contents")
+    sync_command.add_argument("--api-url", "-a", required=True, help="Contents URL")
+    sync_command.add_argument("--full", action="store_true", help="Pull everything and drop deleted contents")
+    search_command = commands.add_parser("search", help="Search the mirror")
+    search_command.add_argument("query")
+    search_command.add_argument("--limit", type=int, default=20, help="Maximum results (default: 20)")
+    get_command = commands.add_parser("get", help="Print one mirrored content as JSON")
+    get_command.add_argument("id")
+    args = parser.parse_args()
+
+    with ContentMirror(args.database) as mirror:
+        if args.command == "sync":
+            try:
+                result = mirror.sync(args.api_url, full=args.full)
+            except Exception as e:
+                print(f"Error syncing contents: {e}", file=sys.stderr)
+                sys.exit(1)
+            kind = "Full" if result["full"] else "Incremental"
+            print(f"{kind} sync: {result['fetched']} fetched, {result['changed']} changed, "
+                  f"{result['deleted']} deleted, {result['total']} contents", file=sys.stderr)
+        elif args.command == "search":
+            for content in mirror.search(args.query, args.limit):
+                print(f"{content['_id']}\t{content.get('title', '')}")
+        else:
+            content = mirror.get(args.id)
+            if content is None:
+                print(f"Content not found: {args.id}", file=sys.stderr)
+                sys.exit(1)
+            print(json.dumps(content, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
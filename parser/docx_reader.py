@@ -0,0 +1,103 @@
+"""
+Reads Word .docx files directly, without copying their text out first.
+
+A .docx file is a zip archive whose body text lives in word/document.xml.
+iter_docx_lines streams that part with ElementTree.iterparse and yields one
+line per paragraph as soon as the paragraph closes, discarding parsed
+elements as it goes. The whole XML tree is never held in memory, and the
+lines feed straight into parse_word_stream.
+"""
+import zipfile
+import xml.etree.ElementTree as ET
+
+try:
+    from .wordexporter import empty_parsed_data, parse_word_stream
+except ImportError:
+    from wordexporter import empty_parsed_data, parse_word_stream
+
+DOCUMENT_PART = "word/document.xml"
+
+WORD_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+PARAGRAPH = f"{{{WORD_NAMESPACE}}}p"
+BODY = f"{{{WORD_NAMESPACE}}}body"
+TEXT = f"{{{WORD_NAMESPACE}}}t"
+TAB = f"{{{WORD_NAMESPACE}}}tab"
+BREAKS = {f"{{{WORD_NAMESPACE}}}br", f"{{{WORD_NAMESPACE}}}cr"}
+
+def is_docx(path):
+    """Returns True if path names a .docx file."""
+    return str(path).lower().endswith(".docx")
+
+def paragraph_text(paragraph):
+    """
+    Returns the text of a w:p element as pasting it would: runs joined, tabs
+    as "\\t" and manual line breaks as "\\n". Deleted text and field codes
+    are left out, since they are stored in other elements than w:t.
+    """
+    parts = []
+    for element in paragraph.iter():
+        tag = element.tag
+        if tag == TEXT:
+            if element.text:
+                parts.append(element.text)
+        elif tag == TAB:
+            parts.append("\t")
+        elif tag in BREAKS:
+            parts.append("\n")
+    return "".join(parts)
+
+def iter_docx_paragraphs(source):
+    """
+    Yields the text of every paragraph of a .docx file in document order,
+    including paragraphs inside tables.
+
+    Args:
+        source: Path or binary file object of the .docx file
+
+    Raises:
+        zipfile.BadZipFile: If source is not a zip archive
+        KeyError: If the archive has no word/document.xml
+    """
+    with zipfile.ZipFile(source) as archive:
+        with archive.open(DOCUMENT_PART) as document:
+            body = None
+            depth = 0
+            for event, element in ET.iterparse(document, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if element.tag == BODY:
+                        body = element
+                    continue
+                depth -= 1
+                if element.tag == PARAGRAPH:
+                    yield paragraph_text(element)
+                    element.clear()
+                # Drop finished top-level blocks (paragraphs, tables) so the
+                # tree never grows beyond the block being read
+                if body is not None and depth == 2:
+                    body.clear()
+
+def iter_docx_lines(source):
+    """
+    Yields the lines of a .docx file like iterating over the equivalent text
+    file would: one line per paragraph (or per manual line break), ending
+    in "\\n".
+    """
+    for text in iter_docx_paragraphs(source):
+        for line in text.split("\n"):
+            yield line + "\n"
+
+def read_docx_text(source):
+    """Returns the text of a .docx file, one paragraph per line."""
+    return "\n".join(iter_docx_paragraphs(source))
+
+def parse_docx(source):
+    """
+    Parses a .docx file, streaming its paragraphs into the parser.
+
+    Returns:
+        dict: The same parsed data parse_word_text returns for the document's text
+    """
+    data = empty_parsed_data()
+    data.update(parse_word_stream(iter_docx_lines(source)))
+    return data
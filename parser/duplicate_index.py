@@ -0,0 +1,206 @@
+"""
+Near-duplicate detection over parsed documents.
+
+Lightly edited re-exports of a video get a new title often enough that
+TitleIndex cannot catch them. DuplicateIndex compares the text instead: the
+word shingles of the teleprompter scripts and video descriptions.
+
+Each document is summarized by a MinHash signature built with one
+permutation hashing: every shingle is hashed once and falls into one of
+num_perm bins, which keep their minimum. Empty bins borrow from the next
+filled bin, so short texts still get full signatures. The share of equal
+bins estimates the Jaccard similarity of two shingle sets.
+
+Signatures are split into bands for locality-sensitive hashing. Documents
+that agree on every row of at least one band are candidates; only those
+are scored. A query therefore touches a handful of buckets rather than
+every indexed document.
+"""
+import re
+import zlib
+
+# Fields whose text identifies a video
+SHINGLE_FIELDS = ("teleprompterEs", "teleprompterEn", "videoDescriptionEs", "videoDescriptionEn")
+
+# Words per shingle
+SHINGLE_SIZE = 5
+
+# Signature length and LSH banding. With 16 bands of 8 rows, documents above
+# about 0.7 similarity are likely to share a band, and pairs at 0.8 are
+# found about 95% of the time.
+DEFAULT_NUM_PERM = 128
+DEFAULT_BANDS = 16
+
+# Minimum estimated similarity reported by default
+DEFAULT_THRESHOLD = 0.8
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# Odd 32-bit multiplier spreading CRC values over the bins
+HASH_MULTIPLIER = 0x9E3779B1
+HASH_MASK = 0xFFFFFFFF
+
+def document_shingles(data, size=SHINGLE_SIZE):
+    """
+    Returns the set of hashed word shingles of a parsed document.
+
+    Words are case-folded, and every SHINGLE_FIELDS field is shingled on
+    its own so shingles do not span fields. A field shorter than size words
+    is one shingle. Hashes are CRC-32 based, so they are the same in every
+    process.
+    """
+    shingles = set()
+    for field in SHINGLE_FIELDS:
+        words = WORD_PATTERN.findall((data.get(field) or "").casefold())
+        if not words:
+            continue
+        encoded = " ".join(words).encode("utf-8")
+        if len(words) <= size:
+            shingles.add(zlib.crc32(encoded))
+            continue
+        # Byte offsets of the word starts, so each shingle is one slice
+        starts = [0]
+        for word in words[:-1]:
+            starts.append(starts[-1] + len(word.encode("utf-8")) + 1)
+        starts.append(len(encoded) + 1)
+        for index in range(len(words) - size + 1):
+            shingles.add(zlib.crc32(encoded[starts[index]:starts[index + size] - 1]))
+    return shingles
+
+def minhash_signature(shingles, num_perm=DEFAULT_NUM_PERM):
+    """
+    Returns the one-permutation MinHash signature of a set of shingle
+    hashes as a tuple of num_perm ints, or None for an empty set.
+    """
+    if not shingles:
+        return None
+    empty = HASH_MASK + 1
+    bins = [empty] * num_perm
+    for shingle in shingles:
+        value = (shingle * HASH_MULTIPLIER) & HASH_MASK
+        index = value % num_perm
+        value //= num_perm
+        if value < bins[index]:
+            bins[index] = value
+    # Densify: an empty bin takes the value of the next filled bin, offset
+    # by the distance so that borrowed values do not match by accident
+    for index in range(num_perm):
+        if bins[index] != empty:
+            continue
+        distance = 1
+        while bins[(index + distance) % num_perm] > HASH_MASK:
+            distance += 1
+        bins[index] = bins[(index + distance) % num_perm] + distance * (empty + 1)
+    return tuple(bins)
+
+def document_signature(data, num_perm=DEFAULT_NUM_PERM):
+    """Returns the MinHash signature of a parsed document, or None if it has no text to compare."""
+    return minhash_signature(document_shingles(data), num_perm)
+
+def estimate_similarity(signature, other):
+    """Estimates the Jaccard similarity of two documents from their signatures."""
+    return sum(a == b for a, b in zip(signature, other)) / len(signature)
+
+class DuplicateIndex:
+    """
+    LSH index of document signatures.
+
+    Args:
+        contents: Iterable of content dicts (as listed by /api/contents) to
+            index under their "_id"
+        num_perm (int): Signature length
+        bands (int): Number of LSH bands; must divide num_perm
+    """
+
+    def __init__(self, contents=(), num_perm=DEFAULT_NUM_PERM, bands=DEFAULT_BANDS):
+        if num_perm % bands:
+            raise ValueError("bands must divide num_perm")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._signatures = {}
+        self._entries = {}
+        self._order = {}
+        self._buckets = [{} for _ in range(bands)]
+        for content in contents:
+            self.add(content.get("_id"), content, {"_id": content.get("_id"), "title": content.get("title")})
+
+    @classmethod
+    def fetch(cls, api_url, session=None, timeout=30, **kwargs):
+        """Builds an index of every content from a single GET of the contents API."""
+        # requests is only needed to fetch
+        import requests
+
+        http = session or requests
+        response = http.get(api_url, timeout=timeout)
+        response.raise_for_status()
+        return cls(response.json(), **kwargs)
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __contains__(self, key):
+        return key in self._signatures
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [signature[band * rows:(band + 1) * rows] for band in range(self.bands)]
+
+    def add(self, key, data, entry=None, signature=None):
+        """
+        Indexes a parsed document (or content dict) under key.
+
+        Args:
+            key: Unique, hashable identifier, e.g. a content _id or a file name
+            data: Mapping with the SHINGLE_FIELDS fields
+            entry (dict): What queries return for this document (default: {"key": key})
+            signature: document_signature(data), if already computed
+
+        Returns:
+            bool: False if the document has no text to compare or key is
+            already indexed, True otherwise
+        """
+        if key is None or key in self._signatures:
+            return False
+        if signature is None:
+            signature = document_signature(data, self.num_perm)
+        if signature is None:
+            return False
+        self._signatures[key] = signature
+        self._entries[key] = entry if entry is not None else {"key": key}
+        self._order[key] = len(self._order)
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            buckets.setdefault(band_key, []).append(key)
+        return True
+
+    def query(self, data, threshold=DEFAULT_THRESHOLD, exclude=None, signature=None):
+        """
+        Finds indexed documents similar to data.
+
+        Args:
+            data: Mapping with the SHINGLE_FIELDS fields
+            threshold (float): Minimum estimated similarity, 0-1
+            exclude: Key to leave out, e.g. the document's own
+            signature: document_signature(data), if already computed
+
+        Returns:
+            list: The entries of the matches with a "score", most similar
+            first
+        """
+        if signature is None:
+            signature = document_signature(data, self.num_perm)
+        if signature is None:
+            return []
+        candidates = set()
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(buckets.get(band_key, ()))
+        candidates.discard(exclude)
+
+        matches = []
+        for key in candidates:
+            score = estimate_similarity(signature, self._signatures[key])
+            if score >= threshold:
+                matches.append((score, key))
+        # Ties keep insertion order, so results are stable
+        matches.sort(key=lambda match: (-match[0], self._order[match[1]]))
+        return [dict(self._entries[key], score=round(score, 3)) for score, key in matches]
@@ -3,18 +3,41 @@
 Script to search for existing content by title and decide whether to create a new one or update an existing one.
 """
 import json
+import os
 import sys
+import time
 import requests
 import argparse
-from parser.wordexporter import parse_word_text, generate_curl_command, generate_update_curl_command
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from parser.wordexporter import (
+    parse_content, generate_curl_command, generate_patch_curl_command, generate_update_curl_command
+)
+from parser.title_index import TitleIndex
+from parser.duplicate_index import DEFAULT_THRESHOLD as DEFAULT_DUPLICATE_THRESHOLD, DuplicateIndex
+from parser.content_mirror import ContentMirror
+from parser.content import ParsedContent
+from parser.docx_reader import is_docx, parse_docx
+from parser.mmap_reader import MMAP_THRESHOLD, parse_mapped_file
 
-def search_content_by_title(api_url, title):
+# Files picked up by --input-dir
+INPUT_SUFFIXES = (".txt", ".docx")
+
+# What to do when a document's title matches an existing content:
+#   ask         prompt the user (interactive, single file only)
+#   update      update the matching content
+#   create      always create a new content
+#   skip        leave documents that already exist alone
+#   exact-only  update only on an exact title match, create otherwise
+POLICIES = ["ask", "update", "create", "skip", "exact-only"]
+
+def search_content_by_title(api_url, title, timeout=10):
     """
     Search for existing content with an exact or similar title
 
     Args:
         api_url: Base API URL
         title: Title to search for
+        timeout: Request timeout in seconds
 
     Returns:
         dict: Found content or None if not found
@@ -24,7 +47,7 @@ def search_content_by_title(api_url, title):
 
     try:
         # Make GET request
-        response = requests.get(search_url)
+        response = requests.get(search_url, timeout=timeout)
 
         # Check if request was successful
         if response.status_code == 200:
@@ -46,12 +69,180 @@ def search_content_by_title(api_url, title):
         print(f"Error searching for contents: {e}", file=sys.stderr)
         return None
 
+def decide_action(policy, existing_content, exact):
+    """
+    Decides what to do with a parsed document.
+
+    Args:
+        policy: One of POLICIES
+        existing_content: Matching content, or None if there is no match
+        exact: Whether existing_content matched the title exactly
+
+    Returns:
+        str: "CREATE", "UPDATE", "SKIP" or "ASK"
+    """
+    if not existing_content or policy == "create":
+        return "CREATE"
+    if policy == "update":
+        return "UPDATE"
+    if policy == "skip":
+        return "SKIP"
+    if policy == "exact-only":
+        return "UPDATE" if exact else "CREATE"
+    return "ASK"
+
+def fetch_contents(api_url, mirror=None, timeout=30):
+    """
+    Returns every content, from a single GET of the contents API or, with
+    mirror set, from a local ContentMirror after an incremental sync. mirror
+    is the database path, or "" for the default one. If the API cannot be
+    reached, the mirror is used as last synced.
+    """
+    if mirror is None:
+        response = requests.get(api_url, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+    with ContentMirror(mirror or None) as content_mirror:
+        try:
+            content_mirror.sync(api_url, timeout=timeout)
+        except requests.RequestException as e:
+            if not len(content_mirror):
+                raise
+            print(f"Warning: could not sync the content mirror ({e}); using it as of "
+                  f"{content_mirror.synced_at}", file=sys.stderr)
+        return list(content_mirror.contents())
+
+def fetch_content(api_url, content_id, timeout=30):
+    """Returns one content as the server has it, from GET /api/contents/:id."""
+    response = requests.get(f"{api_url}/{content_id}", timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+def load_indexes(contents, fuzzy=False, duplicates=False):
+    """
+    Indexes contents (see fetch_contents) by title and, if duplicates is
+    set, by the text of their teleprompter scripts and descriptions.
+
+    Returns:
+        tuple: (TitleIndex, DuplicateIndex or None)
+    """
+    return TitleIndex(contents, fuzzy=fuzzy), DuplicateIndex(contents) if duplicates else None
+
+def find_duplicate(duplicates, parsed_data, threshold):
+    """
+    Returns the existing content most similar to parsed_data as a non-exact
+    match ({"_id", "title", "score", "match": "duplicate"}), or None.
+    """
+    matches = duplicates.query(parsed_data, threshold)
+    if not matches:
+        return None
+    return dict(matches[0], match="duplicate")
+
+def read_document(path):
+    """Reads and parses one .txt or .docx file into a ParsedContent record."""
+    # Compact records, since every document of the pipeline stays queued until uploaded
+    if is_docx(path):
+        return ParsedContent.from_dict(parse_docx(path))
+    if os.path.getsize(path) >= MMAP_THRESHOLD:
+        return ParsedContent.from_dict(parse_mapped_file(path))
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        return parse_content(f.read())
+
+def parse_document(path):
+    """Reads and parses one file. Runs in a worker process of the pipeline."""
+    try:
+        return path, read_document(path), None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+def run_pipeline(args):
+    """
+    Processes every .txt and .docx file in --input-dir without user interaction.
+
+    Parsing runs in a process pool while the main thread resolves titles
+    against a prefetched TitleIndex and hands each document to the uploader's
+    thread pool as soon as it is parsed, so parsing and uploading overlap.
+    With --duplicates, a document whose title matches nothing is also looked
+    up by its text, so a re-titled copy is treated as existing content.
+    With --delta, updates are diffed against the prefetched contents and
+    only the changed fields are sent.
+    """
+    # requests-based uploader, shared with cli.py --upload
+    from parser.uploader import ContentUploader, format_summary, summarize
+
+    paths = sorted(
+        os.path.join(args.input_dir, name) for name in os.listdir(args.input_dir)
+        if name.lower().endswith(INPUT_SUFFIXES) and not name.startswith("~$")
+        and os.path.isfile(os.path.join(args.input_dir, name))
+    )
+    if not paths:
+        print(f"No .txt or .docx files found in {args.input_dir}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        contents = fetch_contents(args.api_url, args.mirror)
+    except Exception as e:
+        print(f"Error fetching contents: {e}", file=sys.stderr)
+        sys.exit(1)
+    index, duplicates = load_indexes(contents, args.fuzzy is not None, args.duplicates is not None)
+    # Only the indexes, and with --delta the documents by _id, are kept from here on
+    lookup = {content["_id"]: content for content in contents}.get if args.delta else None
+    del contents
+    threshold = args.fuzzy if args.fuzzy is not None else 0.7
+    print(f"Loaded {len(index)} existing titles; processing {len(paths)} files", file=sys.stderr)
+
+    decisions = {"CREATE": 0, "UPDATE": 0, "SKIP": 0}
+    parse_failures = []
+
+    def upload_jobs(executor):
+        futures = [executor.submit(parse_document, path) for path in paths]
+        for future in as_completed(futures):
+            path, parsed_data, error = future.result()
+            if error:
+                parse_failures.append(path)
+                print(f"Error processing {path}: {error}", file=sys.stderr)
+                continue
+
+            title = parsed_data.get("title")
+            existing_content = index.find(title, threshold=threshold) if title else None
+            if existing_content is None and duplicates is not None:
+                existing_content = find_duplicate(duplicates, parsed_data, args.duplicates)
+            exact = bool(existing_content) and existing_content["match"] == "exact"
+            action = decide_action(args.policy, existing_content, exact)
+            decisions[action] += 1
+            note = ""
+            if existing_content and existing_content["match"] == "duplicate":
+                note = f", duplicate of {existing_content['_id']} (similarity {existing_content['score']})"
+            print(f"{action:6} {path} ({title}{note})", file=sys.stderr)
+            if action == "SKIP":
+                continue
+            content_id = existing_content["_id"] if action == "UPDATE" else None
+            yield path, parsed_data, content_id
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor, \
+            ContentUploader(args.api_url, concurrency=args.upload_concurrency,
+                            delta=args.delta, lookup=lookup) as uploader:
+        results = uploader.upload_many(upload_jobs(executor))
+    summary = summarize(results, time.perf_counter() - start)
+
+    print(f"\nDecisions: {decisions['CREATE']} create, {decisions['UPDATE']} update, "
+          f"{decisions['SKIP']} skip, {len(parse_failures)} parse errors", file=sys.stderr)
+    print(format_summary(summary, results), file=sys.stderr)
+    if parse_failures or summary["failed"]:
+        sys.exit(1)
+
 def main():
     parser = argparse.ArgumentParser(description="Automatically detect whether to create or update content")
-    parser.add_argument(
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument(
         "--input-file", "-i",
-        required=True,
-        help="Input file with structured text"
+        help="Input .txt or .docx file with structured text"
+    )
+    inputs.add_argument(
+        "--input-dir", "-d",
+        help="Directory of .txt and .docx files to process in parallel without prompting "
+             "(requires --yes or --policy)"
     )
     parser.add_argument(
         "--api-url", "-a",
@@ -67,22 +258,95 @@ def main():
         "--force-update", "-u",
         help="ID of the content to update, ignoring title search"
     )
+    parser.add_argument(
+        "--prefetch-titles",
+        action="store_true",
+        help="Fetch all contents once and match titles locally instead of searching per document"
+    )
+    parser.add_argument(
+        "--fuzzy",
+        type=float,
+        metavar="THRESHOLD",
+        help="With --prefetch-titles, also match similar titles (trigram similarity 0-1, e.g. 0.8)"
+    )
+    parser.add_argument(
+        "--duplicates",
+        nargs="?",
+        type=float,
+        const=DEFAULT_DUPLICATE_THRESHOLD,
+        metavar="THRESHOLD",
+        help="When no title matches, look for an existing content with similar teleprompter and "
+             f"description text (MinHash similarity 0-1, default: {DEFAULT_DUPLICATE_THRESHOLD}); "
+             "implies --prefetch-titles"
+    )
+    parser.add_argument(
+        "--mirror",
+        nargs="?",
+        const="",
+        metavar="DATABASE",
+        help="Keep a local SQLite mirror of the contents (default: ~/.cache/wordexporter/contents.sqlite3), "
+             "sync only what changed since the last run and match against it; implies --prefetch-titles"
+    )
+    parser.add_argument(
+        "--policy",
+        choices=POLICIES,
+        default="ask",
+        help="What to do when a matching content exists (default: ask)"
+    )
+    parser.add_argument(
+        "--yes", "-y",
+        action="store_true",
+        help="Answer yes to every update prompt (same as --policy update)"
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Parser processes for --input-dir (default: number of CPUs)"
+    )
+    parser.add_argument(
+        "--upload-concurrency",
+        type=int,
+        default=8,
+        help="Concurrent upload requests for --input-dir (default: 8)"
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="Update by sending only the fields that differ from the existing content (PATCH) "
+             "instead of the whole document (PUT)"
+    )
 
     args = parser.parse_args()
 
-    # Read input file
-    try:
-        with open(args.input_file, 'r', encoding='utf-8') as f:
-            text = f.read()
-    except Exception as e:
-        print(f"Error al leer el archivo: {e}", file=sys.stderr)
-        sys.exit(1)
+    if args.duplicates is not None:
+        if not 0 < args.duplicates <= 1:
+            print("Error: --duplicates threshold must be between 0 and 1", file=sys.stderr)
+            sys.exit(1)
+        args.prefetch_titles = True
+    if args.mirror is not None:
+        args.prefetch_titles = True
+
+    if args.yes:
+        args.policy = "update"
+    if args.force_create:
+        args.policy = "create"
 
-    # Analizar el texto
+    if args.input_dir:
+        if args.policy == "ask":
+            print("Error: --input-dir runs unattended; pass --yes or --policy", file=sys.stderr)
+            sys.exit(1)
+        if args.force_update:
+            print("Error: --force-update cannot be used with --input-dir", file=sys.stderr)
+            sys.exit(1)
+        run_pipeline(args)
+        return
+
+    # Read and parse the input file as --input-dir does
     try:
-        parsed_data = parse_word_text(text)
+        parsed_data = read_document(args.input_file).to_dict()
     except Exception as e:
-        print(f"Error al analizar el texto: {e}", file=sys.stderr)
+        print(f"Error al leer el archivo: {e}", file=sys.stderr)
         sys.exit(1)
 
     title = parsed_data.get("title", "")
@@ -92,32 +356,70 @@ def main():
     # Determinar si crear o actualizar
     content_id = None
     action = "CREATE"
+    # The matched content as the server has it, for --delta
+    current = None
 
     if args.force_update:
         # Si se especificó un ID para actualizar, usarlo
         content_id = args.force_update
         action = "UPDATE"
-    elif not args.force_create and title:
+    elif args.policy != "create" and title:
         # Search for existing content with that title
         print(f"Searching for content with title: {title}")
-        existing_content = search_content_by_title(args.api_url, title)
+        if args.prefetch_titles:
+            try:
+                contents = fetch_contents(args.api_url, args.mirror)
+            except Exception as e:
+                print(f"Error fetching contents: {e}", file=sys.stderr)
+                sys.exit(1)
+            index, duplicates = load_indexes(contents, args.fuzzy is not None, args.duplicates is not None)
+            existing_content = index.find(title, threshold=args.fuzzy if args.fuzzy is not None else 0.7)
+            if existing_content is None and duplicates is not None:
+                existing_content = find_duplicate(duplicates, parsed_data, args.duplicates)
+                if existing_content:
+                    print(f"No title match; text is {existing_content['score']:.0%} similar to an existing content")
+            exact = bool(existing_content) and existing_content["match"] == "exact"
+            if existing_content:
+                current = next(c for c in contents if c["_id"] == existing_content["_id"])
+        else:
+            existing_content = search_content_by_title(args.api_url, title)
+            exact = bool(existing_content) and existing_content.get("title") == title
+            current = existing_content
 
         if existing_content:
             content_id = existing_content.get("_id")
             print(f"Found existing content with ID: {content_id}")
             print(f"Existing title: {existing_content.get('title')}")
 
-            # Ask the user if they want to update
-            response = input("Would you like to update this content? (y/n): ").lower()
-            if response == 'y' or response == 'yes':
-                action = "UPDATE"
-            else:
+            action = decide_action(args.policy, existing_content, exact)
+            if action == "ASK":
+                # Ask the user if they want to update
+                response = input("Would you like to update this content? (y/n): ").lower()
+                if response == 'y' or response == 'yes':
+                    action = "UPDATE"
+                else:
+                    action = "CREATE"
+            if action == "SKIP":
+                print("Content already exists; skipping (--policy skip).")
+                return
+            if action == "CREATE":
                 print("A new content will be created.")
-                action = "CREATE"
 
     # Generate the appropriate curl command
     # Generar el comando curl adecuado
-    if action == "UPDATE" and content_id:
+    if action == "UPDATE" and content_id and args.delta:
+        if current is None:
+            try:
+                current = fetch_content(args.api_url, content_id)
+            except Exception as e:
+                print(f"Error fetching content {content_id}: {e}", file=sys.stderr)
+                sys.exit(1)
+        curl_command = generate_patch_curl_command(parsed_data, args.api_url, content_id, current)
+        if curl_command is None:
+            print(f"\nContent {content_id} already has every field of the document; nothing to update.")
+            return
+        print(f"\nGenerating command to PATCH the changed fields of content with ID: {content_id}")
+    elif action == "UPDATE" and content_id:
         print(f"\nGenerating command to UPDATE content with ID: {content_id}")
         curl_command = generate_update_curl_command(parsed_data, args.api_url, content_id)
     else:
@@ -134,7 +436,6 @@ def main():
         f.write(curl_command)
 
     # Hacer el archivo ejecutable
-    import os
     os.chmod(output_filename, 0o755)
 
     print(f"\nThe command has been saved to '{output_filename}' and made executable.")
@@ -0,0 +1,98 @@
+"""
+Incremental re-parsing for live previews.
+
+IncrementalParser keeps the section boundaries and a hash of every section
+from the previous parse. On each update it re-splits the text, reuses the
+fields of sections whose hash is unchanged, and only runs the section
+processors (and so save_section_content) for sections that were edited.
+"""
+import hashlib
+import io
+
+try:
+    from .wordexporter import (
+        description_tags, detect_format, empty_parsed_data, numbered_section_fields, numbered_tags,
+        original_section_fields, split_numbered_sections, split_original_sections,
+    )
+except ImportError:
+    from wordexporter import (
+        description_tags, detect_format, empty_parsed_data, numbered_section_fields, numbered_tags,
+        original_section_fields, split_numbered_sections, split_original_sections,
+    )
+
+def section_hash(document_format, header, body):
+    """Returns a digest identifying a section by its format, header and body."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{document_format}\0{header}\0".encode("utf-8"))
+    digest.update("\n".join(body).encode("utf-8"))
+    return digest.digest()
+
+class IncrementalParser:
+    """
+    Re-parses a document, doing work only for the sections that changed.
+
+    After each update, data holds the same result parse_word_text would
+    return for the text, sections holds the (header, hash) boundaries of the
+    document and sections_parsed counts the sections that had to be
+    processed again.
+    """
+
+    def __init__(self):
+        self.data = empty_parsed_data()
+        self.sections = []
+        self.sections_parsed = 0
+        self._section_fields = {}
+
+    def update(self, new_text):
+        """
+        Parses new_text, reusing unchanged sections from the previous update.
+
+        Returns:
+            list: Names of the fields whose value changed, in field order
+        """
+        document_format, lines = detect_format(io.StringIO(new_text))
+        data = empty_parsed_data()
+        sections = []
+        section_fields = {}
+        self.sections_parsed = 0
+
+        if document_format == "numbered":
+            chunks = split_numbered_sections(lines)
+            process = numbered_section_fields
+        elif document_format == "original":
+            # Extract title (first non-empty line)
+            data["title"] = next(lines).strip()
+            chunks = split_original_sections(lines)
+            process = original_section_fields
+        else:
+            chunks = ()
+
+        tags_list_es = ""
+        for header, body in chunks:
+            key = section_hash(document_format, header, body)
+            # A section may set no fields at all; {} is still a cached result
+            fields = section_fields.get(key)
+            if fields is None:
+                fields = self._section_fields.get(key)
+            if fields is None:
+                fields = process(header, body)
+                self.sections_parsed += 1
+            section_fields[key] = fields
+            sections.append((header, key))
+            tags_list_es = fields.get("tagsListEs", tags_list_es)
+            data.update(fields)
+
+        if document_format == "numbered":
+            tags = numbered_tags(tags_list_es)
+            if tags is not None:
+                data["tags"] = tags
+        if document_format is not None and not data["tags"]:
+            data["tags"] = description_tags(data)
+        # Cached section results may be reused later, so hand out a copy
+        data["tags"] = list(data["tags"])
+
+        changed = [field for field, value in data.items() if self.data.get(field) != value]
+        self.data = data
+        self.sections = sections
+        self._section_fields = section_fields
+        return changed
@@ -0,0 +1,165 @@
+"""
+Spanish/English classification of document lines.
+
+The parsers file a line that has no language marker as Spanish when it
+contains a Spanish-only character (¿, á, é, í, ó, ú, ñ) and as English
+otherwise. classify_lines applies that rule to a whole section at once with
+a single compiled character class. score_line weighs the evidence behind a
+line: Spanish characters plus common function words of each language. The
+resulting confidence lets lines filed under the wrong language be reported
+instead of going unnoticed.
+"""
+import re
+
+SPANISH_CHARACTERS = "¿áéíóúñ"
+SPANISH_CHARACTER_PATTERN = re.compile(f"[{SPANISH_CHARACTERS}]")
+# Deletes the Spanish-only characters; the change in length counts them
+SPANISH_CHARACTER_TABLE = str.maketrans("", "", SPANISH_CHARACTERS)
+# Identifiers such as tag1_en stay whole, so they never look like function words
+WORD_PATTERN = re.compile(r"\w+")
+
+_SPANISH_FUNCTION_WORDS = set(
+    "de la que el en y los se del las un por con una su para es al lo como más pero "
+    "sus ya o este porque esta entre cuando muy sin sobre también hasta hay donde "
+    "quien desde todo nos durante todos uno les ni contra otros ese eso ante ellos "
+    "esto antes algunos qué unos yo otro otras otra él tanto esa estos mucho nada "
+    "muchos cual poco ella estar estas algunas algo nosotros nuestro nuestra cómo "
+    "puede tiene son fue ser hacer".split()
+)
+_ENGLISH_FUNCTION_WORDS = set(
+    "the of and to in is you that it was for on are with his they at be this have "
+    "from or had by but all were we when your can said there an each which she "
+    "do how their if will up other about out many then them these so some her would "
+    "make like him into has more could people my than been who its now did get may "
+    "our should does just also".split()
+)
+# Words spelled the same in both languages are no evidence either way
+SPANISH_FUNCTION_WORDS = frozenset(_SPANISH_FUNCTION_WORDS - _ENGLISH_FUNCTION_WORDS)
+ENGLISH_FUNCTION_WORDS = frozenset(_ENGLISH_FUNCTION_WORDS - _SPANISH_FUNCTION_WORDS)
+# Every function word of either language, e.g. to leave out of keywords
+STOP_WORDS = frozenset(_SPANISH_FUNCTION_WORDS | _ENGLISH_FUNCTION_WORDS)
+
+# Minimum confidence for language_warnings to report a line
+DEFAULT_THRESHOLD = 0.75
+
+# Field pairs whose content is prose in a single language
+BILINGUAL_FIELDS = (
+    ("teleprompterEs", "teleprompterEn"),
+    ("videoDescriptionEs", "videoDescriptionEn"),
+    ("tagsListEs", "tagsListEn"),
+    ("pinnedCommentEs", "pinnedCommentEn"),
+    ("tiktokDescriptionEs", "tiktokDescriptionEn"),
+    ("twitterPostEs", "twitterPostEn"),
+    ("facebookDescriptionEs", "facebookDescriptionEn"),
+)
+
+def line_language(line):
+    """Returns "es" if line contains a Spanish-only character, "en" otherwise."""
+    return "es" if SPANISH_CHARACTER_PATTERN.search(line) else "en"
+
+def classify_lines(lines):
+    """
+    Applies the Spanish-character rule to every line of a section.
+
+    Returns:
+        list: "es" or "en" for each line, in order
+    """
+    return ["es" if match else "en" for match in map(SPANISH_CHARACTER_PATTERN.search, lines)]
+
+def language_evidence(text):
+    """
+    Counts the evidence for each language in text.
+
+    Returns:
+        tuple: (Spanish, English) counts. Spanish-only characters and Spanish
+        function words count for Spanish, English function words for English.
+    """
+    text = text.lower()
+    spanish = len(text) - len(text.translate(SPANISH_CHARACTER_TABLE))
+    english = 0
+    for word in WORD_PATTERN.findall(text):
+        if word in SPANISH_FUNCTION_WORDS:
+            spanish += 1
+        elif word in ENGLISH_FUNCTION_WORDS:
+            english += 1
+    return spanish, english
+
+def score_evidence(spanish, english, fallback):
+    """
+    Turns evidence counts into (language, confidence).
+
+    Confidence is the margin between the languages over the total evidence
+    plus one, so it grows with the amount of evidence: a single Spanish word
+    scores 0.5, three 0.75. With no margin the fallback language is
+    returned with a confidence of 0.
+    """
+    if spanish == english:
+        return fallback, 0.0
+    language = "es" if spanish > english else "en"
+    return language, round(abs(spanish - english) / (spanish + english + 1), 3)
+
+def score_line(line):
+    """Returns (language, confidence) for one line."""
+    spanish, english = language_evidence(line)
+    return score_evidence(spanish, english, line_language(line))
+
+def classify_section(lines):
+    """
+    Classifies a section as a whole, pooling the evidence of all its lines.
+
+    Returns:
+        dict: language, confidence and the raw spanish/english counts
+    """
+    lines = list(lines)
+    text = "\n".join(lines)
+    spanish, english = language_evidence(text)
+    language, confidence = score_evidence(spanish, english, line_language(text))
+    return {"language": language, "confidence": confidence, "spanish": spanish, "english": english}
+
+def misattributed_lines(lines, language, threshold=DEFAULT_THRESHOLD):
+    """
+    Finds lines filed under language that read as the other language.
+
+    Returns:
+        list: {"line": index, "text", "language", "confidence"} for each line
+        scoring the other language with at least threshold confidence
+    """
+    flagged = []
+    for index, line in enumerate(lines):
+        detected, confidence = score_line(line)
+        if detected != language and confidence >= threshold:
+            flagged.append({"line": index, "text": line, "language": detected, "confidence": confidence})
+    return flagged
+
+def language_warnings(parsed_data, threshold=DEFAULT_THRESHOLD):
+    """
+    Checks every Spanish and English field of parsed data for lines that
+    appear to be in the other language.
+
+    Returns:
+        list: misattributed_lines entries with an added "field" key
+    """
+    warnings = []
+    for pair in BILINGUAL_FIELDS:
+        for field, language in zip(pair, ("es", "en")):
+            value = parsed_data.get(field)
+            if not value:
+                continue
+            for warning in misattributed_lines(value.split("\n"), language, threshold):
+                warnings.append(dict(warning, field=field))
+    return warnings
+
+def format_warnings(warnings, label=None):
+    """Formats language warnings one per line, truncating long lines."""
+    prefix = f"{label}: " if label else ""
+    names = {"es": "Spanish", "en": "English"}
+    out = []
+    for warning in warnings:
+        text = warning["text"]
+        if len(text) > 60:
+            text = text[:57] + "..."
+        out.append(
+            f"{prefix}{warning['field']} line {warning['line'] + 1} looks "
+            f"{names[warning['language']]} ({warning['confidence']:.2f}): {text}"
+        )
+    return "\n".join(out)
@@ -0,0 +1,246 @@
+"""
+Memory-mapped reading of very large text exports.
+
+MappedText maps a UTF-8 file instead of reading it into one string. It
+finds section headers by scanning the raw bytes with a compiled pattern:
+numbered headers ("3. ...") or the known original-format headers. Only the
+slices that are needed get decoded. Section offsets let callers parse or
+re-parse one section without touching the rest of the file.
+
+Lines are expected to end in "\\n" or "\\r\\n".
+"""
+import io
+import itertools
+import mmap
+import os
+import re
+
+try:
+    from .wordexporter import (
+        NUMBERED_SECTION_PATTERN, ORIGINAL_SECTION_HEADERS, detect_format, empty_parsed_data,
+        match_original_header, numbered_section_fields, numbered_tags, original_section_fields,
+        parse_word_stream, parse_word_text, split_numbered_sections, split_original_sections,
+    )
+except ImportError:
+    from wordexporter import (
+        NUMBERED_SECTION_PATTERN, ORIGINAL_SECTION_HEADERS, detect_format, empty_parsed_data,
+        match_original_header, numbered_section_fields, numbered_tags, original_section_fields,
+        parse_word_stream, parse_word_text, split_numbered_sections, split_original_sections,
+    )
+
+UTF8_BOM = b"\xef\xbb\xbf"
+
+# Bytes decoded at a time by iter_lines, extended to the next line end
+CHUNK_SIZE = 1024 * 1024
+
+# Text files at least this large are parsed through a map rather than read whole
+MMAP_THRESHOLD = 32 * 1024 * 1024
+
+def caseless_bytes(text):
+    """Returns a bytes pattern matching the UTF-8 encoding of text in either letter case."""
+    parts = []
+    for char in text:
+        variants = sorted({char.lower().encode("utf-8"), char.upper().encode("utf-8")})
+        if len(variants) == 1:
+            parts.append(re.escape(variants[0]))
+        else:
+            parts.append(b"(?:" + b"|".join(re.escape(variant) for variant in variants) + b")")
+    return b"".join(parts)
+
+# A line break followed by the leading whitespace the parsers strip (ASCII
+# blanks and the UTF-8 no-break space). Starting with a literal newline lets
+# the regex engine skip quickly to candidate lines.
+LINE_START = rb"\n(?:[ \t\v\f\r]|\xc2\xa0)*"
+
+# Candidate header lines; every candidate is confirmed with the parser's own
+# check on the decoded line, so the byte patterns only need to be permissive
+NUMBERED_HEADER_BYTES = re.compile(LINE_START + rb"\d+\.[^\S\n]*\S")
+ORIGINAL_HEADER_BYTES = re.compile(
+    LINE_START + b"(?:" + b"|".join(caseless_bytes(header) for header, _ in ORIGINAL_SECTION_HEADERS) + b")"
+)
+
+class MappedText:
+    """
+    Read-only memory map of a UTF-8 text file.
+
+    Args:
+        path (str): File to map
+
+    Offsets are byte offsets into the file. Use as a context manager, or
+    call close() when done.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            # mmap cannot map an empty file
+            self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._size() else b""
+        except Exception:
+            self._file.close()
+            raise
+        self.start = len(UTF8_BOM) if self.buffer[:len(UTF8_BOM)] == UTF8_BOM else 0
+        self._format = None
+        self._body_start = None
+
+    def _size(self):
+        self._file.seek(0, io.SEEK_END)
+        return self._file.tell()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self._file.close()
+
+    def decode(self, start, end):
+        """Decodes the bytes between two offsets."""
+        return self.buffer[start:end].decode("utf-8")
+
+    def line_end(self, offset):
+        """Returns the offset just past the line that contains offset."""
+        end = self.buffer.find(b"\n", offset)
+        return len(self.buffer) if end == -1 else end + 1
+
+    def first_line(self):
+        """Returns (start, end) of the first non-empty line, or None for an empty file."""
+        offset = self.start
+        while offset < len(self.buffer):
+            end = self.line_end(offset)
+            if self.decode(offset, end).strip():
+                return offset, end
+            offset = end
+        return None
+
+    @property
+    def format(self):
+        """The document format, detected like the parser does: "numbered", "original" or None."""
+        if self._body_start is None:
+            line = self.first_line()
+            if line is None:
+                self._body_start = len(self.buffer)
+            else:
+                self._format, _ = detect_format([self.decode(*line)])
+                # In the original format the first line is the title, even if
+                # it looks like a header
+                self._body_start = line[0] if self._format == "numbered" else line[1]
+        return self._format
+
+    def header_offsets(self, start=None, end=None):
+        """
+        Yields the start offsets of the section headers between start and end,
+        confirmed against the parser's header check for the document's format.
+        """
+        document_format = self.format
+        if document_format is None:
+            return
+        pattern = NUMBERED_HEADER_BYTES if document_format == "numbered" else ORIGINAL_HEADER_BYTES
+        start = self._body_start if start is None else max(start, self._body_start)
+        end = len(self.buffer) if end is None else end
+        if start >= end:
+            return
+
+        # Matches begin at the newline before each candidate line, so a line
+        # starting exactly at start is checked on its own
+        candidates = (match.start() + 1 for match in pattern.finditer(self.buffer, start, end))
+        if start == self.start or self.buffer[start - 1:start] == b"\n":
+            candidates = itertools.chain([start], candidates)
+
+        for offset in candidates:
+            line = self.decode(offset, self.line_end(offset)).strip()
+            if document_format == "numbered":
+                if NUMBERED_SECTION_PATTERN.match(line):
+                    yield offset
+            elif match_original_header(line.lower()):
+                yield offset
+
+    def sections(self):
+        """
+        Returns the sections of the document in order.
+
+        Returns:
+            list: {"start", "end", "header"} dicts; "header" is the stripped
+            header line. In the original format the first entry covers the
+            title, with a header of None.
+        """
+        if self.format is None:
+            return []
+        starts = list(self.header_offsets())
+        sections = []
+        if self.format == "original":
+            sections.append({"start": self.start, "end": starts[0] if starts else len(self.buffer), "header": None})
+        for index, start in enumerate(starts):
+            end = starts[index + 1] if index + 1 < len(starts) else len(self.buffer)
+            header = self.decode(start, self.line_end(start)).strip()
+            sections.append({"start": start, "end": end, "header": header})
+        return sections
+
+    def section_fields(self, section):
+        """
+        Parses one section on its own.
+
+        Returns:
+            dict: The fields the section sets. A numbered tags section also
+            sets "tags", as it does in a full parse.
+        """
+        lines = io.StringIO(self.decode(section["start"], section["end"]), newline=None)
+        if section["header"] is None:
+            for line in lines:
+                if line.strip():
+                    return {"title": line.strip()}
+            return {}
+        data = {}
+        if self.format == "numbered":
+            # Section by section, without the tags a full parse derives from the descriptions
+            for section_title, body in split_numbered_sections(lines):
+                data.update(numbered_section_fields(section_title, body))
+            tags = numbered_tags(data.get("tagsListEs"))
+            if tags is not None:
+                data["tags"] = tags
+            return data
+        for fields, body in split_original_sections(lines):
+            data.update(original_section_fields(fields, body))
+        return data
+
+    def iter_lines(self, start=None, end=None):
+        """
+        Yields the decoded lines between two offsets, decoding about
+        CHUNK_SIZE bytes at a time. Newlines are translated like a file
+        opened in text mode.
+        """
+        offset = self.start if start is None else start
+        end = len(self.buffer) if end is None else end
+        while offset < end:
+            chunk_end = min(end, self.line_end(min(offset + CHUNK_SIZE, end) - 1))
+            yield from io.StringIO(self.decode(offset, chunk_end), newline=None)
+            offset = chunk_end
+
+    def parse(self):
+        """Parses the whole file, giving the same data as parse_word_text on its text (less any BOM)."""
+        data = empty_parsed_data()
+        data.update(parse_word_stream(self.iter_lines()))
+        return data
+
+def parse_mapped_file(path):
+    """Parses a text file through a memory map instead of reading it whole."""
+    with MappedText(path) as mapped:
+        return mapped.parse()
+
+def parse_text_file(path):
+    """
+    Parses a UTF-8 text file, through a memory map if it is at least
+    MMAP_THRESHOLD bytes and by reading it whole otherwise. A leading
+    UTF-8 BOM is skipped either way.
+    """
+    if os.path.getsize(path) >= MMAP_THRESHOLD:
+        return parse_mapped_file(path)
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return parse_word_text(f.read())
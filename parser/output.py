@@ -0,0 +1,170 @@
+"""
+Streaming record writers for cli.py output.
+
+Each parsed document is written as soon as it is available instead of being
+collected first. Writers flush every `flush_every` records, so a consumer
+reading a file, a pipe or a named pipe (FIFO) can start on the first
+documents while the rest are still being parsed.
+
+Records have the batch shape: {"file": ..., "data": {...}} or
+{"file": ..., "error": "..."}, optionally with an "id" to update, for
+documents split out of a concatenated export their "document" number, and
+the "duplicates" found by cli.py --duplicates.
+"""
+import sys
+
+try:
+    from .serializer import dumps, write_curl_command
+    from .wordexporter import build_create_payload, build_update_payload
+except ImportError:
+    from serializer import dumps, write_curl_command
+    from wordexporter import build_create_payload, build_update_payload
+
+FORMATS = ("jsonl", "json", "curl-script")
+
+DEFAULT_FLUSH_EVERY = 100
+
+# Write buffer for output files; flushes are driven by flush_every
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
+def open_output(path):
+    """
+    Opens path for writing records, or returns stdout if path is None.
+
+    A named pipe is opened like a regular file; the call blocks until a
+    reader opens the other end.
+    """
+    if path is None:
+        return sys.stdout
+    return open(path, "w", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE)
+
+class RecordWriter:
+    """
+    Base class for the output formats.
+
+    Args:
+        stream: Text stream to write to
+        flush_every (int): Flush the stream after this many records; 0 only
+            flushes on close
+    """
+
+    def __init__(self, stream, flush_every=DEFAULT_FLUSH_EVERY):
+        self.stream = stream
+        self.flush_every = flush_every
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, record):
+        """Writes one record, flushing every flush_every records."""
+        self.write_record(record)
+        self.count += 1
+        if self.flush_every and self.count % self.flush_every == 0:
+            self.stream.flush()
+
+    def write_record(self, record):
+        raise NotImplementedError
+
+    def close(self):
+        """Writes any trailer and flushes; the stream itself is left open."""
+        self.stream.flush()
+
+class JsonLinesWriter(RecordWriter):
+    """Writes one compact JSON object per line."""
+
+    def write_record(self, record):
+        self.stream.write(dumps(record, compact=True))
+        self.stream.write("\n")
+
+class JsonArrayWriter(RecordWriter):
+    """
+    Writes the records as the elements of one JSON array.
+
+    Args:
+        indent (int): Indentation of each record; None for one line per record
+    """
+
+    def __init__(self, stream, flush_every=DEFAULT_FLUSH_EVERY, indent=None):
+        super().__init__(stream, flush_every)
+        self.indent = indent
+        self.stream.write("[")
+
+    def write_record(self, record):
+        self.stream.write(",\n" if self.count else "\n")
+        self.stream.write(dumps(record, indent=self.indent, compact=True))
+
+    def close(self):
+        self.stream.write("\n]\n" if self.count else "]\n")
+        super().close()
+
+def record_label(record):
+    """Returns the file of a record, with its document number if it came from a split export."""
+    if "document" in record:
+        return f"{record['file']}#{record['document']}"
+    return record.get("file")
+
+def duplicate_label(entry):
+    """Returns the label of a --duplicates match: a batch label, or a content id and title."""
+    if "file" in entry:
+        return entry["file"]
+    return f"{entry.get('_id')} ({entry.get('title')})"
+
+class CurlScriptWriter(RecordWriter):
+    """
+    Writes a shell script with one curl command per parsed document.
+
+    Records with an "id" become PUT updates of that content; the others
+    become POSTs creating new contents. Failed documents and possible
+    duplicates are listed as comments.
+
+    Args:
+        api_url (str): Base contents URL, e.g. http://localhost:3000/api/contents
+    """
+
+    def __init__(self, stream, flush_every=DEFAULT_FLUSH_EVERY, api_url=None):
+        if not api_url:
+            raise ValueError("The curl-script format needs an API URL")
+        super().__init__(stream, flush_every)
+        self.api_url = api_url.rstrip("/")
+        self.stream.write("#!/bin/sh\n")
+
+    def write_record(self, record):
+        label = record_label(record)
+        if "error" in record:
+            self.stream.write(f"\n# FAILED {label}: {record['error']}\n")
+            return
+        content_id = record.get("id")
+        if content_id:
+            method, url = "PUT", f"{self.api_url}/{content_id}"
+            payload = build_update_payload(record["data"])
+        else:
+            method, url = "POST", self.api_url
+            payload = build_create_payload(record["data"])
+        self.stream.write(f"\n# {label}\n")
+        for entry in record.get("duplicates", ()):
+            self.stream.write(f"# Possible duplicate of {duplicate_label(entry)}, similarity {entry['score']}\n")
+        write_curl_command(self.stream, method, url, payload)
+        self.stream.write("\n")
+
+def make_writer(output_format, stream, flush_every=DEFAULT_FLUSH_EVERY, api_url=None, indent=None):
+    """
+    Returns the writer for an output format.
+
+    Args:
+        output_format (str): "jsonl", "json" or "curl-script"
+        stream: Text stream to write to
+        flush_every (int): Records between flushes
+        api_url (str): API URL for curl-script
+        indent (int): Record indentation for json
+    """
+    if output_format == "jsonl":
+        return JsonLinesWriter(stream, flush_every)
+    if output_format == "json":
+        return JsonArrayWriter(stream, flush_every, indent=indent)
+    if output_format == "curl-script":
+        return CurlScriptWriter(stream, flush_every, api_url=api_url)
+    raise ValueError(f"Unknown output format: {output_format}")
@@ -0,0 +1,147 @@
+"""
+On-disk cache of parse_word_text results, keyed by a hash of the input.
+
+Each entry is a JSON file named after the SHA-256 of the normalized input
+text and PARSER_VERSION, so editing any section or upgrading the parser
+produces a new key. Entries are evicted least-recently-used first once the
+directory grows past its size limit.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+try:
+    from .wordexporter import PARSER_VERSION, parse_word_text
+except ImportError:
+    from wordexporter import PARSER_VERSION, parse_word_text
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+def default_cache_dir():
+    """Returns $XDG_CACHE_HOME/wordexporter, falling back to ~/.cache/wordexporter."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "wordexporter")
+
+def normalize_text(text):
+    """
+    Normalizes input text for hashing.
+
+    The parser strips every line before looking at it, so surrounding
+    whitespace and line-ending style do not change the result.
+    """
+    return "\n".join(line.strip() for line in text.strip().split("\n"))
+
+class ParseCache:
+    """
+    Directory of cached parse results with size-based LRU eviction.
+
+    A hit refreshes the entry's modification time, which eviction uses as
+    its recency order. hits and misses count lookups made through this
+    instance.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._total_bytes = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, normalized_text):
+        digest = hashlib.sha256()
+        digest.update(PARSER_VERSION.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalized_text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key):
+        """Returns the cached result for key, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key, data):
+        """Stores data under key, then evicts old entries if over the size limit."""
+        payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        # Write to a temporary file and rename it into place, so concurrent
+        # readers (e.g. batch worker processes) never see a partial entry.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        if self._total_bytes is None:
+            self._total_bytes = self._scan_size()
+        else:
+            self._total_bytes += len(payload)
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def parse(self, text):
+        """Returns parse_word_text for text, served from the cache when possible."""
+        normalized = normalize_text(text)
+        key = self.key(normalized)
+        data = self.get(key)
+        if data is not None:
+            self.hits += 1
+            return data
+        self.misses += 1
+        data = parse_word_text(normalized)
+        self.put(key, data)
+        return data
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, max_bytes=None):
+        """Removes least-recently-used entries until the cache fits in max_bytes."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self._total_bytes = total
+
+    def clear(self):
+        """Removes every cached entry."""
+        self.evict(max_bytes=0)
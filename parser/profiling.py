@@ -0,0 +1,191 @@
+"""
+Opt-in profiling of the parser's stages.
+
+The parser marks its stages with stage() blocks: format detection, line
+splitting, section matching, language heuristics, tag derivation and
+truncation. While a Profile is active (see profiling()), each block is
+timed; otherwise stage() costs one context variable lookup. Because the
+timing points are in the parser's own functions, they are counted whichever
+module calls them, e.g. incremental or mmap_reader.
+
+Times are exclusive: time spent in a stage called from inside another is
+counted once, for the inner stage. Callers add their own stages the same
+way, e.g. "read" around reading a file and "parse" around the whole parse,
+whose exclusive time is the work no finer stage covers (joining lines,
+building the result). Original-format headers are matched line by line
+while splitting, so that matching is part of "split".
+
+Each section produced by the splitters is also counted, with the UTF-8
+bytes of its body, under its numbered title or its original-format field.
+
+The active profile is held in a context variable, so each thread (and
+each asyncio task) profiles into its own profile, or none.
+"""
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+# Report order; stages added by callers that are not listed here come last
+STAGES = ("read", "detect", "split", "match", "language", "tags", "truncate", "parse", "duplicates", "output")
+
+# The profile receiving measurements in the current context, or None
+_active = ContextVar("active_profile", default=None)
+
+# Returned by stage() when nothing is profiled
+_UNTIMED = nullcontext()
+
+class Profile:
+    """
+    Accumulates exclusive time per stage and byte counts per section.
+
+    Use summary() for a JSON-compatible dict, merge() to add a summary from
+    another process, and format_profile() for a table.
+    """
+
+    def __init__(self):
+        self.documents = 0
+        self.seconds = {}
+        self.calls = {}
+        self.sections = {}
+        # Time spent in nested stages, one entry per open stage
+        self._children = []
+
+    def begin(self):
+        """Opens a stage and returns its start time, to pass to end()."""
+        self._children.append(0.0)
+        return time.perf_counter()
+
+    def end(self, name, start, call=True):
+        """Closes the innermost stage, charging its exclusive time to name."""
+        elapsed = time.perf_counter() - start
+        children = self._children.pop()
+        if self._children:
+            self._children[-1] += elapsed
+        self.seconds[name] = self.seconds.get(name, 0.0) + elapsed - children
+        if call:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    @contextmanager
+    def stage(self, name):
+        """Times the body of a with block as stage name."""
+        start = self.begin()
+        try:
+            yield self
+        finally:
+            self.end(name, start)
+
+    def add_section(self, label, size):
+        count, total = self.sections.get(label, (0, 0))
+        self.sections[label] = (count + 1, total + size)
+
+    def summary(self):
+        """
+        Returns the measurements as a dict:
+        {"documents", "seconds", "stages": {name: {"calls", "seconds"}},
+        "sections": {label: {"count", "bytes"}}}.
+        """
+        names = [name for name in STAGES if name in self.seconds]
+        names += sorted(name for name in self.seconds if name not in STAGES)
+        return {
+            "documents": self.documents,
+            "seconds": sum(self.seconds.values()),
+            "stages": {
+                name: {"calls": self.calls.get(name, 0), "seconds": self.seconds[name]} for name in names
+            },
+            "sections": {
+                label: {"count": count, "bytes": size}
+                for label, (count, size) in sorted(self.sections.items())
+            },
+        }
+
+    def merge(self, summary):
+        """Adds the measurements of a summary(), e.g. one returned by a worker process."""
+        self.documents += summary["documents"]
+        for name, stage_summary in summary["stages"].items():
+            self.seconds[name] = self.seconds.get(name, 0.0) + stage_summary["seconds"]
+            self.calls[name] = self.calls.get(name, 0) + stage_summary["calls"]
+        for label, section in summary["sections"].items():
+            count, total = self.sections.get(label, (0, 0))
+            self.sections[label] = (count + section["count"], total + section["bytes"])
+
+def active_profile():
+    """Returns the profile receiving measurements in the current context, or None."""
+    return _active.get()
+
+def stage(name):
+    """Times a with block as stage name on the active profile; does nothing without one."""
+    profile = _active.get()
+    if profile is None:
+        return _UNTIMED
+    return profile.stage(name)
+
+def section_label(key):
+    """Returns the report label of a section: its numbered title, or its original-format field."""
+    if isinstance(key, tuple):
+        field = key[0]
+        return field[:-2] if field.endswith("Es") else field
+    return key
+
+def timed_sections(name, sections):
+    """
+    Returns the (key, body) pairs of a splitter, timing the production of
+    each section as stage name and counting the bytes of its body on the
+    active profile. Without one, returns sections as they are.
+    """
+    profile = _active.get()
+    if profile is None:
+        return sections
+    return _timed_sections(profile, name, sections)
+
+def _timed_sections(profile, name, sections):
+    counted = False
+    while True:
+        start = profile.begin()
+        try:
+            key, body = next(sections)
+        except StopIteration:
+            return
+        finally:
+            # The splitter counts as one call however many sections it yields
+            profile.end(name, start, call=not counted)
+            counted = True
+        profile.add_section(section_label(key), sum(len(line.encode("utf-8")) + 1 for line in body))
+        yield key, body
+
+@contextmanager
+def profiling(profile):
+    """
+    Makes profile the active profile for the duration of a with block.
+
+    Profiles nest: an inner profile receives the measurements until its
+    block ends, then the outer one is active again. With profile None the
+    block runs unprofiled.
+    """
+    if profile is None:
+        yield None
+        return
+    token = _active.set(profile)
+    try:
+        yield profile
+    finally:
+        _active.reset(token)
+
+def format_profile(summary):
+    """Formats a summary() as a table of stages and a table of sections."""
+    total = summary["seconds"] or 1.0
+    lines = [
+        f"Profile of {summary['documents']} documents, {summary['seconds']:.4f} s",
+        f"{'stage':<12} {'calls':>9} {'seconds':>10} {'share':>7}",
+    ]
+    for name, stage_summary in summary["stages"].items():
+        lines.append(
+            f"{name:<12} {stage_summary['calls']:>9} {stage_summary['seconds']:>10.4f} "
+            f"{stage_summary['seconds'] / total:>7.1%}"
+        )
+    if summary["sections"]:
+        width = max(len("section"), *(len(label) for label in summary["sections"]))
+        lines.append("")
+        lines.append(f"{'section':<{width}} {'count':>7} {'bytes':>12}")
+        for label, section in summary["sections"].items():
+            lines.append(f"{label:<{width}} {section['count']:>7} {section['bytes']:>12}")
+    return "\n".join(lines)
@@ -0,0 +1,86 @@
+"""
+JSON serialization backend for payloads, CLI output and curl commands.
+
+orjson is used when it is installed, and the standard library json module
+otherwise. Both produce identical text for the indented and compact styles
+used here. The stdlib default style (", " and ": " separators) has no orjson
+equivalent, so it always goes through json.
+
+write_curl_command writes a curl command straight to a stream piece by
+piece. The only full-size string it builds is the shell-escaped JSON body,
+so the command is never assembled in memory first.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKENDS = ("orjson", "json")
+
+# Backend used by dumps; see set_backend
+backend = "orjson" if orjson is not None else "json"
+
+def available_backends():
+    """Returns the names of the backends that can be used in this environment."""
+    return [name for name in BACKENDS if name == "json" or orjson is not None]
+
+def set_backend(name):
+    """
+    Selects the serializer backend.
+
+    Args:
+        name (str): "orjson" or "json"
+
+    Raises:
+        ValueError: If the backend is unknown or not installed
+    """
+    global backend
+    if name not in available_backends():
+        raise ValueError(f"JSON backend not available: {name} (available: {', '.join(available_backends())})")
+    backend = name
+
+def dumps(obj, indent=None, compact=False):
+    """
+    Serializes obj to a JSON string with non-ASCII characters kept as is.
+
+    Args:
+        obj: Object to serialize
+        indent (int): Indentation; None for single-line output
+        compact (bool): With no indent, leave out the spaces after ","
+            and ":" (the batch JSON Lines style)
+
+    Returns:
+        str: The JSON text
+    """
+    if backend == "orjson" and (indent == 2 or (indent is None and compact)):
+        option = orjson.OPT_INDENT_2 if indent else 0
+        try:
+            return orjson.dumps(obj, option=option).decode("utf-8")
+        except TypeError:
+            # e.g. lone surrogates or non-str keys, which json accepts
+            pass
+    separators = (",", ":") if compact and indent is None else None
+    return json.dumps(obj, indent=indent, ensure_ascii=False, separators=separators)
+
+def shell_quote_body(text):
+    """Escapes text for use inside a single-quoted shell string (' becomes '\\'')."""
+    if "'" not in text:
+        return text
+    return text.replace("'", "'\\''")
+
+def curl_command_parts(method, url, payload):
+    """Yields the pieces of a curl command sending payload as indented JSON."""
+    yield f"curl -X {method} {url} \\\n  -H \"Content-Type: application/json\" \\\n  -d '"
+    yield shell_quote_body(dumps(payload, indent=2))
+    yield "'"
+
+def curl_command(method, url, payload):
+    """Returns a curl command sending payload as indented JSON."""
+    return "".join(curl_command_parts(method, url, payload))
+
+def write_curl_command(stream, method, url, payload):
+    """Writes a curl command sending payload as indented JSON to stream."""
+    for part in curl_command_parts(method, url, payload):
+        stream.write(part)
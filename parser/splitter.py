@@ -0,0 +1,202 @@
+"""
+Splits concatenated exports into their individual documents.
+
+Exporting several videos at once produces one file with the documents one
+after another. The boundaries are found from the section headers alone:
+
+- Numbered format: numbering restarts, i.e. a "1." header after the first
+  line of the document.
+- Original format: a second "Teleprompter" header. A document has one
+  teleprompter section, so the next document starts at its title: the
+  last non-empty line before that header, which must follow a blank line.
+- An original document after a numbered one: a "Teleprompter" header with
+  such a title line in front of it.
+- A numbered document after an original one: a "1." line after a blank
+  line whose title is a known numbered section ("1. Script de
+  Teleprompter"). Other "1." lines are ordinary text in the original format.
+
+Each document's format is detected from its own first line, as the parser
+does.
+
+The scan works on a str or on bytes (including a mmap), with offsets in the
+same units, so a large export can be split through MappedText and the
+resulting spans parsed independently, e.g. across a process pool.
+"""
+import heapq
+import io
+import re
+
+try:
+    from .wordexporter import (
+        NUMBERED_MATCHER, NUMBERED_SECTION_PATTERN, ORIGINAL_SECTION_FIELDS, detect_format,
+        match_original_header, match_section_row,
+    )
+    from .mmap_reader import LINE_START, MappedText, caseless_bytes
+except ImportError:
+    from wordexporter import (
+        NUMBERED_MATCHER, NUMBERED_SECTION_PATTERN, ORIGINAL_SECTION_FIELDS, detect_format,
+        match_original_header, match_section_row,
+    )
+    from mmap_reader import LINE_START, MappedText, caseless_bytes
+
+TELEPROMPTER_FIELDS = ORIGINAL_SECTION_FIELDS["teleprompter"]
+
+# Candidate header lines, matched from the newline before them. As in
+# mmap_reader, candidates are confirmed on the decoded, stripped line.
+NUMBERED_START_TEXT = re.compile(r"\n[^\S\n]*\d+\.[^\S\n]*\S")
+TELEPROMPTER_START_TEXT = re.compile(r"\n[^\S\n]*teleprompter", re.IGNORECASE)
+NUMBERED_START_BYTES = re.compile(LINE_START + rb"\d+\.[^\S\n]*\S")
+TELEPROMPTER_START_BYTES = re.compile(LINE_START + caseless_bytes("teleprompter"))
+
+NUMBERED = "numbered"
+TELEPROMPTER = "teleprompter"
+
+class DocumentScanner:
+    """
+    Finds document boundaries in a str or a bytes-like buffer.
+
+    Args:
+        buffer: str, bytes or mmap holding the export (UTF-8 if bytes)
+        start (int): Offset to start from, e.g. past a byte order mark
+        end (int): Offset to stop at (default: the end of the buffer)
+    """
+
+    def __init__(self, buffer, start=0, end=None):
+        self.buffer = buffer
+        self.start = start
+        self.end = len(buffer) if end is None else end
+        if isinstance(buffer, str):
+            self.newline = "\n"
+            self.patterns = {NUMBERED: NUMBERED_START_TEXT, TELEPROMPTER: TELEPROMPTER_START_TEXT}
+        else:
+            self.newline = b"\n"
+            self.patterns = {NUMBERED: NUMBERED_START_BYTES, TELEPROMPTER: TELEPROMPTER_START_BYTES}
+
+    def line_end(self, offset):
+        """Returns the offset just past the line that contains offset."""
+        end = self.buffer.find(self.newline, offset, self.end)
+        return self.end if end == -1 else end + 1
+
+    def line(self, offset):
+        """Returns the stripped text of the line starting at offset."""
+        line = self.buffer[offset:self.line_end(offset)]
+        if not isinstance(line, str):
+            line = line.decode("utf-8")
+        return line.strip()
+
+    def first_line(self, offset):
+        """Returns the start of the first non-empty line at or after offset, or None."""
+        while offset < self.end:
+            if self.line(offset):
+                return offset
+            offset = self.line_end(offset)
+        return None
+
+    def previous_line(self, offset, floor):
+        """Returns the start of the last non-empty line that ends before offset, or None."""
+        end = offset - 1
+        while end > floor:
+            found = self.buffer.rfind(self.newline, floor, end)
+            line_start = floor if found == -1 else found + 1
+            if self.line(line_start):
+                return line_start
+            end = line_start - 1
+        return None
+
+    def follows_blank_line(self, offset, floor):
+        """Returns True if the line before the one starting at offset is blank."""
+        if offset <= floor:
+            return False
+        found = self.buffer.rfind(self.newline, floor, offset - 1)
+        return not self.line(floor if found == -1 else found + 1)
+
+    def candidates(self, offset):
+        """Yields (offset, kind) for every candidate header line after the one at offset, in order."""
+        search_from = self.line_end(offset) - 1
+
+        def matches(kind, pattern):
+            for match in pattern.finditer(self.buffer, search_from, self.end):
+                yield match.start() + 1, kind
+
+        return heapq.merge(*(matches(kind, pattern) for kind, pattern in self.patterns.items()))
+
+    def document_starts(self):
+        """
+        Yields the offset of the first non-empty line of every document, in
+        order. An empty buffer has no documents.
+        """
+        document_start = self.first_line(self.start)
+        if document_start is None:
+            return
+        yield document_start
+        document_format, _ = detect_format([self.line(document_start)])
+        seen_teleprompter = False
+
+        for offset, kind in self.candidates(document_start):
+            line = self.line(offset)
+            if kind == NUMBERED:
+                if not NUMBERED_SECTION_PATTERN.match(line):
+                    continue
+                number, title = line.split(".", 1)
+                if int(number) != 1:
+                    continue
+                if document_format == "original" and not (
+                    self.follows_blank_line(offset, document_start)
+                    and match_section_row(NUMBERED_MATCHER, title.strip().lower())
+                ):
+                    continue
+                new_start = offset
+            else:
+                if match_original_header(line.lower()) != TELEPROMPTER_FIELDS:
+                    continue
+                if document_format == "original" and not seen_teleprompter:
+                    seen_teleprompter = True
+                    continue
+                new_start = self.previous_line(offset, document_start)
+                if new_start is None or new_start == document_start or match_original_header(self.line(new_start).lower()):
+                    continue
+                # A title stands on its own after the previous document; a
+                # stray "teleprompter" line right after text is not a boundary
+                if not self.follows_blank_line(new_start, document_start):
+                    continue
+
+            yield new_start
+            document_start = new_start
+            document_format, _ = detect_format([self.line(document_start)])
+            # The title of an original document is followed by its teleprompter header
+            seen_teleprompter = kind == TELEPROMPTER
+
+    def spans(self):
+        """
+        Returns the (start, end) offsets of every document. The spans are
+        contiguous: each ends where the next begins, and the last ends at
+        the end of the buffer.
+        """
+        starts = list(self.document_starts())
+        return list(zip(starts, starts[1:] + [self.end]))
+
+def document_spans(buffer, start=0, end=None):
+    """Returns the (start, end) offsets of the documents in a str or bytes buffer."""
+    return DocumentScanner(buffer, start, end).spans()
+
+def split_documents(text):
+    """
+    Splits the text of a concatenated export into one string per document.
+
+    Returns:
+        list: The documents' texts; parsing each one gives the same data as
+        parsing that document on its own
+    """
+    return [text[start:end] for start, end in document_spans(text)]
+
+def file_document_spans(path):
+    """Returns the byte (start, end) spans of the documents in a UTF-8 text file, scanned through a map."""
+    with MappedText(path) as mapped:
+        return document_spans(mapped.buffer, mapped.start)
+
+def read_span(path, start, end):
+    """Returns the text between two byte offsets of a file, with newlines translated like text mode."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return io.StringIO(data.decode("utf-8"), newline=None).read()
@@ -0,0 +1,41 @@
+"""
+Shared fixtures: local stub servers standing in for the API.
+
+The serve fixture runs a request handler from parser.tests.helpers on a
+free local port, and contents_api serves a ContentsApi that starts with no
+contents.
+"""
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from parser.tests.helpers import CONTENTS_PATH, ContentsApi
+
+@pytest.fixture
+def serve():
+    """
+    Returns serve(handler, path="", **attributes), which runs a fresh
+    subclass of handler with the given class attributes and returns it, with
+    url set to the server's address followed by path.
+    """
+    servers = []
+
+    def start(handler, path="", **attributes):
+        handler = type(handler.__name__, (handler,), {"requests": [], **attributes})
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        handler.url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+        return handler
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture
+def contents_api(serve):
+    """A ContentsApi with no contents; its url is the /api/contents URL."""
+    return serve(ContentsApi, CONTENTS_PATH, contents=[], writes=[])
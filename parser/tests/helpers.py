@@ -0,0 +1,158 @@
+"""
+Helpers shared by the test modules.
+
+run_cli runs the wordexporter CLI in a subprocess with the parse cache
+kept out of the user's home directory, and write_documents writes small
+numbered-format documents for it to parse. run_pipeline runs the
+auto-detect example over a directory of three documents, one per kind of
+title match.
+
+StubApi is the request handler behind the stub API servers that the serve
+fixture in conftest.py runs. It records every request and hands it to
+route(), which a test module overrides with just the routes it needs.
+ContentsApi is a stub of /api/contents itself.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+
+CONTENTS_PATH = "/api/contents"
+
+CLI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cli.py")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DOCUMENT = """1. Teleprompter Script (English)
+Batch document number {n}.
+
+2. Attractive Title (SEO)
+Español: Documento {n}
+"""
+
+PIPELINE_DOCUMENT = """1. Teleprompter Script (English)
+Pipeline document.
+
+2. Attractive Title (SEO)
+Español: {title}
+"""
+
+def run_cli(*args):
+    # Keep the parse cache out of the user's home directory
+    with tempfile.TemporaryDirectory() as cache_home:
+        env = dict(os.environ, XDG_CACHE_HOME=cache_home)
+        return subprocess.run(
+            [sys.executable, CLI, *args],
+            capture_output=True, text=True, encoding="utf-8", env=env
+        )
+
+def write_documents(directory, count):
+    paths = []
+    for n in range(count):
+        path = os.path.join(directory, f"doc{n:02d}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(DOCUMENT.format(n=n))
+        paths.append(path)
+    return paths
+
+def run_pipeline(api_url, *args):
+    with tempfile.TemporaryDirectory() as directory:
+        for n, title in enumerate(["Documento existente", "Documento casi existente", "Documento nuevo"]):
+            with open(os.path.join(directory, f"doc{n}.txt"), "w", encoding="utf-8") as f:
+                f.write(PIPELINE_DOCUMENT.format(title=title))
+        return subprocess.run(
+            [sys.executable, "-m", "parser.examples.auto_detect_update",
+             "--input-dir", directory, "-a", api_url, "--jobs", "2", *args],
+            capture_output=True, text=True, encoding="utf-8", cwd=REPO_ROOT,
+            stdin=subprocess.DEVNULL
+        )
+
+class StubApi(BaseHTTPRequestHandler):
+    """
+    Records each request in requests as (method, path, query, payload) and
+    answers it through route().
+
+    serve() gives every test its own subclass, so class attributes such as
+    requests start empty in each test.
+    """
+    requests = []
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def respond(self, status, body, close=False):
+        """Answers with body as JSON. close hangs up afterwards without announcing it."""
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        self.close_connection = close
+
+    def route(self, method, path, query, payload):
+        """
+        Handles one request.
+
+        Returns:
+            tuple: (status, body) to answer with JSON, or None if the route
+            wrote its own response
+        """
+        return 404, {"message": "Not found"}
+
+    def _dispatch(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length)) if length else None
+        query = parse_qs(url.query)
+        with self.lock:
+            self.requests.append((self.command, url.path, query, payload))
+        try:
+            answer = self.route(self.command, url.path, query, payload)
+            if answer is not None:
+                self.respond(*answer)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped waiting, e.g. after its own timeout
+            self.close_connection = True
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _dispatch
+
+class ContentsApi(StubApi):
+    """
+    Stub of /api/contents holding the contents list.
+
+    GET lists the contents, filtered by ?updatedSince as the server does, and
+    GET /:id returns one. POST, PUT and PATCH answer like the server and are
+    recorded in writes as (method, path, title), or for PATCH as (method,
+    path, sorted field names).
+    """
+    contents = []
+    writes = []
+
+    def route(self, method, path, query, payload):
+        content_id = path[len(CONTENTS_PATH) + 1:] or None
+        if method == "GET" and content_id is None:
+            contents = self.contents
+            if "updatedSince" in query:
+                since = query["updatedSince"][0]
+                contents = [content for content in contents if content["updatedAt"][:19] >= since[:19]]
+            return 200, contents
+        if method == "GET":
+            for content in self.contents:
+                if content["_id"] == content_id:
+                    return 200, content
+            return 404, {"message": "Content not found"}
+        if method == "POST":
+            self.writes.append(("POST", path, payload["title"]))
+            return 201, {"_id": "new", **payload}
+        if method == "PUT":
+            self.writes.append(("PUT", path, payload["title"]))
+            return 200, payload
+        if method == "PATCH":
+            self.writes.append(("PATCH", path, sorted(payload)))
+            return 200, {"_id": content_id, **payload}
+        return super().route(method, path, query, payload)
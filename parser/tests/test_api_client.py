@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Tests for the asyncio API client (api_client): streaming list decoding,
+connection pooling, per-host limits, timeouts and the resource methods.
+"""
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from parser.api_client import ApiError, AsyncApiClient, JsonArrayDecoder
+from parser.tests.helpers import StubApi
+
+ITEMS = [{"_id": f"id{n}", "title": f"Título {n} — ñ", "tags": ["a", "b"], "n": n} for n in range(20)]
+
+class ClientApi(StubApi):
+    """
+    Keep-alive server that tracks the connections used and the peak number
+    of requests in flight, with routes for slow, hanging, closing, dropped,
+    streamed and bodiless responses.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def route(self, method, path, query, payload):
+        cls = type(self)
+        with self.lock:
+            cls.connections.add(self.client_address)
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        try:
+            if path == "/slow":
+                time.sleep(0.05)
+                return 200, []
+            if path == "/hang":
+                time.sleep(1)
+                return 200, []
+            if path == "/closing":
+                # Close without announcing it, like a server dropping idle keep-alive connections
+                self.respond(200, {"ok": True}, close=True)
+                return None
+            if path == "/drop":
+                # Read the request, then hang up without answering
+                self.close_connection = True
+                return None
+            if path == "/stream":
+                self._stream()
+                return None
+            if path == "/empty":
+                # No body and no Content-Length, on a connection that stays open
+                self.send_response(int(query["status"][0]))
+                self.end_headers()
+                return None
+            if path.endswith("/missing"):
+                return 404, {"message": "Content not found"}
+            if method == "GET" and path.count("/") == 2 or path.endswith(("/search", "/kanban")):
+                return 200, ITEMS
+            return 200, {"_id": path.rsplit("/", 1)[-1], "method": method, **(payload or {})}
+        finally:
+            with self.lock:
+                cls.active -= 1
+
+    def _stream(self):
+        # Chunked list whose second half is only sent once the client has seen the first item
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        text = json.dumps(ITEMS).encode("utf-8")
+        middle = len(text) // 2
+        for part in (text[:middle], text[middle:]):
+            self.wfile.write(f"{len(part):x}\r\n".encode() + part + b"\r\n")
+            self.wfile.flush()
+            self.release_stream.wait(5)
+        self.wfile.write(b"0\r\n\r\n")
+
+    do_HEAD = StubApi._dispatch
+
+@pytest.fixture
+def stub(serve):
+    stub = serve(ClientApi, connections=set(), active=0, peak=0, release_stream=threading.Event())
+    yield stub
+    stub.release_stream.set()
+
+def test_array_decoder_any_chunking():
+    data = json.dumps([*ITEMS, 12345, -1.5e3, "x]}", None, [], {"a": [1, {"b": "}"}]}], ensure_ascii=False)
+    encoded = data.encode("utf-8")
+    for size in (1, 3, 7, 64, len(encoded)):
+        decoder = JsonArrayDecoder()
+        items = []
+        for start in range(0, len(encoded), size):
+            items.extend(decoder.feed(encoded[start:start + size]))
+        items.extend(decoder.feed(b"", final=True))
+        assert items == json.loads(data), size
+
+    assert JsonArrayDecoder().feed(b" [ ] ", final=True) == []
+    for bad in (b'[{"a": 1}', b'{"a": 1}', b"[1 2]", b"[1] 2"):
+        with pytest.raises(ValueError):
+            JsonArrayDecoder().feed(bad, final=True)
+
+def test_resources(stub):
+    async def main():
+        async with AsyncApiClient(stub.url) as api:
+            assert await api.contents.list(published=True, updated_since="2024-01-01") == ITEMS
+            assert [content["n"] async for content in api.contents.iter()] == list(range(20))
+            assert (await api.contents.create({"title": "Nuevo"}))["method"] == "POST"
+            assert (await api.contents.update("abc", {"title": "Otro"}))["_id"] == "abc"
+            await api.contents.patch("abc", {"publishedEs": True})
+            await api.contents.delete("abc")
+            assert await api.contents.search("ñ") == ITEMS
+            await api.contents.kanban()
+            await api.contents.move_kanban("abc", "finalizado")
+            await api.prompts.list(tag="ia", sort="title")
+            await api.tasks.set_status("t1", "done")
+            with pytest.raises(ApiError) as error:
+                await api.contents.get("missing")
+            assert error.value.status == 404 and error.value.message == "Content not found"
+
+    asyncio.run(main())
+    assert [request[:2] for request in stub.requests] == [
+        ("GET", "/api/contents"), ("GET", "/api/contents"), ("POST", "/api/contents"),
+        ("PUT", "/api/contents/abc"), ("PATCH", "/api/contents/abc"), ("DELETE", "/api/contents/abc"),
+        ("GET", "/api/contents/search"), ("GET", "/api/contents/kanban"), ("PUT", "/api/contents/kanban/abc"),
+        ("GET", "/api/prompts"), ("PATCH", "/api/tasks/t1"), ("GET", "/api/contents/missing"),
+    ]
+    assert stub.requests[0][2] == {"published": ["true"], "updatedSince": ["2024-01-01"]}
+    assert stub.requests[6][2] == {"q": ["ñ"]}
+    assert stub.requests[8][3] == {"status": "finalizado"}
+    assert stub.requests[9][2] == {"tag": ["ia"], "sort": ["title"]}
+    # Every request, including the error, went over one kept-alive connection
+    assert len(stub.connections) == 1
+
+def test_limit_per_host_and_pooling(stub):
+    async def main():
+        async with AsyncApiClient(stub.url, limit_per_host=4) as api:
+            await asyncio.gather(*(api.get_list("/slow") for _ in range(40)))
+
+    asyncio.run(main())
+    assert len(stub.requests) == 40
+    assert stub.peak <= 4
+    assert len(stub.connections) <= 4
+
+def test_items_arrive_while_streaming(stub):
+    async def main():
+        async with AsyncApiClient(stub.url) as api:
+            items = []
+            async for item in api.iter_list("/stream"):
+                items.append(item)
+                stub.release_stream.set()
+            return items
+
+    assert asyncio.run(main()) == ITEMS
+
+def test_timeout_and_closed_connections(stub):
+    async def main():
+        async with AsyncApiClient(stub.url, timeout=0.2) as api:
+            with pytest.raises(asyncio.TimeoutError):
+                await api.get_list("/hang")
+            # The server closes each connection after responding; the pool recovers
+            for _ in range(5):
+                assert await api.request("GET", "/closing") == {"ok": True}
+
+    asyncio.run(main())
+
+def test_bodiless_responses_keep_the_connection(stub):
+    async def main():
+        async with AsyncApiClient(stub.url, timeout=0.5) as api:
+            for method, status in (("GET", 204), ("GET", 304), ("HEAD", 200), ("GET", 204)):
+                assert await api.request(method, "/empty", {"status": status}) is None
+
+    asyncio.run(main())
+    assert len(stub.connections) == 1
+
+def test_dropped_connection_resends_only_idempotent_requests(stub):
+    async def main():
+        async with AsyncApiClient(stub.url) as api:
+            for method in ("GET", "POST"):
+                # Warm the pool so the request goes over a reused connection
+                await api.request("GET", "/api/contents")
+                with pytest.raises(ConnectionError):
+                    await api.request(method, "/drop", payload={"title": "x"} if method == "POST" else None)
+
+    asyncio.run(main())
+    drops = [request[0] for request in stub.requests if request[1] == "/drop"]
+    # The GET was resent on a new connection; the POST, which may have been applied, was not
+    assert drops == ["GET", "GET", "POST"]
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for the unattended auto-detect pipeline (--input-dir with --policy/--yes).
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+pytest.importorskip("requests")
+
+from parser.bench.corpus import write_docx
+from parser.examples.auto_detect_update import decide_action
+from parser.tests.helpers import PIPELINE_DOCUMENT, REPO_ROOT, run_pipeline
+
+EXISTING = [
+    {"_id": "exact-id", "title": "Documento existente"},
+    {"_id": "fuzzy-id", "title": "Documento casi existente!!"},
+]
+
+@pytest.fixture
+def api(contents_api):
+    contents_api.contents = EXISTING
+    return contents_api
+
+def test_exact_only_policy(api):
+    result = run_pipeline(api.url, "--policy", "exact-only", "--fuzzy", "0.6")
+    assert result.returncode == 0, result.stderr
+    assert sorted(api.writes) == [
+        ("POST", "/api/contents", "Documento casi existente"),
+        ("POST", "/api/contents", "Documento nuevo"),
+        ("PUT", "/api/contents/exact-id", "Documento existente"),
+    ]
+
+def test_yes_updates_fuzzy_matches(api):
+    result = run_pipeline(api.url, "--yes", "--fuzzy", "0.6")
+    assert result.returncode == 0, result.stderr
+    assert sorted(api.writes) == [
+        ("POST", "/api/contents", "Documento nuevo"),
+        ("PUT", "/api/contents/exact-id", "Documento existente"),
+        ("PUT", "/api/contents/fuzzy-id", "Documento casi existente"),
+    ]
+
+def test_skip_policy(api):
+    result = run_pipeline(api.url, "--policy", "skip")
+    assert result.returncode == 0, result.stderr
+    # Without --fuzzy only the exact title counts as existing
+    assert sorted(api.writes) == [
+        ("POST", "/api/contents", "Documento casi existente"),
+        ("POST", "/api/contents", "Documento nuevo"),
+    ]
+    assert "Decisions: 2 create, 0 update, 1 skip, 0 parse errors" in result.stderr
+
+def test_delta_sends_only_changed_fields(api):
+    api.contents = [
+        {"_id": "exact-id", "title": "Documento existente", "teleprompterEn": "Pipeline document."},
+        {"_id": "fuzzy-id", "title": "Documento casi existente!!", "teleprompterEn": "Old script."},
+    ]
+    result = run_pipeline(api.url, "--yes", "--fuzzy", "0.6", "--delta")
+    assert result.returncode == 0, result.stderr
+    # The exact match already has every field of its document: nothing is sent
+    assert sorted(api.writes) == [
+        ("PATCH", "/api/contents/fuzzy-id", ["teleprompterEn", "title"]),
+        ("POST", "/api/contents", "Documento nuevo"),
+    ]
+    assert "Delta updates sent" in result.stderr and "1 unchanged" in result.stderr
+
+def test_docx_files_are_processed(api):
+    with tempfile.TemporaryDirectory() as directory:
+        write_docx(os.path.join(directory, "existing.docx"), PIPELINE_DOCUMENT.format(title="Documento existente"))
+        # Office lock file of an open document
+        with open(os.path.join(directory, "~$existing.docx"), "wb") as f:
+            f.write(b"lock")
+        result = subprocess.run(
+            [sys.executable, "-m", "parser.examples.auto_detect_update",
+             "--input-dir", directory, "-a", api.url, "--policy", "exact-only"],
+            capture_output=True, text=True, encoding="utf-8", cwd=REPO_ROOT,
+            stdin=subprocess.DEVNULL
+        )
+    assert result.returncode == 0, result.stderr
+    assert api.writes == [("PUT", "/api/contents/exact-id", "Documento existente")]
+
+def test_single_file_reads_docx_and_bom(api):
+    with tempfile.TemporaryDirectory() as directory:
+        docx = os.path.join(directory, "existing.docx")
+        write_docx(docx, PIPELINE_DOCUMENT.format(title="Documento existente"))
+        text = os.path.join(directory, "existing.txt")
+        with open(text, "w", encoding="utf-8-sig") as f:
+            f.write(PIPELINE_DOCUMENT.format(title="Documento existente"))
+        for path in (docx, text):
+            result = subprocess.run(
+                [sys.executable, "-m", "parser.examples.auto_detect_update",
+                 "-i", path, "-a", api.url, "--prefetch-titles", "--policy", "exact-only"],
+                capture_output=True, text=True, encoding="utf-8", cwd=directory,
+                env=dict(os.environ, PYTHONPATH=REPO_ROOT), stdin=subprocess.DEVNULL
+            )
+            assert result.returncode == 0, result.stderr
+            assert "Found existing content with ID: exact-id" in result.stdout
+            # The first section is found even behind a byte order mark
+            assert "Pipeline document." in result.stdout
+
+def test_directory_mode_refuses_to_prompt(api):
+    result = run_pipeline(api.url)
+    assert result.returncode == 1
+    assert api.writes == []
+
+def test_decide_action():
+    match = {"_id": "x"}
+    assert decide_action("update", None, False) == "CREATE"
+    assert decide_action("create", match, True) == "CREATE"
+    assert decide_action("skip", match, False) == "SKIP"
+    assert decide_action("exact-only", match, False) == "CREATE"
+    assert decide_action("exact-only", match, True) == "UPDATE"
+    assert decide_action("ask", match, True) == "ASK"
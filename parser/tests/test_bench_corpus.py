@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Tests for the synthetic benchmark corpus generator.
+"""
+from parser.bench.corpus import generate_corpus, generate_document
+from parser.wordexporter import parse_word_text
+
+def test_documents_are_deterministic():
+    for document_format in ("numbered", "original"):
+        first = generate_document(document_format, size=8 * 1024, sections=10, seed=3)
+        second = generate_document(document_format, size=8 * 1024, sections=10, seed=3)
+        assert first == second
+        assert first != generate_document(document_format, size=8 * 1024, sections=10, seed=4)
+
+def test_documents_have_requested_shape():
+    numbered = generate_document("numbered", size=32 * 1024, sections=15)
+    assert 0.8 < len(numbered) / (32 * 1024) < 1.3
+    assert numbered.startswith("1. ")
+    assert "\n15. " in numbered
+
+def test_documents_parse_into_every_field():
+    for document_format in ("numbered", "original"):
+        data = parse_word_text(generate_document(document_format, size=16 * 1024))
+        empty = [field for field, value in data.items() if not value]
+        assert empty == [], (document_format, empty)
+
+def test_corpus_documents_differ():
+    corpus = generate_corpus(3, "original", size=2048, sections=7)
+    assert len(set(corpus)) == 3
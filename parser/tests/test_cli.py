@@ -21,10 +21,10 @@ It's verifying that both functions operate correctly.
     temp_filename = temp.name
 
 print("=== CLI Test: Create a new entry ===")
-os.system(f"python3 parser/cli.py -i {temp_filename} -c http://localhost:3000/api/contents -p")
+os.system(f"python3 parser/cli.py -i {temp_filename} -c http://localhost:3000/api/contents -p --no-cache")
 
 print("\n\n=== CLI Test: Update an existing entry ===")
-os.system(f"python3 parser/cli.py -i {temp_filename} -c http://localhost:3000/api/contents -u --id test12345 -p")
+os.system(f"python3 parser/cli.py -i {temp_filename} -c http://localhost:3000/api/contents -u --id test12345 -p --no-cache")
 
 # Clean up temporary file
 os.unlink(temp_filename)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Tests for the batch mode of the wordexporter CLI (--batch/--jobs/--order).
+"""
+import json
+import os
+import tempfile
+
+from parser.tests.helpers import run_cli, write_documents
+
+def test_batch_directory_input_order():
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_documents(directory, 6)
+        result = run_cli("--batch", directory, "--jobs", "2")
+        assert result.returncode == 0, result.stderr
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        assert [record["file"] for record in records] == paths
+        assert [record["data"]["title"] for record in records] == [f"Documento {n}" for n in range(6)]
+
+def test_batch_glob_completion_order():
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_documents(directory, 4)
+        output = os.path.join(directory, "out.jsonl")
+        result = run_cli("--batch", os.path.join(directory, "doc*.txt"), "-j", "3",
+                         "--order", "completion", "-o", output)
+        assert result.returncode == 0, result.stderr
+        with open(output, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        assert sorted(record["file"] for record in records) == paths
+
+def test_batch_reports_failures_without_aborting():
+    with tempfile.TemporaryDirectory() as directory:
+        write_documents(directory, 3)
+        with open(os.path.join(directory, "broken.txt"), "wb") as f:
+            f.write(b"\xff\xfe not utf-8")
+        result = run_cli("--batch", directory, "--jobs", "1")
+        assert result.returncode == 1
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        assert len(records) == 4
+        assert sum("error" in record for record in records) == 1
+        assert "broken.txt" in result.stderr
+
+if __name__ == "__main__":
+    test_batch_directory_input_order()
+    test_batch_glob_completion_order()
+    test_batch_reports_failures_without_aborting()
+    print("✅ CLI batch tests passed")
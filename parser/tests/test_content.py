@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the slotted ParsedContent record.
+"""
+import json
+import pickle
+
+import pytest
+
+from parser.content import PARSED_FIELDS, ParsedContent
+from parser.wordexporter import (
+    build_create_payload, build_update_payload, generate_curl_command,
+    generate_update_curl_command, parse_content, parse_word_text,
+)
+
+numbered_format = """1. Script de Teleprompter (Español)
+Hola, esto es una prueba.
+
+2. Título Atractivo (SEO)
+Español: Título de prueba
+
+3. Lista de Tags (Español)
+prueba, parser
+
+4. Post para X (Inglés)
+It's a test #parser
+"""
+
+def test_matches_parse_word_text():
+    data = parse_word_text(numbered_format)
+    content = parse_content(numbered_format)
+    assert content == data
+    assert content.to_dict() == data
+    assert list(content.keys()) == list(data.keys()) == list(PARSED_FIELDS)
+    assert content["title"] == content.title == "Título de prueba"
+    assert content.get("tags") == ["prueba", "parser"]
+    assert content.get("missing", "default") == "default"
+
+def test_no_instance_dict():
+    assert not hasattr(ParsedContent(), "__dict__")
+
+def test_defaults_and_unknown_fields():
+    content = ParsedContent(title="T")
+    assert content.title == "T"
+    assert content.teleprompterEs == ""
+    assert content.tags == [] and content.tags is not ParsedContent().tags
+    with pytest.raises(KeyError):
+        content["unknown"] = "x"
+    with pytest.raises(TypeError):
+        del content["title"]
+    assert ParsedContent.from_dict({"title": "T", "extra": 1}).title == "T"
+
+def test_payloads_match_builders():
+    data = parse_word_text(numbered_format)
+    content = parse_content(numbered_format)
+    for mode, build in (("create", build_create_payload), ("update", build_update_payload)):
+        payload = content.to_payload(mode)
+        assert list(payload.items()) == list(build(data).items())
+        assert build(content) == payload
+        assert json.loads(content.to_json(mode)) == payload
+    # Payload values are the record's own objects
+    assert content.to_payload("update")["tags"] is content.tags
+    with pytest.raises(ValueError):
+        content.to_payload("delete")
+
+def test_curl_commands_accept_records():
+    data = parse_word_text(numbered_format)
+    content = parse_content(numbered_format)
+    url = "http://localhost:3000/api/contents"
+    assert generate_curl_command(content, url) == generate_curl_command(data, url)
+    assert (generate_update_curl_command(content, url, "abc")
+            == generate_update_curl_command(data, url, "abc"))
+
+def test_pickle_round_trip():
+    content = parse_content(numbered_format)
+    assert pickle.loads(pickle.dumps(content)) == content
+    assert json.loads(content.to_json()) == content.to_dict()
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
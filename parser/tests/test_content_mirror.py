@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite content mirror (content_mirror) and its use by
+auto_detect_update.py --mirror.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+pytest.importorskip("requests")
+
+from parser.content_mirror import ContentMirror, fts_query
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def content(n, title, updated, **fields):
+    return {
+        "_id": f"id{n}",
+        "title": title,
+        "createdAt": f"2024-01-0{n}T00:00:00.000Z",
+        "updatedAt": updated,
+        **fields,
+    }
+
+@pytest.fixture
+def api(contents_api):
+    contents_api.contents = [
+        content(1, "Inteligencia artificial en 2024", "2024-02-01T10:00:00.000Z",
+                tags=["ia", "tecnología"], videoDescriptionEs="Un repaso del año."),
+        content(2, "Recetas rápidas", "2024-02-02T10:00:00.000Z",
+                teleprompterEs="Hoy cocinamos con inteligencia."),
+        content(3, "Programación en Python", "2024-02-03T10:00:00.000Z", tagsListEn="python, code"),
+    ]
+    return contents_api
+
+def test_full_then_incremental_sync(api):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "mirror.sqlite3")
+        with ContentMirror(path) as mirror:
+            assert mirror.sync(api.url) == {"full": True, "fetched": 3, "changed": 3, "deleted": 0, "total": 3}
+            assert mirror.watermark == "2024-02-03T10:00:00.000Z"
+
+            api.contents[0] = dict(api.contents[0], title="IA en 2025", updatedAt="2024-03-01T00:00:00.000Z")
+            del api.contents[1]
+
+        # The watermark survives reopening; the overlap re-reads content 3 unchanged
+        with ContentMirror(path) as mirror:
+            result = mirror.sync(api.url)
+            assert api.requests[-1][2] == {"updatedSince": ["2024-02-03T09:59:00Z"]}
+            assert result == {"full": False, "fetched": 2, "changed": 1, "deleted": 0, "total": 3}
+            assert mirror.get("id1")["title"] == "IA en 2025"
+            assert mirror.watermark == "2024-03-01T00:00:00.000Z"
+
+            # Deletions are only noticed by a full sync
+            assert mirror.get("id2") is not None
+            assert mirror.sync(api.url, full=True)["deleted"] == 1
+            assert mirror.get("id2") is None and len(mirror) == 2
+
+def test_search_and_lookup(api):
+    with ContentMirror(":memory:") as mirror:
+        mirror.sync(api.url)
+        # Titles rank above teleprompter text; case and accents are ignored
+        assert [c["_id"] for c in mirror.search("INTELIGENCIA")] == ["id1", "id2"]
+        assert [c["_id"] for c in mirror.search("tecnologia")] == ["id1"]
+        assert [c["_id"] for c in mirror.search("progra pyth")] == ["id3"]
+        assert mirror.search("python receta") == [] and mirror.search("  ¿? ") == []
+        assert mirror.search("inteligencia", limit=1)[0]["_id"] == "id1"
+
+        assert mirror.find_title("  recetas  RÁPIDAS ")["_id"] == "id2"
+        assert mirror.find_title("Recetas") is None
+        assert [c["_id"] for c in mirror.contents()] == ["id3", "id2", "id1"]
+
+        assert mirror.store([dict(api.contents[2], title="Python avanzado")]) == 1
+        assert mirror.store([mirror.get("id3")]) == 0
+        assert mirror.find_title("python avanzado")["_id"] == "id3"
+        assert mirror.search("programación") == []
+
+def test_fts_query_quotes_user_input():
+    assert fts_query('title:"x" OR NEAR(a b)') == '"title"* "x"* "OR"* "NEAR"* "a"* "b"*'
+    assert fts_query("***") is None
+
+def test_search_works_without_requests():
+    # Block the import of requests, as on a machine without it installed
+    code = (
+        "import sys; sys.modules['requests'] = None\n"
+        "from parser.content_mirror import ContentMirror\n"
+        "with ContentMirror(':memory:') as mirror:\n"
+        "    mirror.store([{'_id': 'id1', 'title': 'Recetas rápidas', 'updatedAt': '2024-01-01T00:00:00Z'}])\n"
+        "    print(mirror.search('recetas')[0]['_id'], mirror.find_title('RECETAS RÁPIDAS')['_id'])\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            encoding="utf-8", cwd=REPO_ROOT)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["id1", "id1"]
+
+def test_auto_detect_uses_mirror(api):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "input.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("1. Attractive Title (SEO)\nEspañol: Recetas rápidas\n")
+        database = os.path.join(directory, "mirror.sqlite3")
+
+        def run(url):
+            return subprocess.run(
+                [sys.executable, "-m", "parser.examples.auto_detect_update", "-i", path, "-a", url,
+                 "--mirror", database, "--policy", "update"],
+                capture_output=True, text=True, encoding="utf-8", cwd=directory,
+                env=dict(os.environ, PYTHONPATH=REPO_ROOT), stdin=subprocess.DEVNULL
+            )
+
+        result = run(api.url)
+        assert result.returncode == 0, result.stderr
+        assert "Found existing content with ID: id2" in result.stdout
+
+        # Offline: the mirror answers as of its last sync
+        result = run("http://127.0.0.1:9/api/contents")
+        assert result.returncode == 0, result.stderr
+        assert "could not sync the content mirror" in result.stderr
+        assert "Found existing content with ID: id2" in result.stdout
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
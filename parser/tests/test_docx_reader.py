@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for reading .docx files (docx_reader).
+"""
+import json
+import os
+import tempfile
+import zipfile
+
+import pytest
+
+from parser.bench.corpus import DOCX_CONTENT_TYPES, DOCX_RELS, generate_document, write_docx
+from parser.docx_reader import iter_docx_lines, iter_docx_paragraphs, parse_docx, read_docx_text
+from parser.tests.helpers import run_cli
+from parser.wordexporter import parse_word_text
+
+DOCUMENT_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+    '<w:p><w:r><w:t>1. Script de </w:t></w:r><w:r><w:rPr><w:b/></w:rPr><w:t>Teleprompter</w:t></w:r>'
+    '<w:r><w:t xml:space="preserve"> (Español)</w:t></w:r></w:p>'
+    '<w:p><w:r><w:t>Hola</w:t><w:tab/><w:t>mundo</w:t><w:br/><w:t>segunda línea</w:t></w:r></w:p>'
+    '<w:p><w:r><w:delText>borrado</w:delText><w:instrText>PAGE</w:instrText></w:r></w:p>'
+    '<w:tbl><w:tr><w:tc><w:p><w:r><w:t>celda</w:t></w:r></w:p></w:tc></w:tr></w:tbl>'
+    '<w:sectPr/></w:body></w:document>'
+)
+
+def write_raw_docx(path, document_xml):
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("[Content_Types].xml", DOCX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", DOCX_RELS)
+        archive.writestr("word/document.xml", document_xml)
+
+def test_paragraph_text():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "raw.docx")
+        write_raw_docx(path, DOCUMENT_XML)
+        assert list(iter_docx_paragraphs(path)) == [
+            "1. Script de Teleprompter (Español)",
+            "Hola\tmundo\nsegunda línea",
+            "",
+            "celda",
+        ]
+        assert list(iter_docx_lines(path))[1:3] == ["Hola\tmundo\n", "segunda línea\n"]
+
+def test_matches_parse_word_text():
+    with tempfile.TemporaryDirectory() as directory:
+        for document_format in ("numbered", "original"):
+            text = generate_document(document_format, size=8 * 1024)
+            path = os.path.join(directory, f"{document_format}.docx")
+            write_docx(path, text)
+            assert read_docx_text(path) == text
+            assert parse_docx(path) == parse_word_text(text)
+
+def test_not_a_docx():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "plain.docx")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("just text")
+        with pytest.raises(zipfile.BadZipFile):
+            parse_docx(path)
+
+def test_cli_reads_docx():
+    with tempfile.TemporaryDirectory() as directory:
+        text = generate_document("numbered", size=4 * 1024)
+        path = os.path.join(directory, "doc.docx")
+        write_docx(path, text)
+        expected = parse_word_text(text)
+        for cache_args in ((), ("--no-cache",)):
+            result = run_cli("-i", path, "--format", "jsonl", *cache_args)
+            assert result.returncode == 0, result.stderr
+            assert json.loads(result.stdout)["data"] == expected
+
+        result = run_cli("--batch", directory, "-j", "1", "--no-cache")
+        assert result.returncode == 0, result.stderr
+        assert [json.loads(line)["file"] for line in result.stdout.splitlines()] == [path]
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
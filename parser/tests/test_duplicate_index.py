@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for the MinHash/LSH near-duplicate index (duplicate_index) and the
+--duplicates options of cli.py and auto_detect_update.py.
+"""
+import json
+import os
+import random
+import shutil
+import tempfile
+
+import pytest
+
+from parser.duplicate_index import (
+    DuplicateIndex,
+    document_shingles,
+    document_signature,
+    estimate_similarity,
+)
+from parser.tests.helpers import run_cli, run_pipeline, write_documents
+
+WORDS = ("guion", "video", "modelo", "datos", "nube", "red", "código", "prueba", "usuario", "servidor",
+         "script", "model", "cloud", "network", "test", "user", "server", "data", "fast", "new")
+
+def random_document(seed, words=400):
+    rng = random.Random(seed)
+    text = [rng.choice(WORDS) + str(rng.randrange(50)) for _ in range(words)]
+    half = words // 2
+    return {
+        "teleprompterEs": " ".join(text[:half]),
+        "teleprompterEn": " ".join(text[half:]),
+        "videoDescriptionEs": f"Descripción {seed}",
+    }
+
+def edited(data, every=40):
+    """Returns data with every n-th word of the Spanish teleprompter replaced."""
+    words = data["teleprompterEs"].split()
+    for index in range(0, len(words), every):
+        words[index] = "cambiado"
+    return dict(data, teleprompterEs=" ".join(words))
+
+def jaccard(a, b):
+    a, b = document_shingles(a), document_shingles(b)
+    return len(a & b) / len(a | b)
+
+def test_signature_is_stable_and_case_insensitive():
+    data = random_document(1)
+    signature = document_signature(data)
+    assert len(signature) == 128
+    assert document_signature(dict(data)) == signature
+    shouted = {field: value.upper() for field, value in data.items()}
+    assert document_signature(shouted) == signature
+    assert document_signature({"title": "Sin texto"}) is None
+
+def test_estimate_tracks_jaccard():
+    data = random_document(2)
+    for every in (10, 25, 60):
+        other = edited(data, every)
+        estimate = estimate_similarity(document_signature(data), document_signature(other))
+        assert estimate == pytest.approx(jaccard(data, other), abs=0.1)
+
+def test_query():
+    documents = {f"id{seed}": random_document(seed) for seed in range(50)}
+    index = DuplicateIndex(dict(data, _id=key, title=f"Título {key}") for key, data in documents.items())
+    assert len(index) == 50 and "id7" in index
+
+    matches = index.query(edited(documents["id7"]))
+    assert [match["_id"] for match in matches] == ["id7"]
+    assert matches[0]["title"] == "Título id7" and 0.8 <= matches[0]["score"] < 1
+    assert index.query(documents["id7"])[0]["score"] == 1.0
+    assert index.query(documents["id7"], exclude="id7") == []
+    assert index.query(edited(documents["id7"], every=3)) == []
+    assert index.query({"teleprompterEs": "Nada parecido"}) == []
+
+    # A repeated key or a document without text is not indexed
+    assert not index.add("id7", random_document(99))
+    assert not index.add("empty", {"title": "Vacío"})
+    assert index.add("copy", documents["id3"])
+    assert [match.get("_id", match.get("key")) for match in index.query(documents["id3"])] == ["id3", "copy"]
+
+def test_bands_must_divide_signature():
+    with pytest.raises(ValueError):
+        DuplicateIndex(num_perm=128, bands=12)
+
+def test_cli_flags_duplicates_within_batch():
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_documents(directory, 3)
+        copy = os.path.join(directory, "doc03.txt")
+        shutil.copyfile(paths[1], copy)
+        result = run_cli("--batch", directory, "--duplicates", "--no-cache")
+        assert result.returncode == 0, result.stderr
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        assert [record.get("duplicates") for record in records] == [
+            None, None, None, [{"file": paths[1], "score": 1.0}],
+        ]
+        assert f"Possible duplicate: {copy} ~ {paths[1]}" in result.stderr
+        assert "Possible duplicates: 1" in result.stderr
+
+        result = run_cli("--batch", directory, "--duplicates", "1.5")
+        assert result.returncode == 1 and "between 0 and 1" in result.stderr
+
+def test_cli_does_not_upload_duplicates(contents_api):
+    contents_api.contents = [
+        {"_id": "text-id", "title": "Otro título", "teleprompterEn": "Batch document number 0."},
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        write_documents(directory, 2)
+        result = run_cli("--batch", directory, "--duplicates", "--upload", contents_api.url, "--no-cache")
+        assert result.returncode == 0, result.stderr
+        assert "~ text-id (Otro título)" in result.stderr
+        assert "Possible duplicates: 1, not uploaded" in result.stderr
+    assert contents_api.writes == [("POST", "/api/contents", "Documento 1")]
+
+def test_auto_detect_matches_retitled_documents(contents_api):
+    contents_api.contents = [
+        {"_id": "exact-id", "title": "Documento existente"},
+        {"_id": "text-id", "title": "Otro título", "teleprompterEn": "Pipeline document."},
+    ]
+    result = run_pipeline(contents_api.url, "--policy", "update", "--duplicates")
+    assert result.returncode == 0, result.stderr
+    assert sorted(contents_api.writes) == [
+        ("PUT", "/api/contents/exact-id", "Documento existente"),
+        ("PUT", "/api/contents/text-id", "Documento casi existente"),
+        ("PUT", "/api/contents/text-id", "Documento nuevo"),
+    ]
+    assert "duplicate of text-id (similarity 1.0)" in result.stderr
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
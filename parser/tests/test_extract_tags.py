@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for extract_tags ranking and for tags derived from descriptions.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from parser.incremental import IncrementalParser
+from parser.wordexporter import description_tags, extract_tags, parse_word_text
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TEXT = (
+    "Hola #OpenAI, la inteligencia artificial y la Inteligencia del futuro. "
+    "#openai #Tech: artificial, artificial 2025 a1 ok"
+)
+
+NO_TAGS_DOCUMENT = """1. Descripción para YouTube (Español)
+Nuevo modelo de #OpenAI: el modelo más rápido del modelo anterior.
+
+2. Descripción para YouTube (Inglés)
+The new #OpenAI model.
+"""
+
+def test_ranking():
+    # Hashtags first, then by frequency, then by first occurrence
+    assert extract_tags(TEXT) == ["#OpenAI", "#Tech", "artificial", "inteligencia", "hola", "futuro"]
+    assert extract_tags(TEXT, limit=3) == ["#OpenAI", "#Tech", "artificial"]
+    assert extract_tags(TEXT, limit=None) == extract_tags(TEXT)
+    assert extract_tags("") == [] and extract_tags(TEXT, limit=0) == []
+
+def test_stop_words():
+    assert "del" not in extract_tags(TEXT)
+    assert extract_tags(TEXT, stop_words=None) == [
+        "#OpenAI", "#Tech", "artificial", "inteligencia", "hola", "del", "futuro",
+    ]
+    assert extract_tags(TEXT, stop_words={"artificial"})[2:4] == ["inteligencia", "hola"]
+
+def test_independent_of_hash_seed():
+    code = f"from parser.wordexporter import extract_tags; print(extract_tags({TEXT!r}))"
+    outputs = {
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                       env=dict(os.environ, PYTHONHASHSEED=seed), check=True).stdout
+        for seed in ("1", "2", "3")
+    }
+    assert len(outputs) == 1
+
+def test_tags_derived_from_descriptions():
+    data = parse_word_text(NO_TAGS_DOCUMENT)
+    assert data["tags"] == ["OpenAI", "modelo", "nuevo"]
+    assert description_tags(data, limit=1) == ["OpenAI"]
+    # Keywords repeating a hashtag do not take the place of other tags
+    assert description_tags({"videoDescriptionEs": "#Python #Datos python datos nube"}) == ["Python", "Datos", "nube"]
+
+    # A tags section still wins
+    with_tags = NO_TAGS_DOCUMENT + "\n3. Lista de Tags (Español)\nuno, dos\n"
+    assert parse_word_text(with_tags)["tags"] == ["uno", "dos"]
+
+    parser = IncrementalParser()
+    parser.update(NO_TAGS_DOCUMENT)
+    assert parser.data == data
+    assert parse_word_text("")["tags"] == []
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental re-parsing (IncrementalParser).
+"""
+from parser.incremental import IncrementalParser
+from parser.wordexporter import parse_word_text
+
+numbered_format = """1. Script de Teleprompter (Inglés)
+This is the English script.
+
+2. Título Atractivo (SEO)
+Español: Prueba incremental
+
+3. Post para X (Español)
+Post para X en español #ejemplo
+
+4. Lista de Tags (Español)
+incremental, prueba, parser
+"""
+
+original_format = """Incremental Title
+Teleprompter
+Español:
+Guion en español.
+Ingles:
+Script in English.
+
+Descripción para X
+Español:
+Post para X en español #ejemplo
+Ingles:
+X post in English #example
+"""
+
+def test_first_update_matches_parse_word_text():
+    for text in (numbered_format, original_format):
+        parser = IncrementalParser()
+        changed = parser.update(text)
+        assert parser.data == parse_word_text(text)
+        assert "title" in changed
+
+def test_only_edited_section_is_reparsed():
+    parser = IncrementalParser()
+    parser.update(numbered_format)
+    assert parser.sections_parsed == 4
+
+    edited = numbered_format.replace("#ejemplo", "#editado")
+    changed = parser.update(edited)
+    assert changed == ["twitterPostEs"]
+    assert parser.sections_parsed == 1
+    assert parser.data == parse_word_text(edited)
+
+def test_unchanged_text_reports_no_changes():
+    parser = IncrementalParser()
+    parser.update(original_format)
+    assert parser.update(original_format) == []
+    assert parser.sections_parsed == 0
+
+def test_sections_without_fields_stay_cached():
+    notes = "\n5. Notas internas\nSección sin campo propio.\n"
+    text = numbered_format + notes + notes + "\n"
+    parser = IncrementalParser()
+    parser.update(text)
+    # The repeated section is parsed once even though it sets no fields
+    assert parser.sections_parsed == 5
+    assert parser.update(text) == []
+    assert parser.sections_parsed == 0
+
+def test_edit_in_original_format():
+    parser = IncrementalParser()
+    parser.update(original_format)
+    edited = original_format.replace("Script in English.", "Edited script.")
+    assert parser.update(edited) == ["teleprompterEn"]
+    assert parser.sections_parsed == 1
+    assert parser.data == parse_word_text(edited)
+
+def test_tags_follow_tags_list_edits():
+    parser = IncrementalParser()
+    parser.update(numbered_format)
+    edited = numbered_format.replace("incremental, prueba", "nuevo, prueba")
+    assert parser.update(edited) == ["tagsListEs", "tags"]
+    assert parser.data["tags"] == ["nuevo", "prueba", "parser"]
+
+def test_empty_document():
+    parser = IncrementalParser()
+    parser.update(numbered_format)
+    parser.update("")
+    assert parser.data == parse_word_text("")
+
+if __name__ == "__main__":
+    test_first_update_matches_parse_word_text()
+    test_only_edited_section_is_reparsed()
+    test_unchanged_text_reports_no_changes()
+    test_edit_in_original_format()
+    test_tags_follow_tags_list_edits()
+    test_empty_document()
+    print("✅ Incremental parser tests passed")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the Spanish/English line classifier.
+"""
+from parser.language import (
+    classify_lines, classify_section, language_warnings, line_language,
+    misattributed_lines, score_line,
+)
+from parser.wordexporter import parse_word_text
+
+def test_character_rule_matches_parser_heuristic():
+    lines = ["¿Qué tal?", "Hola", "Canción", "Hello", "", "niño", "#tags"]
+    expected = [
+        "es" if any(x in line for x in ["¿", "á", "é", "í", "ó", "ú", "ñ"]) else "en"
+        for line in lines
+    ]
+    assert classify_lines(lines) == expected
+    assert [line_language(line) for line in lines] == expected
+
+def test_score_line_confidence_grows_with_evidence():
+    assert score_line("") == ("en", 0.0)
+    assert score_line("Hola")[1] == 0.0
+    language, weak = score_line("Hola de Madrid")
+    assert language == "es"
+    _, strong = score_line("Este es un vídeo sobre la inteligencia de las máquinas")
+    assert strong > weak
+    assert score_line("This is a video about the future of the web")[0] == "en"
+
+def test_identifiers_are_not_evidence():
+    # "en" inside tag1_en must not count as the Spanish preposition
+    assert score_line("tag1_en, tag2_en, tag3_en") == ("en", 0.0)
+
+def test_classify_section_pools_lines():
+    section = classify_section(["Hola a todos", "Este es el vídeo de hoy"])
+    assert section["language"] == "es"
+    assert section["spanish"] > section["english"]
+    assert 0 < section["confidence"] < 1
+
+def test_misattributed_lines():
+    lines = ["Hola a todos", "This is the script in English, and it was filed wrong."]
+    flagged = misattributed_lines(lines, "es")
+    assert [entry["line"] for entry in flagged] == [1]
+    assert flagged[0]["language"] == "en"
+    assert misattributed_lines(lines, "en", threshold=0.99) == []
+
+def test_language_warnings_on_parsed_document():
+    text = """Title
+Teleprompter
+Español:
+Hola amigos, este es el guion.
+This is the script in English, and it was filed wrong.
+Ingles:
+This is the script in English.
+"""
+    warnings = language_warnings(parse_word_text(text))
+    assert [(w["field"], w["line"]) for w in warnings] == [("teleprompterEs", 1)]
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for memory-mapped reading of text exports (mmap_reader).
+"""
+import os
+import tempfile
+
+import pytest
+
+from parser import mmap_reader
+from parser.bench.corpus import generate_document
+from parser.mmap_reader import MappedText, parse_mapped_file, parse_text_file
+from parser.wordexporter import empty_parsed_data, parse_word_text
+
+original_format = """Título con Teleprompter
+Teleprompter
+Español:
+Guion en español.
+  Más texto: teleprompter y tags no empiezan la línea
+Ingles:
+Script in English.
+
+DESCRIPCIÓN OPTIMIZADA para SEO
+Español:
+Descripción.
+Ingles:
+Description.
+"""
+
+def write(directory, name, text, newline="\n"):
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8", newline=newline) as f:
+        f.write(text)
+    return path
+
+@pytest.fixture
+def directory():
+    with tempfile.TemporaryDirectory() as directory:
+        yield directory
+
+def test_numbered_sections(directory):
+    text = generate_document("numbered", size=6 * 1024, sections=15)
+    path = write(directory, "numbered.txt", text)
+    with MappedText(path) as mapped:
+        assert mapped.format == "numbered"
+        sections = mapped.sections()
+        assert [section["header"] for section in sections] == [
+            line for line in text.split("\n") if line[:1].isdigit() and ". " in line[:4]
+        ]
+        # Sections tile the file and start on their header line
+        assert sections[0]["start"] == 0 and sections[-1]["end"] == len(mapped)
+        for section, following in zip(sections, sections[1:]):
+            assert section["end"] == following["start"]
+            assert mapped.decode(section["start"], section["end"]).startswith(section["header"])
+
+def test_original_sections_and_header_case(directory):
+    path = write(directory, "original.txt", original_format, newline="\r\n")
+    with MappedText(path) as mapped:
+        assert mapped.format == "original"
+        assert [section["header"] for section in mapped.sections()] == [
+            None, "Teleprompter", "DESCRIPCIÓN OPTIMIZADA para SEO",
+        ]
+
+def test_sections_parse_independently(directory):
+    # With a tags section, since tags derived from the descriptions belong to the whole document
+    for name, text in (("numbered.txt", generate_document("numbered", size=6 * 1024)),
+                       ("original.txt", original_format + "\nTags\nguion, python\n")):
+        path = write(directory, name, text)
+        with MappedText(path) as mapped:
+            merged = empty_parsed_data()
+            for section in mapped.sections():
+                merged.update(mapped.section_fields(section))
+        assert merged == parse_word_text(text)
+
+def test_parse_matches_reading_whole_file(directory, monkeypatch):
+    # Tiny chunks force many decode boundaries
+    monkeypatch.setattr(mmap_reader, "CHUNK_SIZE", 50)
+    for newline in ("\n", "\r\n"):
+        for document_format in ("numbered", "original"):
+            text = generate_document(document_format, size=8 * 1024)
+            path = write(directory, "doc.txt", text, newline)
+            with open(path, encoding="utf-8") as f:
+                expected = parse_word_text(f.read())
+            assert parse_mapped_file(path) == expected
+
+def test_empty_and_bom_files(directory):
+    path = write(directory, "empty.txt", "")
+    with MappedText(path) as mapped:
+        assert mapped.format is None and mapped.sections() == []
+    assert parse_mapped_file(path) == empty_parsed_data()
+
+    path = write(directory, "bom.txt", "﻿" + original_format)
+    assert parse_mapped_file(path)["title"] == "Título con Teleprompter"
+
+def test_bom_is_skipped_below_and_above_threshold(directory, monkeypatch):
+    path = write(directory, "bom.txt", "\ufeff" + original_format)
+    expected = parse_word_text(original_format)
+    assert parse_text_file(path) == expected
+    monkeypatch.setattr(mmap_reader, "MMAP_THRESHOLD", 1)
+    assert parse_text_file(path) == expected
+
+def test_parse_text_file_threshold(directory, monkeypatch):
+    path = write(directory, "doc.txt", original_format)
+    calls = []
+    monkeypatch.setattr(mmap_reader, "parse_mapped_file", lambda p: calls.append(p) or {})
+    parse_text_file(path)
+    assert calls == []
+    monkeypatch.setattr(mmap_reader, "MMAP_THRESHOLD", 1)
+    parse_text_file(path)
+    assert calls == [path]
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
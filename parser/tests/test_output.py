@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming record writers and the CLI --format option.
+"""
+import io
+import json
+import os
+import tempfile
+
+import pytest
+
+from parser.output import CurlScriptWriter, JsonArrayWriter, JsonLinesWriter, make_writer
+from parser.tests.helpers import run_cli, write_documents
+from parser.wordexporter import generate_curl_command, generate_update_curl_command
+
+API_URL = "http://localhost:3000/api/contents"
+
+records = [
+    {"file": "a.txt", "data": {"title": "Uno", "teleprompterEs": "It's"}},
+    {"file": "b.txt", "error": "ValueError: bad"},
+    {"file": "c.txt", "data": {"title": "Tres"}, "id": "abc"},
+]
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+        super().flush()
+
+def test_json_lines():
+    stream = io.StringIO()
+    with JsonLinesWriter(stream) as writer:
+        for record in records:
+            writer.write(record)
+    assert [json.loads(line) for line in stream.getvalue().splitlines()] == records
+
+def test_json_array():
+    for indent in (None, 2):
+        stream = io.StringIO()
+        with JsonArrayWriter(stream, indent=indent) as writer:
+            for record in records:
+                writer.write(record)
+        assert json.loads(stream.getvalue()) == records
+    stream = io.StringIO()
+    JsonArrayWriter(stream).close()
+    assert json.loads(stream.getvalue()) == []
+
+def test_curl_script():
+    stream = io.StringIO()
+    with CurlScriptWriter(stream, api_url=API_URL + "/") as writer:
+        for record in records:
+            writer.write(record)
+    script = stream.getvalue()
+    assert script.startswith("#!/bin/sh\n")
+    assert generate_curl_command(records[0]["data"], API_URL) in script
+    assert generate_update_curl_command(records[2]["data"], API_URL, "abc") in script
+    assert "# FAILED b.txt: ValueError: bad" in script
+    with pytest.raises(ValueError):
+        CurlScriptWriter(io.StringIO())
+
+def test_flush_every():
+    stream = CountingStream()
+    writer = make_writer("jsonl", stream, flush_every=2)
+    for record in records * 2:
+        writer.write(record)
+    assert stream.flushes == 3
+    writer.close()
+    assert stream.flushes == 4
+
+    stream = CountingStream()
+    with make_writer("jsonl", stream, flush_every=0) as writer:
+        for record in records:
+            writer.write(record)
+    assert stream.flushes == 1
+
+def test_cli_batch_formats():
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_documents(directory, 3)
+        result = run_cli("--batch", directory, "-j", "1", "--format", "json")
+        assert result.returncode == 0, result.stderr
+        assert [record["file"] for record in json.loads(result.stdout)] == paths
+
+        result = run_cli("--batch", directory, "-j", "1", "--format", "curl-script", "--curl", API_URL)
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.count("curl -X POST") == 3
+
+        result = run_cli("--batch", directory, "--format", "curl-script")
+        assert result.returncode == 1
+
+def test_cli_single_document_formats():
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_documents(directory, 1)[0]
+        result = run_cli("-i", path, "--format", "jsonl")
+        assert result.returncode == 0, result.stderr
+        record = json.loads(result.stdout)
+        assert record["file"] == path and record["data"]["title"] == "Documento 0"
+
+        output = os.path.join(directory, "update.sh")
+        result = run_cli("-i", path, "--format", "curl-script", "--curl", API_URL,
+                         "-u", "--id", "abc", "-o", output)
+        assert result.returncode == 0, result.stderr
+        with open(output, encoding="utf-8") as f:
+            assert f"curl -X PUT {API_URL}/abc" in f.read()
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="named pipes need os.mkfifo")
+def test_cli_writes_to_named_pipe():
+    import threading
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_documents(directory, 4)
+        fifo = os.path.join(directory, "out.fifo")
+        os.mkfifo(fifo)
+        lines = []
+        reader = threading.Thread(target=lambda: lines.extend(open(fifo, encoding="utf-8")))
+        reader.start()
+        result = run_cli("--batch", os.path.join(directory, "*.txt"), "-j", "1",
+                         "--flush-every", "1", "-o", fifo)
+        reader.join(timeout=30)
+        assert result.returncode == 0, result.stderr
+        assert len(lines) == 4
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for the on-disk parse-result cache.
+"""
+import os
+import tempfile
+
+from parser import parse_cache
+from parser.parse_cache import ParseCache, normalize_text
+from parser.wordexporter import parse_word_text
+
+test_input = """1. Script de Teleprompter (Inglés)
+Cached teleprompter script.
+
+2. Título Atractivo (SEO)
+Español: Título en caché
+"""
+
+def test_repeat_parse_is_a_hit():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ParseCache(directory)
+        first = cache.parse(test_input)
+        second = cache.parse(test_input)
+        assert first == second == parse_word_text(test_input)
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # A fresh instance reads what the first one stored
+        other = ParseCache(directory)
+        assert other.parse(test_input) == first
+        assert (other.hits, other.misses) == (1, 0)
+
+def test_whitespace_and_line_endings_share_a_key():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ParseCache(directory)
+        cache.parse(test_input)
+        cache.parse("\r\n" + test_input.replace("\n", "  \r\n"))
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert normalize_text(" a \r\n b ") == "a\nb"
+
+def test_parser_version_changes_key(monkeypatch):
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ParseCache(directory)
+        key = cache.key(normalize_text(test_input))
+        monkeypatch.setattr(parse_cache, "PARSER_VERSION", "test")
+        assert cache.key(normalize_text(test_input)) != key
+
+def test_lru_eviction_keeps_recent_entries():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ParseCache(directory)
+        documents = [test_input.replace("caché", f"caché {n}") for n in range(4)]
+        keys = [cache.key(normalize_text(text)) for text in documents]
+        for n, text in enumerate(documents):
+            cache.parse(text)
+            path = os.path.join(directory, keys[n] + ".json")
+            os.utime(path, (1000 + n, 1000 + n))
+
+        entry_size = os.path.getsize(os.path.join(directory, keys[0] + ".json"))
+        cache.evict(max_bytes=entry_size * 2 + entry_size // 2)
+        remaining = sorted(name[:-5] for name in os.listdir(directory))
+        assert remaining == sorted(keys[2:])
+
+if __name__ == "__main__":
+    test_repeat_parse_is_a_hit()
+    test_whitespace_and_line_endings_share_a_key()
+    test_lru_eviction_keeps_recent_entries()
+    print("✅ Parse cache tests passed")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for the opt-in parser profiling (profiling) and cli.py --profile.
+"""
+import json
+import os
+import tempfile
+import threading
+
+import pytest
+
+from parser import profiling
+from parser.bench.corpus import generate_document
+from parser.incremental import IncrementalParser
+from parser.mmap_reader import parse_mapped_file
+from parser.profiling import Profile, format_profile, stage
+from parser.tests.helpers import run_cli, write_documents
+from parser.wordexporter import parse_word_text
+
+def test_profile_matches_unprofiled_parse():
+    for document_format in ("numbered", "original"):
+        text = generate_document(document_format, size=8 * 1024, sections=15)
+        profile = Profile()
+        with profiling.profiling(profile):
+            assert profiling.active_profile() is profile
+            data = parse_word_text(text)
+        assert data == parse_word_text(text)
+    assert profiling.active_profile() is None
+
+def test_stages_and_section_bytes():
+    text = generate_document("numbered", size=8 * 1024, sections=15)
+    profile = Profile()
+    with profiling.profiling(profile), profile.stage("parse"):
+        parse_word_text(text)
+    summary = profile.summary()
+    assert list(summary["stages"]) == ["detect", "split", "match", "language", "tags", "truncate", "parse"]
+    assert summary["stages"]["split"]["calls"] == 1
+    assert summary["stages"]["match"]["calls"] == 15
+    # Exclusive times add up to the time of the outermost stage
+    assert summary["seconds"] == pytest.approx(sum(s["seconds"] for s in summary["stages"].values()))
+    assert all(s["seconds"] >= 0 for s in summary["stages"].values())
+
+    sections = summary["sections"]
+    assert len(sections) == 15
+    body = text.split("1. Script de Teleprompter (Español)\n", 1)[1].split("\n2. ", 1)[0]
+    assert sections["Script de Teleprompter (Español)"] == {"count": 1, "bytes": len(body.encode("utf-8")) + 1}
+
+    original = generate_document("original", size=4 * 1024, sections=7)
+    profile = Profile()
+    with profiling.profiling(profile):
+        parse_word_text(original)
+    assert set(profile.summary()["sections"]) == {
+        "teleprompter", "videoDescription", "tagsList", "pinnedComment",
+        "tiktokDescription", "twitterPost", "facebookDescription",
+    }
+
+def test_nested_profiles_and_merge():
+    text = generate_document("original", size=2 * 1024, sections=7)
+    outer, inner = Profile(), Profile()
+    with profiling.profiling(outer):
+        with profiling.profiling(inner):
+            parse_word_text(text)
+        with stage("output"):
+            pass
+    assert "split" in inner.summary()["stages"]
+    assert list(outer.summary()["stages"]) == ["output"]
+
+    outer.merge(inner.summary())
+    outer.merge(inner.summary())
+    merged = outer.summary()
+    assert merged["stages"]["split"]["calls"] == 2
+    assert merged["sections"]["teleprompter"]["count"] == 2
+    assert "teleprompter" in format_profile(merged)
+
+def test_stage_without_profile_does_nothing():
+    with stage("read"):
+        pass
+    assert profiling.active_profile() is None
+
+def test_other_parsers_are_profiled():
+    text = generate_document("numbered", size=4 * 1024, sections=10)
+    profile = Profile()
+    with profiling.profiling(profile):
+        IncrementalParser().update(text)
+    assert profile.summary()["stages"]["match"]["calls"] == 10
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "doc.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        profile = Profile()
+        with profiling.profiling(profile):
+            parse_mapped_file(path)
+    assert len(profile.summary()["sections"]) == 10
+
+def test_profiles_are_per_thread():
+    text = generate_document("original", size=2 * 1024, sections=7)
+    profile = Profile()
+    with profiling.profiling(profile):
+        # Parses in another thread are not measured into this profile
+        thread = threading.Thread(target=parse_word_text, args=(text,))
+        thread.start()
+        thread.join()
+    assert profile.summary()["stages"] == {}
+
+def test_cli_profile():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "doc.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(generate_document("numbered", size=4 * 1024))
+        result = run_cli("-i", path, "--profile", "--no-cache", "-o", os.path.join(directory, "out.json"))
+        assert result.returncode == 0, result.stderr
+        assert result.stderr.startswith("Profile of 1 documents")
+        assert "Script de Teleprompter (Español)" in result.stderr
+
+        os.remove(path)
+        write_documents(directory, 4)
+        for jobs in ("1", "2"):
+            result = run_cli("--batch", directory, "-j", jobs, "--profile", "json")
+            assert result.returncode == 0, result.stderr
+            summary = json.loads(result.stderr[result.stderr.index("{"):])
+            assert summary["documents"] == 4
+            assert {"read", "parse", "output"} <= set(summary["stages"])
+            assert summary["sections"]["Attractive Title (SEO)"]["count"] == 4
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the numbered-section registry and its compiled matcher.
+"""
+from parser.wordexporter import (
+    NUMBERED_MATCHER, NUMBERED_SECTIONS, compile_section_registry, match_section_row,
+    process_numbered_section, save_section_content,
+)
+
+def saved(section_title, es=(), en=()):
+    data = {}
+    save_section_content(data, section_title, {"es": list(es), "en": list(en)})
+    return data
+
+def test_every_row_is_reachable():
+    for row in NUMBERED_SECTIONS:
+        for pattern in row[0]:
+            assert match_section_row(NUMBERED_MATCHER, f"7. {pattern} (español)") is row
+
+def test_earlier_row_wins_regardless_of_position():
+    # Precedence follows the registry order, not the position in the title
+    row = match_section_row(NUMBERED_MATCHER, "title of the teleprompter script")
+    assert row[1] == ("teleprompterEs", "teleprompterEn")
+    row = match_section_row(NUMBERED_MATCHER, "post para x title")
+    assert row[1] == ("title", "title")
+
+def test_overlapping_patterns_are_found():
+    pattern, rows = compile_section_registry((
+        (("abc",), ("a", "a"), None, None, str),
+        (("bcd",), ("b", "b"), None, None, str),
+    ))
+    # "abcd" contains both; the first row wins even though they overlap
+    assert match_section_row((pattern, rows), "abcd") is rows[0]
+    assert match_section_row((pattern, rows), "xbcd") is rows[1]
+    assert match_section_row((pattern, rows), "xyz") is None
+
+def test_language_markers():
+    assert saved("Lista de Tags (Español)", es=["a, b"]) == {"tagsListEs": "a, b"}
+    assert saved("Lista de Tags (English)", en=["a, b"]) == {"tagsListEn": "a, b"}
+    # Without a language marker, only the teleprompter has a default
+    assert saved("Lista de Tags", es=["a, b"]) == {}
+    assert saved("Script de Teleprompter", es=["Hola"]) == {"teleprompterEs": "Hola"}
+
+def test_post_processors():
+    post = saved("Post para X (Español)", es=["x" * 300])
+    assert len(post["twitterPostEs"]) == 180
+    title = saved("Título Atractivo (SEO)", es=["Español: Uno", "Inglés: One"])
+    assert title == {"title": "Uno"}
+    assert saved("Título Atractivo (SEO)", en=["Inglés: One"]) == {}
+
+def test_legacy_headers():
+    data = {}
+    process_numbered_section(data, "Tags para YouTube (Español)", " a, b \n")
+    process_numbered_section(data, "Descripción para X (Inglés)", "Post")
+    assert data == {"tagsListEs": "a, b", "twitterPostEn": "Post"}
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
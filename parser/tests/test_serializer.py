@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the JSON serializer backends and the streamed curl commands.
+"""
+import io
+import json
+
+import pytest
+
+from parser import serializer
+from parser.serializer import available_backends, curl_command, dumps, set_backend, write_curl_command
+
+payload = {
+    "title": "¿Qué tal? It's \"quoted\"",
+    "teleprompterEs": "Línea 1\nLínea 2\t😀 \x01",
+    "tags": ["uno", "dos"],
+    "empty": [],
+    "publishedEs": False,
+    "publishedDateEs": None,
+}
+
+@pytest.fixture(params=available_backends())
+def backend(request):
+    previous = serializer.backend
+    set_backend(request.param)
+    yield request.param
+    set_backend(previous)
+
+def test_dumps_matches_stdlib(backend):
+    assert dumps(payload) == json.dumps(payload, ensure_ascii=False)
+    assert dumps(payload, indent=2) == json.dumps(payload, indent=2, ensure_ascii=False)
+    assert dumps(payload, compact=True) == json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+def test_lone_surrogates_fall_back_to_json(backend):
+    assert json.loads(dumps({"x": "\ud800"}, indent=2)) == {"x": "\ud800"}
+
+def test_curl_command_escapes_single_quotes(backend):
+    command = curl_command("POST", "http://localhost:3000/api/contents", payload)
+    body = json.dumps(payload, indent=2, ensure_ascii=False).replace("'", "'\\''")
+    assert command == (
+        "curl -X POST http://localhost:3000/api/contents \\\n"
+        "  -H \"Content-Type: application/json\" \\\n"
+        f"  -d '{body}'"
+    )
+    stream = io.StringIO()
+    write_curl_command(stream, "POST", "http://localhost:3000/api/contents", payload)
+    assert stream.getvalue() == command
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        set_backend("yaml")
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
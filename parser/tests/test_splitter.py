@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for splitting concatenated exports into documents (splitter).
+"""
+import json
+import os
+import tempfile
+
+import pytest
+
+from parser.bench.corpus import generate_document
+from parser.splitter import document_spans, file_document_spans, read_span, split_documents
+from parser.tests.helpers import run_cli
+from parser.wordexporter import parse_word_text
+
+ORIGINAL_DOCUMENT = """{title}
+Teleprompter
+Español:
+Guion {n}.
+Ingles:
+Script {n}.
+
+Lista de tags
+Español:
+uno, dos
+Ingles:
+one, two
+"""
+
+def concatenated_documents():
+    return (
+        [generate_document("numbered", size=2 * 1024, seed=seed) for seed in range(3)]
+        + [generate_document("original", size=2 * 1024, sections=7, seed=seed) for seed in range(3)]
+        + [generate_document("numbered", size=2 * 1024, seed=3)]
+    )
+
+def test_split_matches_parsing_each_document():
+    documents = concatenated_documents()
+    parts = split_documents("\n\n".join(documents))
+    assert len(parts) == len(documents)
+    for part, document in zip(parts, documents):
+        assert parse_word_text(part) == parse_word_text(document)
+
+def test_single_document_is_one_span():
+    for document_format in ("numbered", "original"):
+        text = generate_document(document_format, size=4 * 1024, sections=7)
+        assert document_spans(text) == [(0, len(text))]
+    assert document_spans("") == [] and document_spans("\n  \n") == []
+
+def test_original_title_and_teleprompter_inside_text():
+    first = ORIGINAL_DOCUMENT.format(title="Primer vídeo", n=1)
+    second = ORIGINAL_DOCUMENT.format(title="Segundo vídeo", n=2)
+    # Later teleprompter headers without a title line in front are not boundaries
+    assert split_documents(first + "\n" + second) == [first + "\n", second]
+    assert len(split_documents(first + "Teleprompter\n")) == 1
+
+def test_numbering_must_restart():
+    text = "1. Título Atractivo (SEO)\nEspañol: Uno\n\n2. Comentario Pineado (Español)\nHola\n"
+    assert len(split_documents(text)) == 1
+    assert len(split_documents(text + text)) == 2
+    # "1." inside an original document is ordinary text unless it starts a
+    # known numbered section
+    original = ORIGINAL_DOCUMENT.format(title="Título", n="\n\n1. Primero")
+    assert len(split_documents(original)) == 1
+    assert len(split_documents(original + "\n" + text)) == 2
+
+def test_bytes_and_str_offsets_agree():
+    text = "\n\n".join(concatenated_documents()).replace("\n", "\r\n")
+    data = text.encode("utf-8")
+    byte_spans = document_spans(data)
+    assert [data[start:end].decode("utf-8") for start, end in byte_spans] == split_documents(text)
+
+def test_file_spans_and_read_span():
+    documents = concatenated_documents()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "export.txt")
+        with open(path, "w", encoding="utf-8-sig", newline="\r\n") as f:
+            f.write("\n".join(documents))
+        spans = file_document_spans(path)
+        assert spans[0][0] == 3
+        assert [parse_word_text(read_span(path, *span)) for span in spans] == [
+            parse_word_text(document) for document in documents
+        ]
+
+def test_cli_split_batch():
+    documents = concatenated_documents()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "export.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(documents))
+        for jobs in ("1", "3"):
+            result = run_cli("--batch", directory, "--split", "-j", jobs, "--no-cache")
+            assert result.returncode == 0, result.stderr
+            records = [json.loads(line) for line in result.stdout.splitlines()]
+            assert [record["document"] for record in records] == list(range(1, len(documents) + 1))
+            assert [record["data"] for record in records] == [parse_word_text(d) for d in documents]
+            assert "Processed 7 documents from 1 files" in result.stderr
+
+        result = run_cli("-i", path, "--split")
+        assert result.returncode == 1 and "--split requires --batch" in result.stderr
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
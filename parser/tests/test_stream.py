@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming parse API (parse_word_stream).
+"""
+import io
+
+from parser.wordexporter import parse_word_text, parse_word_stream
+
+numbered_format = """1. Script de Teleprompter (Inglés)
+This is the English script.
+
+2. Título Atractivo (SEO)
+Español: Prueba de streaming
+Inglés: Streaming test
+
+3. Lista de Tags (Español)
+streaming, prueba, parser, python
+"""
+
+original_format = """Streaming Title
+Teleprompter
+Español:
+Guion en español.
+Ingles:
+Script in English.
+
+Post para X
+Español:
+Post para X en español #ejemplo
+"""
+
+def test_stream_matches_parse_word_text():
+    for text in (numbered_format, original_format):
+        streamed = dict(parse_word_stream(io.StringIO(text)))
+        expected = parse_word_text(text)
+        for field, value in streamed.items():
+            assert expected[field] == value
+
+def test_stream_emits_sections_lazily():
+    consumed = []
+
+    def lines():
+        for line in numbered_format.splitlines(keepends=True):
+            consumed.append(line)
+            yield line
+
+    stream = parse_word_stream(lines())
+    field, value = next(stream)
+    assert field == "teleprompterEn"
+    assert value == "This is the English script."
+    # Only the first section and the header that closes it have been read
+    assert len(consumed) == 4
+
+def test_stream_empty_input():
+    assert list(parse_word_stream(io.StringIO("\n\n"))) == []
+    assert parse_word_text("")["title"] is None
+
+def test_numbered_tags_derived_at_end():
+    fields = list(parse_word_stream(io.StringIO(numbered_format)))
+    assert fields[-1] == ("tags", ["streaming", "prueba", "parser"])
+
+if __name__ == "__main__":
+    test_stream_matches_parse_word_text()
+    test_stream_emits_sections_lazily()
+    test_stream_empty_input()
+    test_numbered_tags_derived_at_end()
+    print("✅ Streaming parser tests passed")
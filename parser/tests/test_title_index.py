@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Tests for the prefetched title index, against a local stub API server.
+"""
+import pytest
+
+pytest.importorskip("requests")
+
+from parser.title_index import TitleIndex, normalize_title
+
+CONTENTS = [
+    {"_id": "c3", "title": "💸 OpenAI COMPRA Windsurf: ¿El Futuro de la Programación con IA?"},
+    {"_id": "c2", "title": "¿Es la Inteligencia Artificial el Último Gran Invento?"},
+    {"_id": "c1", "title": "Es la inteligencia artificial el último gran invento"},
+    {"_id": "c0", "title": "Prueba   de   espacios"},
+    {"_id": "old", "title": "prueba de espacios"},
+]
+
+@pytest.fixture
+def api(contents_api):
+    contents_api.contents = CONTENTS
+    return contents_api
+
+def test_fetch_once_and_lookup_locally(api):
+    index = TitleIndex.fetch(api.url)
+    assert len(api.requests) == 1
+    assert len(index) == 4
+
+    assert index.lookup("¿es la inteligencia artificial el último gran invento?")["_id"] == "c2"
+    assert index.lookup("  PRUEBA de espacios ")["_id"] == "c0"
+    assert index.lookup("Unknown title") is None
+    # Lookups never go back to the server
+    assert len(api.requests) == 1
+
+def test_fuzzy_matches_near_identical_titles(api):
+    index = TitleIndex.fetch(api.url, fuzzy=True)
+    match = index.find("OpenAI COMPRA Windsurf: ¿El Futuro de la Programación con IA?", threshold=0.8)
+    assert match["_id"] == "c3"
+    assert match["match"] == "fuzzy"
+    assert 0.8 <= match["score"] < 1
+
+    assert index.find("Es la inteligencia artificial el último gran invento")["match"] == "exact"
+    assert index.find("Completely different subject", threshold=0.5) is None
+
+def test_find_similar_requires_fuzzy_index():
+    with pytest.raises(ValueError):
+        TitleIndex(CONTENTS).find_similar("anything")
+
+def test_normalize_title():
+    assert normalize_title("  Ｆｕｌｌ Width\tTitle ") == "full width title"
+    assert normalize_title(None) == ""
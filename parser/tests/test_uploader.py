@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tests for the pooled content uploader, against a local stub API server.
+"""
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from parser.tests.helpers import CONTENTS_PATH, ContentsApi
+from parser.uploader import ContentUploader, format_summary, summarize
+from parser.wordexporter import parse_word_text
+
+test_input = """1. Teleprompter Script (English)
+Uploader test script.
+
+2. Attractive Title (SEO)
+Español: Prueba del uploader
+"""
+
+class UploaderApi(ContentsApi):
+    """
+    The contents API, except that the first POST for a title ending in
+    "flaky" gets a 503, a title ending in "broken" always gets a 500, one
+    ending in "slow" is answered after half a second and "rejected" gets a
+    400. GET of the content "unavailable" fails with a 500.
+    """
+
+    def route(self, method, path, query, payload):
+        title = (payload or {}).get("title", "")
+        if title.endswith("flaky"):
+            with self.lock:
+                attempts = sum(1 for request in self.requests if (request[3] or {}).get("title") == title)
+            if attempts == 1:
+                return 503, {"message": "try again"}
+        if title.endswith("slow"):
+            time.sleep(0.5)
+            return 201, {"_id": "slow", **payload}
+        if title.endswith("broken"):
+            return 500, {"message": "Error creating content"}
+        if title == "rejected":
+            return 400, {"message": "Title is required"}
+        if method == "GET" and path.endswith("/unavailable"):
+            return 500, {"message": "Error fetching content"}
+        if method == "POST":
+            return 201, {"_id": f"id-{title}", **payload}
+        return super().route(method, path, query, payload)
+
+@pytest.fixture
+def api(serve):
+    return serve(UploaderApi, CONTENTS_PATH, contents=[], writes=[])
+
+def test_create_and_update(api):
+    parsed = parse_word_text(test_input)
+    with ContentUploader(api.url, backoff=0) as uploader:
+        created = uploader.create(parsed, label="doc")
+        updated = uploader.update(parsed, "abc123", label="doc")
+    assert created["ok"] and created["status"] == 201
+    assert created["id"] == "id-Prueba del uploader"
+    assert updated["ok"] and updated["action"] == "update"
+    methods = [(method, path) for method, path, _, _ in api.requests]
+    assert methods == [("POST", "/api/contents"), ("PUT", "/api/contents/abc123")]
+
+def test_upload_many_retries_and_reports(api):
+    jobs = []
+    for n in range(20):
+        parsed = parse_word_text(test_input)
+        parsed["title"] = f"doc {n}" + (" flaky" if n % 5 == 0 else "")
+        jobs.append((f"doc{n}.txt", parsed, None))
+    rejected = parse_word_text(test_input)
+    rejected["title"] = "rejected"
+    jobs.append(("rejected.txt", rejected, None))
+
+    with ContentUploader(api.url, concurrency=4, backoff=0) as uploader:
+        results = uploader.upload_many(jobs)
+
+    assert [r["label"] for r in results] == [label for label, _, _ in jobs]
+    summary = summarize(results)
+    assert summary == {"total": 21, "created": 20, "updated": 0, "failed": 1, "retried": 4}
+    # Client errors are not retried
+    assert results[-1]["attempts"] == 1
+    assert "FAILED rejected.txt: HTTP 400" in format_summary(summary, results)
+
+def test_creates_are_not_retried_once_sent(api):
+    parsed = parse_word_text(test_input)
+    parsed["title"] = "broken"
+    with ContentUploader(api.url, retries=2, backoff=0) as uploader:
+        created = uploader.create(parsed)
+        updated = uploader.update(parsed, "abc123")
+    # The create may have been stored before the 500; an update is safe to repeat
+    assert created["attempts"] == 1 and created["status"] == 500
+    assert updated["attempts"] == 3
+
+    parsed["title"] = "slow"
+    with ContentUploader(api.url, retries=2, backoff=0, timeout=0.2) as uploader:
+        timed_out = uploader.create(parsed)
+    assert timed_out["attempts"] == 1 and "ReadTimeout" in timed_out["error"]
+
+def test_connection_errors_are_retried_then_reported():
+    with ContentUploader("http://127.0.0.1:9/api/contents", retries=2, backoff=0, timeout=1) as uploader:
+        result = uploader.create(parse_word_text(test_input), label="offline")
+    assert not result["ok"]
+    assert result["attempts"] == 3
+    assert result["status"] is None
+    assert "ConnectionError" in result["error"]
+
+def test_delta_updates_send_changed_fields(api):
+    parsed = parse_word_text(test_input)
+    # Current server state: old title, same script, a comment the document does not have
+    api.contents.append({"_id": "abc123", "title": "Título anterior", "tags": [],
+                         "teleprompterEn": parsed["teleprompterEn"], "pinnedCommentEs": "Fijado"})
+    cached = dict(api.contents[0], title=parsed["title"])
+    with ContentUploader(api.url, backoff=0, delta=True) as uploader:
+        patched = uploader.upload(parsed, "abc123", label="doc")
+        missing = uploader.upload(parsed, "gone", label="gone")
+        uploader.lookup = {"abc123": cached}.get
+        unchanged = uploader.upload(parsed, "abc123", label="cached")
+
+    assert [(method, path, payload) for method, path, _, payload in api.requests] == [
+        ("GET", "/api/contents/abc123", None),
+        ("PATCH", "/api/contents/abc123", {"title": "Prueba del uploader"}),
+        ("GET", "/api/contents/gone", None),
+    ]
+    assert patched["ok"] and patched["id"] == "abc123" and patched["bytes"] < patched["full_bytes"]
+    assert not missing["ok"] and "HTTP 404" in missing["error"]
+    assert unchanged["ok"] and unchanged["unchanged"] and unchanged["bytes"] == 0
+
+    results = [patched, unchanged]
+    summary = summarize(results)
+    assert summary["updated"] == 2 and summary["unchanged"] == 1
+    assert summary["saved_bytes"] == 2 * patched["full_bytes"] - patched["bytes"]
+    assert f"({summary['saved_bytes']} saved" in format_summary(summary, results)
+
+def test_delta_update_fails_when_current_content_cannot_be_fetched(api):
+    parsed = parse_word_text(test_input)
+    api.contents.append({"_id": "abc123", "title": "Título anterior"})
+    with ContentUploader(api.url, retries=1, backoff=0, delta=True) as uploader:
+        results = [uploader.upload(parsed, "unavailable"), uploader.upload(parsed, "abc123")]
+
+    failed, patched = results
+    assert not failed["ok"] and failed["attempts"] == 2 and "HTTP 500" in failed["error"]
+    assert "full_bytes" not in failed
+    assert not any(method == "PATCH" and path.endswith("/unavailable") for method, path, _, _ in api.requests)
+    # Only the applied update counts towards the bytes saved
+    summary = summarize(results)
+    assert summary["failed"] == 1
+    assert summary["full_bytes"] == patched["full_bytes"]
+    assert summary["saved_bytes"] == patched["full_bytes"] - patched["bytes"]
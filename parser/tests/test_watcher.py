@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the watch-folder daemon (watcher): change sources, debouncing and
+uploading through a pooled client.
+"""
+import io
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from parser.title_index import TitleIndex
+from parser.uploader import ContentUploader
+from parser.watcher import FolderWatcher, InotifySource, PollingSource, WatchUploader, is_watched
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+EXISTING = [{"_id": "exact-id", "title": "Documento existente"}]
+
+DOCUMENT = """1. Teleprompter Script (English)
+Watched document.
+
+2. Attractive Title (SEO)
+Español: {title}
+"""
+
+def sources(directory):
+    yield PollingSource(directory, interval=0.05)
+    try:
+        yield InotifySource(directory)
+    except OSError:
+        pass
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def poll_until(watcher, calls, count, limit=5.0):
+    deadline = time.monotonic() + limit
+    while len(calls) < count and time.monotonic() < deadline:
+        watcher.poll(0.05)
+
+def test_is_watched():
+    assert is_watched("video.txt") and is_watched("Video.DOCX")
+    assert not is_watched("notes.md") and not is_watched(".video.txt") and not is_watched("~$video.docx")
+
+def test_rapid_saves_are_handled_once():
+    with tempfile.TemporaryDirectory() as directory:
+        write(os.path.join(directory, "old.txt"), "already here")
+        for source in sources(directory):
+            calls = []
+            watcher = FolderWatcher(directory, calls.append, debounce=0.3, source=source)
+            path = os.path.join(directory, f"doc-{type(source).__name__}.txt")
+            for n in range(5):
+                write(path, f"save {n}")
+                watcher.poll(0.05)
+            write(os.path.join(directory, "ignored.md"), "not an export")
+            poll_until(watcher, calls, 1)
+            watcher.poll(0.4)
+            watcher.close()
+            assert calls == [[path]], type(source).__name__
+
+def test_uploads_creates_then_updates(contents_api):
+    with tempfile.TemporaryDirectory() as directory:
+        existing = os.path.join(directory, "existing.txt")
+        new = os.path.join(directory, "new.txt")
+        write(existing, DOCUMENT.format(title="Documento existente"))
+        write(new, DOCUMENT.format(title="Documento nuevo"))
+        log = io.StringIO()
+        with ContentUploader(contents_api.url, retries=0) as uploader:
+            handler = WatchUploader(uploader, TitleIndex(EXISTING), out=log)
+            handler([existing, new])
+            # Same content again: nothing to upload
+            handler([new])
+            # Renaming the video still updates the content created for the file
+            write(new, DOCUMENT.format(title="Documento renombrado"))
+            handler([new])
+    assert sorted(contents_api.writes[:2]) == [
+        ("POST", "/api/contents", "Documento nuevo"),
+        ("PUT", "/api/contents/exact-id", "Documento existente"),
+    ]
+    assert contents_api.writes[2:] == [("PUT", "/api/contents/new", "Documento renombrado")]
+    assert f"UNCHANGED {new}" in log.getvalue()
+
+def test_daemon_uploads_saved_files(contents_api):
+    with tempfile.TemporaryDirectory() as directory:
+        write(os.path.join(directory, "before.txt"), DOCUMENT.format(title="Documento previo"))
+        process = subprocess.Popen(
+            [sys.executable, "-m", "parser.watcher", directory, "-a", contents_api.url, "--debounce", "0.2"],
+            cwd=REPO_ROOT, stderr=subprocess.PIPE, text=True, encoding="utf-8"
+        )
+        try:
+            assert process.stderr.readline().startswith(f"Watching {directory}")
+            write(os.path.join(directory, "saved.txt"), DOCUMENT.format(title="Documento guardado"))
+            assert process.stderr.readline().startswith("CREATED")
+        finally:
+            process.send_signal(signal.SIGTERM)
+            process.wait(timeout=10)
+    assert process.returncode == 0
+    # Files present at startup are left alone without --initial
+    assert contents_api.writes == [("POST", "/api/contents", "Documento guardado")]
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,118 @@
+"""
+In-memory title index for deciding between creating and updating contents.
+
+Instead of one GET ?title= request per document, TitleIndex.fetch pulls
+/api/contents once and maps every normalized title to its content, so each
+create-or-update decision is a dictionary lookup. An optional trigram index
+finds near-identical titles (changed emoji, punctuation or a typo).
+"""
+import re
+import unicodedata
+from collections import Counter
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+def normalize_title(title):
+    """Normalizes a title for comparison: Unicode NFKC, case-folded, single spaces."""
+    if not title:
+        return ""
+    title = unicodedata.normalize("NFKC", title).casefold()
+    return WHITESPACE_PATTERN.sub(" ", title).strip()
+
+def title_trigrams(normalized):
+    """Returns the set of character trigrams of a normalized title."""
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TitleIndex:
+    """
+    Maps normalized titles to existing contents.
+
+    Args:
+        contents: Iterable of content dicts with at least "_id" and "title"
+        fuzzy (bool): Also build the trigram index used by find_similar
+    """
+
+    def __init__(self, contents=(), fuzzy=False):
+        self.fuzzy = fuzzy
+        self._by_title = {}
+        self._trigrams = {}
+        self._trigram_counts = {}
+        for content in contents:
+            self.add(content)
+
+    @classmethod
+    def fetch(cls, api_url, session=None, timeout=30, fuzzy=False):
+        """Builds an index from a single GET of the contents API."""
+        # requests is only needed to fetch
+        import requests
+
+        http = session or requests
+        response = http.get(api_url, timeout=timeout)
+        response.raise_for_status()
+        return cls(response.json(), fuzzy=fuzzy)
+
+    def __len__(self):
+        return len(self._by_title)
+
+    def add(self, content):
+        """
+        Adds one content to the index. The API lists contents newest first, so
+        for a repeated title the first content added wins.
+        """
+        normalized = normalize_title(content.get("title"))
+        if not normalized or normalized in self._by_title:
+            return
+        self._by_title[normalized] = {"_id": content.get("_id"), "title": content.get("title")}
+        if self.fuzzy:
+            trigrams = title_trigrams(normalized)
+            self._trigram_counts[normalized] = len(trigrams)
+            for trigram in trigrams:
+                self._trigrams.setdefault(trigram, []).append(normalized)
+
+    def lookup(self, title):
+        """Returns {"_id", "title"} of the content with exactly this normalized title, or None."""
+        return self._by_title.get(normalize_title(title))
+
+    def find_similar(self, title, threshold=0.7):
+        """
+        Finds the indexed title most similar to title.
+
+        Similarity is the Jaccard index of the character trigram sets.
+
+        Returns:
+            dict: {"_id", "title", "score"} of the best match with a score of
+            at least threshold, or None
+        """
+        if not self.fuzzy:
+            raise ValueError("TitleIndex was built without fuzzy=True")
+        normalized = normalize_title(title)
+        trigrams = title_trigrams(normalized)
+        shared = Counter()
+        for trigram in trigrams:
+            shared.update(self._trigrams.get(trigram, ()))
+
+        best = None
+        best_score = threshold
+        for candidate, common in shared.items():
+            score = common / (len(trigrams) + self._trigram_counts[candidate] - common)
+            if score >= best_score:
+                best, best_score = candidate, score
+        if best is None:
+            return None
+        return dict(self._by_title[best], score=round(best_score, 3))
+
+    def find(self, title, threshold=0.7):
+        """
+        Returns the exact match for title or, if fuzzy matching is enabled, the
+        most similar title above threshold. The result carries a "match" key
+        of "exact" or "fuzzy"; None if nothing matches.
+        """
+        match = self.lookup(title)
+        if match:
+            return dict(match, match="exact")
+        if self.fuzzy:
+            match = self.find_similar(title, threshold)
+            if match:
+                return dict(match, match="fuzzy")
+        return None
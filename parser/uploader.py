@@ -0,0 +1,256 @@
+"""
+Concurrent uploader that sends parsed documents straight to /api/contents.
+
+Replaces the generated curl scripts for batch imports: every request goes
+through one pooled requests.Session with keep-alive, at most `concurrency`
+requests are in flight at once, and transient failures are retried with
+exponential backoff.
+
+With delta set, updates send only what changed: the content's current
+document is taken from a lookup (e.g. contents already fetched, or the local
+content mirror) or fetched with GET, diffed field by field against the new
+parse, and the changed non-empty fields go out as PATCH /api/contents/:id.
+The results record the bytes sent and what the full PUT would have sent.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+try:
+    from .serializer import dumps
+    from .wordexporter import build_create_payload, build_patch_payload, build_update_payload
+except ImportError:
+    from serializer import dumps
+    from wordexporter import build_create_payload, build_patch_payload, build_update_payload
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# A create is not idempotent: a timeout or 5xx may come after the server
+# stored it, so POST is only retried on responses that say it was not applied
+CREATE_RETRY_STATUSES = {429, 503}
+
+JSON_HEADERS = {"Content-Type": "application/json; charset=utf-8"}
+
+class ContentUploader:
+    """
+    Creates and updates contents through the REST API.
+
+    Args:
+        api_url (str): Base contents URL, e.g. http://localhost:3000/api/contents
+        concurrency (int): Maximum number of requests in flight
+        retries (int): Retries per request after the first attempt
+        backoff (float): Initial retry delay in seconds, doubled on each retry
+        timeout (float): Per-request timeout in seconds
+        session (requests.Session): Session to use instead of a new pooled one
+        delta (bool): Update with sparse PATCH requests instead of full PUTs
+        lookup: Callable returning the server's document for a content _id,
+            or None to fetch it; only used with delta
+    """
+
+    def __init__(self, api_url, concurrency=8, retries=3, backoff=0.5, timeout=30, session=None,
+                 delta=False, lookup=None):
+        self.api_url = api_url.rstrip("/")
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.delta = delta
+        self.lookup = lookup
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def create(self, parsed_data, label=None):
+        """POSTs a new content. Returns a result dict (see upload)."""
+        return self._send("POST", self.api_url, build_create_payload(parsed_data), "create", label)
+
+    def update(self, parsed_data, content_id, label=None):
+        """PUTs parsed_data over the content with the given ID. Returns a result dict."""
+        url = f"{self.api_url}/{content_id}"
+        return self._send("PUT", url, build_update_payload(parsed_data), "update", label)
+
+    def patch(self, parsed_data, content_id, label=None):
+        """
+        Sends only the fields of parsed_data that differ from the content's
+        current document, through PATCH. Nothing is sent if no field changed.
+
+        Returns:
+            dict: A result dict (see upload) with full_bytes, the size of the
+            PUT body it replaces, and unchanged set when nothing was sent.
+            full_bytes is left out if the current content could not be fetched
+        """
+        url = f"{self.api_url}/{content_id}"
+        full_bytes = len(dumps(build_update_payload(parsed_data), compact=True).encode("utf-8"))
+        start = time.perf_counter()
+        current = self.lookup(content_id) if self.lookup else None
+        if current is None:
+            result = self._result("update", label)
+            response = self._request("GET", url, None, result)
+            try:
+                current = response.json() if response is not None else None
+            except ValueError:
+                result.update(ok=False, error="Current content is not valid JSON")
+            if current is None:
+                result["seconds"] = time.perf_counter() - start
+                return result
+
+        payload = build_patch_payload(parsed_data, current)
+        if payload:
+            result = self._send("PATCH", url, payload, "update", label)
+        else:
+            result = self._result("update", label)
+            result.update(ok=True, id=content_id, unchanged=True)
+        result["seconds"] = time.perf_counter() - start
+        result["full_bytes"] = full_bytes
+        return result
+
+    def upload(self, parsed_data, content_id=None, label=None):
+        """
+        Creates or updates one content.
+
+        Returns:
+            dict: label, action ("create"/"update"), ok, status (HTTP status
+            or None), id, attempts, bytes (request body size), seconds and,
+            on failure, error
+        """
+        if content_id:
+            if self.delta:
+                return self.patch(parsed_data, content_id, label)
+            return self.update(parsed_data, content_id, label)
+        return self.create(parsed_data, label)
+
+    def upload_many(self, jobs):
+        """
+        Uploads many documents concurrently.
+
+        Args:
+            jobs: Iterable of (label, parsed_data, content_id) tuples; a falsy
+                content_id creates a new content
+
+        Returns:
+            list: One result dict per job, in job order
+        """
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = [
+                executor.submit(self.upload, parsed_data, content_id, label)
+                for label, parsed_data, content_id in jobs
+            ]
+            return [future.result() for future in futures]
+
+    def _result(self, action, label):
+        return {"label": label, "action": action, "ok": False, "status": None,
+                "id": None, "attempts": 0, "bytes": 0}
+
+    def _send(self, method, url, payload, action, label):
+        result = self._result(action, label)
+        start = time.perf_counter()
+        # Serialized once, compact and UTF-8, and reused by every retry
+        body = dumps(payload, compact=True).encode("utf-8")
+        result["bytes"] = len(body)
+        response = self._request(method, url, body, result)
+        if response is not None:
+            try:
+                result["id"] = response.json().get("_id")
+            except ValueError:
+                pass
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    def _request(self, method, url, body, result):
+        """
+        Sends one request, retrying transient failures, and records attempts,
+        status and error in result. Returns the successful response or None.
+
+        POST is only retried when the connection could not be opened or the
+        server answered 429/503, so a retry never creates a second content.
+        """
+        retry_statuses = CREATE_RETRY_STATUSES if method == "POST" else RETRY_STATUSES
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            result["attempts"] = attempt + 1
+            try:
+                response = self.session.request(method, url, data=body, headers=JSON_HEADERS,
+                                                timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                result["error"] = f"{type(e).__name__}: {e}"
+                if method == "POST" and not connect_failed(e):
+                    break
+            else:
+                result["status"] = response.status_code
+                if response.ok:
+                    result["ok"] = True
+                    result.pop("error", None)
+                    return response
+                result["error"] = f"HTTP {response.status_code}: {response.text[:200]}"
+                if response.status_code not in retry_statuses:
+                    break
+            if attempt < self.retries:
+                time.sleep(delay)
+                delay *= 2
+        return None
+
+def connect_failed(error):
+    """Returns True if a requests error means the connection was never opened, so nothing was sent."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+def summarize(results, elapsed=None):
+    """
+    Returns counts of created, updated and failed uploads from a list of
+    results and, when there were successful delta updates, the bytes they
+    sent against the full PUT bodies they replaced.
+    """
+    summary = {
+        "total": len(results),
+        "created": sum(1 for r in results if r["ok"] and r["action"] == "create"),
+        "updated": sum(1 for r in results if r["ok"] and r["action"] == "update"),
+        "failed": sum(1 for r in results if not r["ok"]),
+        "retried": sum(1 for r in results if r["attempts"] > 1),
+    }
+    patches = [r for r in results if r["ok"] and "full_bytes" in r]
+    if patches:
+        summary["unchanged"] = sum(1 for r in patches if r.get("unchanged"))
+        summary["patch_bytes"] = sum(r["bytes"] for r in patches)
+        summary["full_bytes"] = sum(r["full_bytes"] for r in patches)
+        summary["saved_bytes"] = summary["full_bytes"] - summary["patch_bytes"]
+    if elapsed is not None:
+        summary["seconds"] = round(elapsed, 3)
+    return summary
+
+def format_summary(summary, results):
+    """Formats an upload summary, listing every failed document."""
+    lines = [
+        f"Uploaded {summary['total']} documents: {summary['created']} created, "
+        f"{summary['updated']} updated, {summary['failed']} failed "
+        f"({summary['retried']} needed retries)"
+    ]
+    if "seconds" in summary:
+        lines[0] += f" in {summary['seconds']:.2f}s"
+    if "saved_bytes" in summary:
+        saved = summary["saved_bytes"] / summary["full_bytes"] if summary["full_bytes"] else 0
+        lines.append(
+            f"Delta updates sent {summary['patch_bytes']} of {summary['full_bytes']} bytes "
+            f"({summary['saved_bytes']} saved, {saved:.0%}); {summary['unchanged']} unchanged"
+        )
+    for result in results:
+        if not result["ok"]:
+            lines.append(f"  FAILED {result['label']}: {result.get('error')}")
+    return "\n".join(lines)
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Watch-folder daemon that parses and uploads exports as they are saved.
+
+Editors drop .txt/.docx exports into a shared folder. FolderWatcher notices
+new and changed files (through inotify on Linux, by polling elsewhere),
+waits until a file has been quiet for the debounce interval so that a burst
+of saves is handled once, and passes the settled files to a handler.
+WatchUploader parses them with the regular parser and creates or updates
+their contents through one pooled ContentUploader, so the interpreter, the
+parser's compiled tables and the HTTP connections stay warm between files.
+
+A file is matched to a content by what this daemon uploaded for it before,
+or else by its exact (normalized) title among the existing contents; other
+files create a new content. Saves that do not change the parsed document
+are not uploaded again; with --delta, updates send only the fields that
+differ from the content on the server.
+
+Usage:
+    python -m parser.watcher exports/ -a http://localhost:3000/api/contents
+"""
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import signal
+import struct
+import sys
+import threading
+import time
+
+try:
+    from .docx_reader import is_docx, parse_docx
+    from .mmap_reader import parse_text_file
+    from .serializer import dumps
+    from .title_index import TitleIndex
+except ImportError:
+    from docx_reader import is_docx, parse_docx
+    from mmap_reader import parse_text_file
+    from serializer import dumps
+    from title_index import TitleIndex
+
+WATCHED_SUFFIXES = (".txt", ".docx")
+
+# Seconds a file must stay unchanged before it is processed
+DEFAULT_DEBOUNCE = 1.0
+
+# Seconds between directory scans when polling
+DEFAULT_POLL_INTERVAL = 1.0
+
+# inotify(7) event bits
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+# struct inotify_event header: wd, mask, cookie, len
+EVENT_HEADER = struct.Struct("iIII")
+
+def is_watched(name):
+    """Returns True for export files, leaving out hidden files and Office lock files (~$name.docx)."""
+    return name.lower().endswith(WATCHED_SUFFIXES) and not name.startswith((".", "~$"))
+
+def scan_directory(directory):
+    """Returns {path: (mtime_ns, size)} for every watched file in directory."""
+    snapshot = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not is_watched(entry.name):
+                continue
+            try:
+                if entry.is_file():
+                    stat = entry.stat()
+                    snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                # Deleted between listing and stat
+                pass
+    return snapshot
+
+class PollingSource:
+    """
+    Detects changes by comparing the modification time and size of every
+    watched file between scans of the directory.
+
+    Args:
+        directory (str): Folder to watch
+        interval (float): Seconds between scans
+    """
+
+    def __init__(self, directory, interval=DEFAULT_POLL_INTERVAL):
+        self.directory = directory
+        self.interval = interval
+        self._snapshot = scan_directory(directory)
+        self._next_scan = time.monotonic() + interval
+
+    def close(self):
+        pass
+
+    def wait(self, timeout):
+        """
+        Waits up to timeout seconds (None for no limit) and returns the set of
+        paths created or changed since the previous call.
+        """
+        now = time.monotonic()
+        delay = max(0.0, self._next_scan - now)
+        if timeout is not None and timeout < delay:
+            time.sleep(timeout)
+            return set()
+        time.sleep(delay)
+        self._next_scan = time.monotonic() + self.interval
+        snapshot = scan_directory(self.directory)
+        changed = {path for path, state in snapshot.items() if self._snapshot.get(path) != state}
+        self._snapshot = snapshot
+        return changed
+
+class InotifySource:
+    """
+    Detects changes through Linux inotify: the kernel reports writes,
+    creations and files moved into the folder, so waiting costs nothing.
+
+    Raises OSError if inotify is not available.
+
+    Args:
+        directory (str): Folder to watch
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        libc_name = ctypes.util.find_library("c")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"Cannot watch {directory}")
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def wait(self, timeout):
+        """
+        Waits up to timeout seconds (None for no limit) and returns the set of
+        paths created or changed since the previous call.
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    # Events were dropped: treat every file as changed
+                    changed.update(scan_directory(self.directory))
+                elif name and is_watched(name):
+                    changed.add(os.path.join(self.directory, name))
+        return changed
+
+def open_source(directory, polling=False, interval=DEFAULT_POLL_INTERVAL):
+    """Returns an InotifySource for directory, or a PollingSource if polling is set or inotify is unavailable."""
+    if not polling:
+        try:
+            return InotifySource(directory)
+        except (OSError, AttributeError):
+            pass
+    return PollingSource(directory, interval)
+
+class FolderWatcher:
+    """
+    Calls handler with the paths of files that changed, once each has been
+    quiet for debounce seconds.
+
+    Args:
+        directory (str): Folder to watch
+        handler: Callable taking a sorted list of paths
+        debounce (float): Seconds without changes before a file is handled
+        source: PollingSource or InotifySource (default: open_source(directory))
+    """
+
+    def __init__(self, directory, handler, debounce=DEFAULT_DEBOUNCE, source=None):
+        self.directory = directory
+        self.handler = handler
+        self.debounce = debounce
+        self.source = source or open_source(directory)
+        # path -> time after which it counts as settled
+        self.pending = {}
+
+    def close(self):
+        self.source.close()
+
+    def add(self, paths):
+        """Queues paths as if they had just changed, e.g. the files present at startup."""
+        deadline = time.monotonic() + self.debounce
+        for path in paths:
+            self.pending[path] = deadline
+
+    def poll(self, timeout=None):
+        """
+        Waits for changes once, up to timeout seconds or until the next
+        pending file settles, and hands settled files to the handler.
+
+        Returns:
+            list: The paths handled
+        """
+        now = time.monotonic()
+        if self.pending:
+            until_settled = max(0.0, min(self.pending.values()) - now)
+            timeout = until_settled if timeout is None else min(timeout, until_settled)
+        self.add(self.source.wait(timeout))
+
+        now = time.monotonic()
+        settled = sorted(path for path, deadline in self.pending.items() if deadline <= now)
+        for path in settled:
+            del self.pending[path]
+        settled = [path for path in settled if os.path.isfile(path)]
+        if settled:
+            self.handler(settled)
+        return settled
+
+    def run(self, stop=None, tick=0.5):
+        """
+        Handles changes until stop (a threading.Event) is set. The event is
+        checked at least every tick seconds.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.poll(tick)
+
+def parse_path(path):
+    """Parses one export the way cli.py does without the cache: .docx streamed, text memory-mapped if large."""
+    parse = parse_docx if is_docx(path) else parse_text_file
+    return parse(path)
+
+class WatchUploader:
+    """
+    Handler for FolderWatcher that parses files and creates or updates their
+    contents.
+
+    Args:
+        uploader: ContentUploader, kept open for the life of the watcher
+        index (TitleIndex): Existing contents, used to match files by title
+        out: Stream for the progress log
+    """
+
+    def __init__(self, uploader, index=None, out=sys.stderr):
+        self.uploader = uploader
+        self.index = index if index is not None else TitleIndex()
+        self.out = out
+        # path -> content _id uploaded for it
+        self.ids = {}
+        # path -> serialized parse last uploaded, to skip saves that change nothing
+        self.uploaded = {}
+
+    def log(self, message):
+        print(message, file=self.out, flush=True)
+
+    def __call__(self, paths):
+        jobs = []
+        for path in paths:
+            try:
+                data = parse_path(path)
+            except Exception as e:
+                self.log(f"Error processing {path}: {type(e).__name__}: {e}")
+                continue
+            serialized = dumps(data, compact=True)
+            if self.uploaded.get(path) == serialized:
+                self.log(f"UNCHANGED {path}")
+                continue
+            content_id = self.ids.get(path)
+            if content_id is None:
+                existing = self.index.lookup(data.get("title"))
+                content_id = existing["_id"] if existing else None
+            jobs.append((path, data, content_id, serialized))
+
+        results = self.uploader.upload_many((path, data, content_id) for path, data, content_id, _ in jobs)
+        for (path, data, _, serialized), result in zip(jobs, results):
+            if not result["ok"]:
+                self.log(f"FAILED {path}: {result.get('error')}")
+                continue
+            self.uploaded[path] = serialized
+            if result["id"]:
+                self.ids[path] = result["id"]
+                self.index.add({"_id": result["id"], "title": data.get("title")})
+            if result.get("unchanged"):
+                self.log(f"UNCHANGED {path}: content {result['id']} already has these fields")
+                continue
+            action = "CREATED" if result["action"] == "create" else "UPDATED"
+            self.log(f"{action} {path} -> {result['id'] or self.ids.get(path)} ({result['seconds'] * 1000:.0f} ms)")
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a folder and upload exports as they are saved")
+    parser.add_argument("directory", help="Folder receiving .txt/.docx exports")
+    parser.add_argument("--api-url", "-a", required=True, help="Contents URL, e.g. http://localhost:3000/api/contents")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                        help=f"Seconds a file must stay unchanged before upload (default: {DEFAULT_DEBOUNCE})")
+    parser.add_argument("--polling", action="store_true", help="Poll the folder instead of using inotify")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help=f"Seconds between scans when polling (default: {DEFAULT_POLL_INTERVAL})")
+    parser.add_argument("--initial", action="store_true", help="Also upload the files already in the folder")
+    parser.add_argument("--upload-concurrency", type=int, default=8,
+                        help="Maximum number of concurrent upload requests (default: 8)")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per upload request (default: 3)")
+    parser.add_argument("--delta", action="store_true",
+                        help="Update by PATCHing only the fields that differ from the content on the server")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        print(f"Error: not a directory: {args.directory}", file=sys.stderr)
+        sys.exit(1)
+
+    # requests is only needed when uploading
+    try:
+        from .uploader import ContentUploader
+    except ImportError:
+        from uploader import ContentUploader
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    with ContentUploader(args.api_url, concurrency=args.upload_concurrency, retries=args.retries,
+                         delta=args.delta) as uploader:
+        try:
+            index = TitleIndex.fetch(args.api_url, session=uploader.session)
+        except Exception as e:
+            print(f"Error fetching contents: {e}", file=sys.stderr)
+            sys.exit(1)
+        source = open_source(args.directory, args.polling, args.poll_interval)
+        watcher = FolderWatcher(args.directory, WatchUploader(uploader, index), args.debounce, source)
+        if args.initial:
+            watcher.add(scan_directory(args.directory))
+        mode = "inotify" if isinstance(source, InotifySource) else f"polling every {args.poll_interval}s"
+        print(f"Watching {args.directory} ({mode}); {len(index)} existing titles", file=sys.stderr, flush=True)
+        try:
+            watcher.run(stop)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,28 @@
+import heapq
+import io
+import itertools
 import json
 import re
-
-def parse_word_text(text_block):
-    data = {
+from collections import Counter
+
+try:
+    from .content import ParsedContent
+    from .language import STOP_WORDS, classify_lines, line_language
+    from .profiling import stage, timed_sections
+    from .serializer import curl_command
+except ImportError:
+    from content import ParsedContent
+    from language import STOP_WORDS, classify_lines, line_language
+    from profiling import stage, timed_sections
+    from serializer import curl_command
+
+# Bump whenever a change alters the output of parse_word_text, so results
+# cached by earlier versions are not reused.
+PARSER_VERSION = "2"
+
+def empty_parsed_data():
+    """Returns the parse result skeleton with every field at its default."""
+    return {
         "title": None,
         "teleprompterEs": "",
         "teleprompterEn": "",
@@ -21,284 +41,440 @@ def parse_word_text(text_block):
         "tags": [] # This will be derived from tagsListEs
     }
 
-    # Clean text and split into lines
-    lines = text_block.strip().split('\n')
+def parse_word_text(text_block):
+    data = empty_parsed_data()
+    data.update(parse_word_stream(io.StringIO(text_block)))
+    return data
 
-    # Detect if it's the new numbered format
-    if lines and re.match(r'^\d+\.\s', lines[0]):
-        return parse_numbered_format(text_block, data)
-    else:
+def parse_content(text_block):
+    """
+    Parses text like parse_word_text but returns a compact ParsedContent
+    record instead of a dict, for callers that hold many parsed documents.
+    """
+    return ParsedContent.from_pairs(parse_word_stream(io.StringIO(text_block)))
+
+def parse_word_stream(lines):
+    """
+    Parses structured text lazily, one line at a time.
+
+    Args:
+        lines: Any iterable of lines, such as an open text file
+
+    Yields:
+        tuple: (field, value) pairs, emitted as soon as each section closes.
+        A field may be yielded more than once; the last value wins.
+    """
+    document_format, lines = detect_format(lines)
+    if document_format == "numbered":
+        yield from with_description_tags(iter_numbered_format(lines))
+    elif document_format == "original":
+        yield from with_description_tags(iter_original_format(lines))
+
+def with_description_tags(pairs):
+    """
+    Passes (field, value) pairs through and, if none of them set any tags,
+    ends with tags derived from the video descriptions.
+
+    Only the description values are kept, so the other sections are not
+    held in memory after they have been yielded.
+    """
+    descriptions = {}
+    has_tags = False
+    for field, value in pairs:
+        if field in TAG_SOURCE_FIELDS:
+            descriptions[field] = value
+        elif field == "tags":
+            has_tags = bool(value)
+        yield field, value
+    if not has_tags:
+        tags = description_tags(descriptions)
+        if tags:
+            yield "tags", tags
+
+def detect_format(lines):
+    """
+    Detects the document format from the first non-empty line.
+
+    Returns:
+        tuple: (format, lines) where format is "numbered", "original" or None
+        for an empty document, and lines iterates over the document starting
+        at its first non-empty line
+    """
+    with stage("detect"):
+        lines = iter(lines)
+        for first_line in lines:
+            if first_line.strip():
+                break
+        else:
+            return None, lines
+        lines = itertools.chain([first_line], lines)
+
+        # Detect if it's the new numbered format
+        if NUMBERED_SECTION_PATTERN.match(first_line.rstrip("\n").lstrip()):
+            return "numbered", lines
         # Use original format
-        return parse_original_format(text_block, data)
+        return "original", lines
+
+# Numbered-format section header, e.g. "3. Descripción para YouTube (Español)"
+NUMBERED_SECTION_PATTERN = re.compile(r'^\d+\.\s')
 
 def truncate_twitter_post(text, max_length=180):
     """Truncates text to not exceed Twitter's limit, trying to cut at a space."""
-    if len(text) <= max_length:
-        return text
-    # Truncate at the last space before the limit
-    truncated = text[:max_length].rsplit(' ', 1)[0]
-    return truncated
+    with stage("truncate"):
+        if len(text) <= max_length:
+            return text
+        # Truncate at the last space before the limit
+        truncated = text[:max_length].rsplit(' ', 1)[0]
+        return truncated
+
+# Section headers of the original format and the (Spanish, English) fields they
+# fill. Order matters: the first header that prefixes a line wins, so longer
+# headers such as "tags list" must come before "tags".
+ORIGINAL_SECTION_HEADERS = (
+    ("descripción optimizada", ("videoDescriptionEs", "videoDescriptionEn")),
+    ("description optimized", ("videoDescriptionEs", "videoDescriptionEn")),
+    ("comentario para pinear", ("pinnedCommentEs", "pinnedCommentEn")),
+    ("pinned comment", ("pinnedCommentEs", "pinnedCommentEn")),
+    ("descripción simplificada", ("tiktokDescriptionEs", "tiktokDescriptionEn")),
+    ("simplified description", ("tiktokDescriptionEs", "tiktokDescriptionEn")),
+    ("descripción para x", ("twitterPostEs", "twitterPostEn")),
+    ("description for x", ("twitterPostEs", "twitterPostEn")),
+    ("descripción para facebook", ("facebookDescriptionEs", "facebookDescriptionEn")),
+    ("description for facebook", ("facebookDescriptionEs", "facebookDescriptionEn")),
+    ("lista de tags", ("tagsListEs", "tagsListEn")),
+    ("tags list", ("tagsListEs", "tagsListEn")),
+    ("teleprompter", ("teleprompterEs", "teleprompterEn")),
+    ("tags", ("tags", "tags")),
+    ("etiquetas", ("tags", "tags")),
+)
+
+ORIGINAL_SECTION_FIELDS = dict(ORIGINAL_SECTION_HEADERS)
+
+# A single anchored alternation, compiled once, so each line is classified in
+# one pass instead of being tested against every header in turn.
+ORIGINAL_HEADER_PATTERN = re.compile(
+    "|".join(re.escape(header) for header, _ in ORIGINAL_SECTION_HEADERS)
+)
+
+def match_original_header(line_lower):
+    """Returns the (Spanish, English) fields for a lowercased header line, or None."""
+    match = ORIGINAL_HEADER_PATTERN.match(line_lower)
+    if match:
+        return ORIGINAL_SECTION_FIELDS[match.group(0)]
+    return None
 
 def parse_original_format(text_block, data):
-    lines = text_block.strip().split('\n')
+    data.update(iter_original_format(io.StringIO(text_block)))
+    return data
+
+def iter_original_format(lines):
+    """Yields the (field, value) pairs of an original-format document, section by section."""
+    lines = iter(lines)
 
     # Extract title (first non-empty line)
-    for i, line in enumerate(lines):
+    for line in lines:
         if line.strip():
-            data["title"] = line.strip()
-            lines = lines[i+1:]
+            yield "title", line.strip()
             break
 
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        line_lower = line.lower()
+    for fields, body in split_original_sections(lines):
+        yield from original_section_fields(fields, body).items()
 
-        # Dictionary of sections and their fields
-        section_map = {
-            "descripción optimizada": ("videoDescriptionEs", "videoDescriptionEn"),
-            "description optimized": ("videoDescriptionEs", "videoDescriptionEn"),
-            "comentario para pinear": ("pinnedCommentEs", "pinnedCommentEn"),
-            "pinned comment": ("pinnedCommentEs", "pinnedCommentEn"),
-            "descripción simplificada": ("tiktokDescriptionEs", "tiktokDescriptionEn"),
-            "simplified description": ("tiktokDescriptionEs", "tiktokDescriptionEn"),
-            "descripción para x": ("twitterPostEs", "twitterPostEn"),
-            "description for x": ("twitterPostEs", "twitterPostEn"),
-            "descripción para facebook": ("facebookDescriptionEs", "facebookDescriptionEn"),
-            "description for facebook": ("facebookDescriptionEs", "facebookDescriptionEn"),
-            "lista de tags": ("tagsListEs", "tagsListEn"),
-            "tags list": ("tagsListEs", "tagsListEn"),
-            "teleprompter": ("teleprompterEs", "teleprompterEn"),
-            "tags": ("tags", "tags"),
-            "etiquetas": ("tags", "tags")
-        }
-
-        matched_section = None
-        for key in section_map.keys():
-            if line_lower.startswith(key):
-                matched_section = key
-                break
+def split_original_sections(lines):
+    """
+    Splits the lines after the title into original-format sections.
 
-        if matched_section:
-            # Detect language in header
-            campo_es, campo_en = section_map[matched_section]
-            is_es = any(x in line_lower for x in ["español", "(español"])
-            is_en = any(x in line_lower for x in ["inglés", "(inglés", "english", "(english"])
-            i += 1
-            content = []
-            current_lang = None
-            es_content = []
-            en_content = []
-
-            # Find the start of the next section
-            while i < len(lines) and not any(lines[i].strip().lower().startswith(k) for k in section_map.keys()):
-                line = lines[i].strip()
-                if not line:
-                    i += 1
-                    continue
-
-                # Detect language change
-                if line.lower().startswith("español:"):
-                    current_lang = "es"
-                    i += 1
-                    continue
-                elif line.lower().startswith("inglés:") or line.lower().startswith("ingles:"):
-                    current_lang = "en"
-                    i += 1
-                    continue
-
-                # Assign content according to current language
-                if current_lang == "es":
-                    es_content.append(line)
-                elif current_lang == "en":
-                    en_content.append(line)
-                else:
-                    # If no language detected, use heuristics
-                    if any(x in line for x in ["¿", "á", "é", "í", "ó", "ú", "ñ"]):
-                        es_content.append(line)
-                    else:
-                        en_content.append(line)
-                i += 1
-
-            # Process content according to section type
-            if campo_es == "tags" and campo_en == "tags":
-                # For specific tags section, take only the first 3
-                all_tags = []
-                # Process Spanish content
-                if es_content:
-                    es_tags = [tag.strip() for tag in ", ".join(es_content).split(",") if tag.strip()]
-                    all_tags.extend(es_tags)
-                # Process English content
-                if en_content:
-                    en_tags = [tag.strip() for tag in ", ".join(en_content).split(",") if tag.strip()]
-                    all_tags.extend(en_tags)
-                # Remove duplicates and take first 3
-                data["tags"] = list(dict.fromkeys(all_tags))[:3]
-            elif campo_es == "tagsListEs" or campo_en == "tagsListEn":
-                # For tags, join with commas and clean
-                if es_content:
-                    data["tagsListEs"] = ", ".join(es_content).strip()
-                if en_content:
-                    data["tagsListEn"] = ", ".join(en_content).strip()
-                # Also update tags field with first 3 unique tags
-                all_tags = []
-                if es_content:
-                    es_tags = [tag.strip() for tag in ", ".join(es_content).split(",") if tag.strip()]
-                    all_tags.extend(es_tags)
-                if en_content:
-                    en_tags = [tag.strip() for tag in ", ".join(en_content).split(",") if tag.strip()]
-                    all_tags.extend(en_tags)
-                data["tags"] = list(dict.fromkeys(all_tags))[:3]
-            else:
-                # For other sections, join with line breaks
-                if es_content:
-                    data[campo_es] = "\n".join(es_content)
-                if en_content:
-                    data[campo_en] = "\n".join(en_content)
-
-            # Truncate if it's a Twitter post
-            if campo_es == "twitterPostEs" and data[campo_es]:
-                data[campo_es] = truncate_twitter_post(data[campo_es])
-            if campo_en == "twitterPostEn" and data[campo_en]:
-                data[campo_en] = truncate_twitter_post(data[campo_en])
+    Lines before the first header are ignored; every header opens a section
+    that runs until the next header or the end of the text.
 
+    Yields:
+        tuple: ((Spanish field, English field), stripped body lines)
+    """
+    return timed_sections("split", _original_sections(lines))
+
+def _original_sections(lines):
+    fields = None
+    body = []
+
+    for line in lines:
+        line = line.strip()
+        header_fields = match_original_header(line.lower())
+        if header_fields:
+            if fields:
+                yield fields, body
+            fields = header_fields
+            body = []
+        elif fields and line:
+            body.append(line)
+
+    if fields:
+        yield fields, body
+
+# Lines that switch an original-format section to Spanish or English
+LANGUAGE_MARKERS = ("español:", "inglés:", "ingles:")
+
+def original_section_fields(fields, body):
+    """Returns the fields set by one original-format section."""
+    current_lang = None
+    es_content = []
+    en_content = []
+
+    # Lines before the first language marker are classified together
+    start = len(body)
+    for index, line in enumerate(body):
+        if line.lower().startswith(LANGUAGE_MARKERS):
+            start = index
+            break
+    unlabeled = body[:start]
+    with stage("language"):
+        languages = classify_lines(unlabeled)
+    for line, lang in zip(unlabeled, languages):
+        (es_content if lang == "es" else en_content).append(line)
+
+    for line in body[start:]:
+        line_lower = line.lower()
+
+        # Detect language change
+        if line_lower.startswith("español:"):
+            current_lang = "es"
             continue
+        elif line_lower.startswith("inglés:") or line_lower.startswith("ingles:"):
+            current_lang = "en"
+            continue
+
+        # Assign content according to current language
+        if current_lang == "es":
+            es_content.append(line)
         else:
-            i += 1
-    return data
+            en_content.append(line)
+
+    section_data = {}
+    save_original_section(section_data, fields, es_content, en_content)
+    return section_data
+
+def save_original_section(data, fields, es_content, en_content):
+    """Stores the collected lines of an original-format section in data."""
+    campo_es, campo_en = fields
+
+    # Process content according to section type
+    if campo_es == "tags" and campo_en == "tags":
+        # For specific tags section, take only the first 3
+        all_tags = []
+        # Process Spanish content
+        if es_content:
+            es_tags = [tag.strip() for tag in ", ".join(es_content).split(",") if tag.strip()]
+            all_tags.extend(es_tags)
+        # Process English content
+        if en_content:
+            en_tags = [tag.strip() for tag in ", ".join(en_content).split(",") if tag.strip()]
+            all_tags.extend(en_tags)
+        # Remove duplicates and take first 3
+        data["tags"] = list(dict.fromkeys(all_tags))[:3]
+    elif campo_es == "tagsListEs" or campo_en == "tagsListEn":
+        # For tags, join with commas and clean
+        if es_content:
+            data["tagsListEs"] = ", ".join(es_content).strip()
+        if en_content:
+            data["tagsListEn"] = ", ".join(en_content).strip()
+        # Also update tags field with first 3 unique tags
+        all_tags = []
+        if es_content:
+            es_tags = [tag.strip() for tag in ", ".join(es_content).split(",") if tag.strip()]
+            all_tags.extend(es_tags)
+        if en_content:
+            en_tags = [tag.strip() for tag in ", ".join(en_content).split(",") if tag.strip()]
+            all_tags.extend(en_tags)
+        data["tags"] = list(dict.fromkeys(all_tags))[:3]
+    else:
+        # For other sections, join with line breaks
+        if es_content:
+            data[campo_es] = "\n".join(es_content)
+        if en_content:
+            data[campo_en] = "\n".join(en_content)
+
+    # Truncate if it's a Twitter post
+    if campo_es == "twitterPostEs" and data.get(campo_es):
+        data[campo_es] = truncate_twitter_post(data[campo_es])
+    if campo_en == "twitterPostEn" and data.get(campo_en):
+        data[campo_en] = truncate_twitter_post(data[campo_en])
+
+SPANISH_TITLE_MARKERS = ("(español)", "spanish")
+ENGLISH_TITLE_MARKERS = ("(inglés)", "(english)")
+
+# Spanish is checked first; a title naming neither language is not stored
+BILINGUAL = (("es", SPANISH_TITLE_MARKERS), ("en", ENGLISH_TITLE_MARKERS))
+# English only when the title says so, Spanish otherwise
+SPANISH_UNLESS_ENGLISH = (("en", ENGLISH_TITLE_MARKERS),)
+
+def spanish_title_line(content):
+    """Returns the text of the last "Español:" line of a title section, or None."""
+    title = None
+    for line in content.split("\n"):
+        line = line.strip()
+        if line.startswith("Español:"):
+            title = line.replace("Español:", "").strip()
+    return title
+
+# Numbered-format sections, in precedence order: when a title contains the
+# patterns of several rows, the earliest row wins. Each row is
+# (title substrings, (Spanish, English) fields, language markers,
+#  default language, post-processor).
+# Language markers are (language, markers) pairs tried in order, falling back
+# to the default language; None stores both languages in one field.
+NUMBERED_SECTIONS = (
+    (("script de teleprompter", "teleprompter script"), ("teleprompterEs", "teleprompterEn"),
+     SPANISH_UNLESS_ENGLISH, "es", None),
+    (("título", "title"), ("title", "title"), None, None, spanish_title_line),
+    (("descripción para youtube", "youtube description"), ("videoDescriptionEs", "videoDescriptionEn"),
+     BILINGUAL, None, None),
+    (("lista de tags", "tags list"), ("tagsListEs", "tagsListEn"), BILINGUAL, None, None),
+    (("comentario pineado", "pinned comment"), ("pinnedCommentEs", "pinnedCommentEn"),
+     BILINGUAL, None, None),
+    (("descripción para tiktok", "tiktok description"), ("tiktokDescriptionEs", "tiktokDescriptionEn"),
+     BILINGUAL, None, None),
+    (("post para x", "x post"), ("twitterPostEs", "twitterPostEn"), BILINGUAL, None, truncate_twitter_post),
+    (("descripción para facebook", "facebook description"), ("facebookDescriptionEs", "facebookDescriptionEn"),
+     BILINGUAL, None, None),
+)
+
+# Headers of the earlier numbered layout, kept for process_numbered_section
+LEGACY_NUMBERED_SECTIONS = (
+    (("script de teleprompter", "teleprompter script"), ("teleprompterEs", "teleprompterEn"),
+     SPANISH_UNLESS_ENGLISH, "es", None),
+    (("título", "title"), ("title", "title"), None, None, spanish_title_line),
+    (("descripción para youtube", "youtube description"), ("videoDescriptionEs", "videoDescriptionEn"),
+     BILINGUAL, None, None),
+    (("tags para youtube", "youtube tags"), ("tagsListEs", "tagsListEn"), BILINGUAL, None, None),
+    (("comentario para pinear", "pinned comment"), ("pinnedCommentEs", "pinnedCommentEn"),
+     BILINGUAL, None, None),
+    (("descripción para tiktok", "tiktok description"), ("tiktokDescriptionEs", "tiktokDescriptionEn"),
+     BILINGUAL, None, None),
+    (("descripción para x", "x description"), ("twitterPostEs", "twitterPostEn"), BILINGUAL, None, None),
+    (("descripción para facebook", "facebook description"), ("facebookDescriptionEs", "facebookDescriptionEn"),
+     BILINGUAL, None, None),
+)
+
+def compile_section_registry(rows):
+    """
+    Compiles registry rows into a single matcher.
 
-def parse_numbered_format(text_block, data):
-    # Clean text and split into lines
-    lines = text_block.strip().split('\n')
+    Every row becomes one capturing group inside a lookahead, so a single
+    scan of the title finds all rows whose substrings occur in it, even
+    overlapping ones; the group number identifies the row.
 
-    # Initialize variables to store sections
-    current_section = None
-    section_content = {}
-    section_number = 0
-    i = 0  # Initialize the counter
+    Returns:
+        tuple: (compiled pattern, rows)
+    """
+    groups = "|".join(
+        "(" + "|".join(re.escape(pattern) for pattern in patterns) + ")"
+        for patterns, *_ in rows
+    )
+    return re.compile(f"(?=(?:{groups}))"), rows
+
+def match_section_row(matcher, section_title_lower):
+    """Returns the highest-precedence registry row matching a lowercased title, or None."""
+    pattern, rows = matcher
+    with stage("match"):
+        index = min((match.lastindex for match in pattern.finditer(section_title_lower)), default=None)
+    if index is None:
+        return None
+    return rows[index - 1]
+
+NUMBERED_MATCHER = compile_section_registry(NUMBERED_SECTIONS)
+LEGACY_NUMBERED_MATCHER = compile_section_registry(LEGACY_NUMBERED_SECTIONS)
 
-    while i < len(lines):
-        line = lines[i].strip()
-        line_lower = line.lower()
+def parse_numbered_format(text_block, data):
+    data.update(iter_numbered_format(io.StringIO(text_block)))
+    return data
 
-        # Check if it's a new numbered section
-        if re.match(r'^\d+\.\s', line):
-            # Save previous section if it exists
-            if current_section:
-                save_section_content(data, current_section, section_content)
-
-            # Extract section number and title
-            match = re.match(r'(\d+)\.\s*(.*)', line)
-            if match:
-                section_number = int(match.group(1))
-                section_title = match.group(2).strip()
-                current_section = section_title
-                section_content = {"es": "", "en": ""}
-            i += 1
-            continue
+def iter_numbered_format(lines):
+    """Yields the (field, value) pairs of a numbered-format document, section by section."""
+    tags_list_es = ""
 
-        # Capture content until the next numbered section
-        if current_section:
-            if not section_content.get("es") and not section_content.get("en"):
-                # If no content yet, add to the first available language
-                if "(español)" in current_section.lower() or "(spanish)" in current_section.lower():
-                    section_content["es"] = line
-                elif "(inglés)" in current_section.lower() or "(english)" in current_section.lower():
-                    section_content["en"] = line
-                else:
-                    # If no language specified, use heuristics
-                    if any(x in line for x in ["¿", "á", "é", "í", "ó", "ú", "ñ"]):
-                        section_content["es"] = line
-                    else:
-                        section_content["en"] = line
-            else:
-                # Append to existing content
-                if section_content.get("es"):
-                    section_content["es"] += "\n" + line
-                elif section_content.get("en"):
-                    section_content["en"] += "\n" + line
-        i += 1
-
-    # Process the last section
-    if current_section:
-        save_section_content(data, current_section, section_content)
+    for section_title, body in split_numbered_sections(lines):
+        section_data = numbered_section_fields(section_title, body)
+        tags_list_es = section_data.get("tagsListEs", tags_list_es)
+        yield from section_data.items()
 
-    # Derive tags from tagsListEs if it exists
-    if data.get("tagsListEs"):
-        # Try to find a comma separator
-        if "," in data["tagsListEs"]:
-            # Limit to only the first 3 tags
-            all_tags = [tag.strip() for tag in data["tagsListEs"].split(",")]
-            data["tags"] = all_tags[:3]  # Take only the first 3
-        else:
-            # If no commas, use the full text as a single tag
-            data["tags"] = [data["tagsListEs"].strip()][:1]  # Maximum 1 tag if no commas
+    tags = numbered_tags(tags_list_es)
+    if tags is not None:
+        yield "tags", tags
 
-    return data
+def split_numbered_sections(lines):
+    """
+    Splits lines into numbered sections.
 
-def process_numbered_section(data, section_title, content):
-    """Process numbered sections of the new format"""
-    section_title_lower = section_title.lower()
+    Yields:
+        tuple: (section title, stripped body lines)
+    """
+    return timed_sections("split", _numbered_sections(lines))
 
-    # Teleprompter Script (English)
-    if "script de teleprompter" in section_title_lower or "teleprompter script" in section_title_lower:
-        if "(inglés)" in section_title_lower or "(english)" in section_title_lower:
-            data["teleprompterEn"] = content.strip()
-        else:
-            data["teleprompterEs"] = content.strip()
-
-    # Attractive Title (SEO)
-    elif "título" in section_title_lower or "title" in section_title_lower:
-        # Look for specific Spanish and English lines
-        for line in content.split('\n'):
-            line = line.strip()
-            if line.startswith("Español:"):
-                data["title"] = line.replace("Español:", "").strip()
-            elif line.startswith("Inglés:"):
-                # We could also store the English title if needed
-                pass
-
-    # YouTube Description
-    elif "descripción para youtube" in section_title_lower or "youtube description" in section_title_lower:
-        if "(español)" in section_title_lower or "spanish" in section_title_lower:
-            data["videoDescriptionEs"] = content.strip()
-        elif "(inglés)" in section_title_lower or "(english)" in section_title_lower:
-            data["videoDescriptionEn"] = content.strip()
+def _numbered_sections(lines):
+    current_section = None
+    body = []
 
-    # Tags para YouTube
-    elif "tags para youtube" in section_title_lower or "youtube tags" in section_title_lower:
-        if "(español)" in section_title_lower or "spanish" in section_title_lower:
-            data["tagsListEs"] = content.strip()
-        elif "(inglés)" in section_title_lower or "(english)" in section_title_lower:
-            data["tagsListEn"] = content.strip()
+    for line in lines:
+        line = line.strip()
 
-    # Comentario para Pinear
-    elif "comentario para pinear" in section_title_lower or "pinned comment" in section_title_lower:
-        if "(español)" in section_title_lower or "spanish" in section_title_lower:
-            data["pinnedCommentEs"] = content.strip()
-        elif "(inglés)" in section_title_lower or "(english)" in section_title_lower:
-            data["pinnedCommentEn"] = content.strip()
+        # Check if it's a new numbered section
+        if NUMBERED_SECTION_PATTERN.match(line):
+            # Close previous section if it exists
+            if current_section:
+                yield current_section, body
 
-    # Descripción para TikTok
-    elif "descripción para tiktok" in section_title_lower or "tiktok description" in section_title_lower:
-        if "(español)" in section_title_lower or "spanish" in section_title_lower:
-            data["tiktokDescriptionEs"] = content.strip()
-        elif "(inglés)" in section_title_lower or "(english)" in section_title_lower:
-            data["tiktokDescriptionEn"] = content.strip()
+            # Extract section title
+            current_section = line.split(".", 1)[1].strip()
+            body = []
+        elif current_section:
+            # Capture content until the next numbered section
+            body.append(line)
 
-    # Descripción para X/Twitter
-    elif "descripción para x" in section_title_lower or "x description" in section_title_lower:
-        if "(español)" in section_title_lower or "spanish" in section_title_lower:
-            data["twitterPostEs"] = content.strip()
+    # Close the last section
+    if current_section:
+        yield current_section, body
+
+def numbered_section_fields(section_title, body):
+    """Returns the fields set by one numbered section."""
+    # The whole body goes to a single language, decided by the section title
+    # or, failing that, by the first non-empty line. Leading blank lines are
+    # skipped. save_section_content joins the lines once, so long sections
+    # are built in linear time.
+    section_content = {"es": [], "en": []}
+    for start, line in enumerate(body):
+        if not line:
+            continue
+        section_title_lower = section_title.lower()
+        if "(español)" in section_title_lower or "(spanish)" in section_title_lower:
+            current_lang = "es"
         elif "(inglés)" in section_title_lower or "(english)" in section_title_lower:
-            data["twitterPostEn"] = content.strip()
+            current_lang = "en"
+        else:
+            # If no language specified, use heuristics
+            with stage("language"):
+                current_lang = line_language(line)
+        section_content[current_lang] = body[start:]
+        break
+
+    section_data = {}
+    save_section_content(section_data, section_title, section_content)
+    return section_data
+
+def numbered_tags(tags_list_es):
+    """Derives the tags field from a numbered document's tagsListEs, or None if it is empty."""
+    if not tags_list_es:
+        return None
+    with stage("tags"):
+        # Try to find a comma separator
+        if "," in tags_list_es:
+            # Limit to only the first 3 tags
+            all_tags = [tag.strip() for tag in tags_list_es.split(",")]
+            return all_tags[:3]  # Take only the first 3
+        # If no commas, use the full text as a single tag
+        return [tags_list_es.strip()][:1]  # Maximum 1 tag if no commas
 
-    # Descripción para Facebook
-    elif "descripción para facebook" in section_title_lower or "facebook description" in section_title_lower:
-        if "(español)" in section_title_lower or "spanish" in section_title_lower:
-            data["facebookDescriptionEs"] = content.strip()
-        elif "(inglés)" in section_title_lower or "(english)" in section_title_lower:
-            data["facebookDescriptionEn"] = content.strip()
+def process_numbered_section(data, section_title, content):
+    """Process numbered sections of the new format"""
+    dispatch_section(LEGACY_NUMBERED_MATCHER, data, section_title, {"es": content, "en": content})
 
 def is_new_section(line):
     """Determines if a line marks the start of a new section"""
@@ -318,87 +494,131 @@ def is_new_section(line):
 
     return any(line.startswith(marker) or line == marker for marker in section_markers)
 
-def extract_tags(text):
-    """Extracts hashtags and keywords from text"""
-    # First extract hashtags
-    hashtags = re.findall(r'#\w+', text)
-    
-    # Then extract keywords (words that are not hashtags)
-    words = text.split()
-    keywords = [word for word in words if not word.startswith('#') and len(word) > 2]
-    
-    # Combine both lists and remove duplicates
-    all_tags = list(set(hashtags + keywords))
-    
-    # Return first 20 tags to avoid length issues
-    return all_tags[:20]
+# A hashtag, or a keyword: a word of at least 3 characters starting with a letter
+TAG_TOKEN_PATTERN = re.compile(r"#\w+|[^\W\d_]\w{2,}")
 
-def save_section_content(data, section_title, section_content):
-    section_title_lower = section_title.lower()
+# Below this many candidates per requested tag, sorting them all is faster
+# than keeping a heap of the best
+HEAP_MIN_RATIO = 8
 
-    # Teleprompter Script
-    if "script de teleprompter" in section_title_lower or "teleprompter script" in section_title_lower:
-        if "(inglés)" in section_title_lower or "(english)" in section_title_lower:
-            data["teleprompterEn"] = section_content.get("en", "").strip()
-        else:
-            data["teleprompterEs"] = section_content.get("es", "").strip()
-
-    # Attractive Title (SEO)
-    elif "título" in section_title_lower or "title" in section_title_lower:
-        # Look for specific Spanish and English lines
-        content = section_content.get("es", "") + "\n" + section_content.get("en", "")
-        for line in content.split('\n'):
-            line = line.strip()
-            if line.startswith("Español:"):
-                data["title"] = line.replace("Español:", "").strip()
-            elif line.startswith("Inglés:"):
-                # We could also store the English title if needed
-                pass
-
-    # YouTube Description
-    elif "descripción para youtube" in section_title_lower or "youtube description" in section_title_lower:
-        if "(español)" in section_title_lower or "spanish" in section_title_lower:
-            data["videoDescriptionEs"] = section_content.get("es", "").strip()
-        elif "(inglés)" in section_title_lower or "(english)" in section_title_lower:
-            data["videoDescriptionEn"] = section_content.get("en", "").strip()
+def extract_tags(text, limit=20, stop_words=STOP_WORDS):
+    """
+    Extracts hashtags and keywords from text, most relevant first.
 
-    # Tags List
-    elif "lista de tags" in section_title_lower or "tags list" in section_title_lower:
-        if "(español)" in section_title_lower or "spanish" in section_title_lower:
-            data["tagsListEs"] = section_content.get("es", "").strip()
-        elif "(inglés)" in section_title_lower or "(english)" in section_title_lower:
-            data["tagsListEn"] = section_content.get("en", "").strip()
+    Hashtags rank before keywords, then more frequent before less frequent,
+    then earlier first occurrence before later, so the result depends only
+    on the text. Tokens are counted case-insensitively; hashtags keep the
+    spelling of their first occurrence and keywords are lowercased.
 
-    # Pinned Comment
-    elif "comentario pineado" in section_title_lower or "pinned comment" in section_title_lower:
-        if "(español)" in section_title_lower or "spanish" in section_title_lower:
-            data["pinnedCommentEs"] = section_content.get("es", "").strip()
-        elif "(inglés)" in section_title_lower or "(english)" in section_title_lower:
-            data["pinnedCommentEn"] = section_content.get("en", "").strip()
+    Args:
+        text (str): Text to extract from
+        limit (int): Maximum number of tags, or None for all of them
+        stop_words: Lowercase words never returned as keywords, by default
+            the Spanish and English function words; None keeps every word
 
-    # TikTok Description
-    elif "descripción para tiktok" in section_title_lower or "tiktok description" in section_title_lower:
-        if "(español)" in section_title_lower or "spanish" in section_title_lower:
-            data["tiktokDescriptionEs"] = section_content.get("es", "").strip()
-        elif "(inglés)" in section_title_lower or "(english)" in section_title_lower:
-            data["tiktokDescriptionEn"] = section_content.get("en", "").strip()
+    Returns:
+        list: The tags
+    """
+    counts = Counter()
+    # Spelling of each token's first occurrence, in order of first occurrence
+    first = {}
+    for token in TAG_TOKEN_PATTERN.findall(text):
+        key = token.lower()
+        counts[key] += 1
+        first.setdefault(key, token)
+    entries = [
+        (key[0] != "#", -counts[key], position, key)
+        for position, key in enumerate(first)
+        if not (stop_words and key in stop_words)
+    ]
+    if limit is None or len(entries) <= limit * HEAP_MIN_RATIO:
+        ranked = sorted(entries)[:limit]
+    else:
+        # Only the top limit entries are ever ordered
+        ranked = heapq.nsmallest(limit, entries)
+    # Hashtags are returned as first written
+    return [first[key] if key[0] == "#" else key for *_, key in ranked]
 
-    # X/Twitter Post
-    elif "post para x" in section_title_lower or "x post" in section_title_lower:
-        if "(español)" in section_title_lower or "spanish" in section_title_lower:
-            data["twitterPostEs"] = truncate_twitter_post(section_content.get("es", "").strip())
-        elif "(inglés)" in section_title_lower or "(english)" in section_title_lower:
-            data["twitterPostEn"] = truncate_twitter_post(section_content.get("en", "").strip())
+# Fields tags are derived from when a document has no tags of its own
+TAG_SOURCE_FIELDS = ("videoDescriptionEs", "videoDescriptionEn")
 
-    # Facebook Description
-    elif "descripción para facebook" in section_title_lower or "facebook description" in section_title_lower:
-        if "(español)" in section_title_lower or "spanish" in section_title_lower:
-            data["facebookDescriptionEs"] = section_content.get("es", "").strip()
-        elif "(inglés)" in section_title_lower or "(english)" in section_title_lower:
-            data["facebookDescriptionEn"] = section_content.get("en", "").strip()
+# Derived tags are capped like the tags taken from a tags list
+DERIVED_TAG_LIMIT = 3
 
-def generate_curl_command(parsed_data, api_url):
-    payload = {
+def description_tags(data, limit=DERIVED_TAG_LIMIT):
+    """
+    Derives tags from the video descriptions of parsed data.
+
+    Returns:
+        list: Up to limit tags from extract_tags, without the "#" of
+        hashtags and without case-insensitive duplicates
+    """
+    text = "\n".join(data.get(field) or "" for field in TAG_SOURCE_FIELDS)
+    # A tag can rank at most twice, as a hashtag and as a keyword, so twice
+    # limit candidates always leave limit distinct tags when the text has them
+    candidates = None if limit is None else 2 * limit
+    tags = {}
+    with stage("tags"):
+        for tag in extract_tags(text, limit=candidates):
+            tag = tag.lstrip("#")
+            tags.setdefault(tag.lower(), tag)
+            if len(tags) == limit:
+                break
+    return list(tags.values())
+
+def save_section_content(data, section_title, section_content):
+    """
+    Stores a finished numbered-format section in data.
+
+    section_content maps "es"/"en" to the list of lines collected for each
+    language; the lines are joined here, once per section.
+    """
+    section_content = {
+        lang: "\n".join(section_content.get(lang, ()))
+        for lang in ("es", "en")
+    }
+    dispatch_section(NUMBERED_MATCHER, data, section_title, section_content)
+
+def dispatch_section(matcher, data, section_title, section_content):
+    """
+    Stores a numbered section's content in the field its registry row names.
+
+    Args:
+        matcher: (pattern, rows) pair built by compile_section_registry
+        data (dict): Parsed data to update
+        section_title (str): The section title, without its number
+        section_content (dict): Joined content for "es" and "en"
+    """
+    section_title_lower = section_title.lower()
+    row = match_section_row(matcher, section_title_lower)
+    if row is None:
+        return
+    _, fields, languages, default, post_process = row
+
+    if languages is None:
+        # Both languages feed a single field
+        value = post_process(section_content["es"] + "\n" + section_content["en"])
+        if value is not None:
+            data[fields[0]] = value
+        return
+
+    lang = default
+    for candidate, markers in languages:
+        if any(marker in section_title_lower for marker in markers):
+            lang = candidate
+            break
+    if lang is None:
+        return
+    value = section_content[lang].strip()
+    if post_process:
+        value = post_process(value)
+    data[fields[0] if lang == "es" else fields[1]] = value
+
+def build_create_payload(parsed_data):
+    """Builds the JSON body for creating a new content through POST /api/contents."""
+    if isinstance(parsed_data, ParsedContent):
+        return parsed_data.to_payload("create")
+    return {
         "title": parsed_data.get("title", "Unspecified Title"),
         "publishedEs": False,
         "publishedEn": False,
@@ -423,31 +643,11 @@ def generate_curl_command(parsed_data, api_url):
         "tags": parsed_data.get("tags", [])
     }
 
-    # First generate JSON without escaping quotes
-    json_payload_str = json.dumps(payload, indent=2, ensure_ascii=False)
-
-    # Then escape all single quotes in the final JSON
-    # The bash escape for a single quote is: ' -> '\''
-    escaped_json = json_payload_str.replace("'", "'\\''")
-
-    # The curl command with consistent formatting
-    curl_command = f"curl -X POST {api_url} \\\n  -H \"Content-Type: application/json\" \\\n  -d '{escaped_json}'"
-
-    return curl_command
-
-def generate_update_curl_command(parsed_data, api_url, content_id):
-    """
-    Generates a curl command to update an existing content.
-
-    Args:
-        parsed_data (dict): Parsed document data
-        api_url (str): Base API URL
-        content_id (str): ID of the content to update
-
-    Returns:
-        str: Curl command to update the entry
-    """
-    payload = {
+def build_update_payload(parsed_data):
+    """Builds the JSON body for updating a content through PUT /api/contents/:id."""
+    if isinstance(parsed_data, ParsedContent):
+        return parsed_data.to_payload("update")
+    return {
         "title": parsed_data.get("title", "Unspecified Title"),
         "teleprompterEs": parsed_data.get("teleprompterEs", ""),
         "teleprompterEn": parsed_data.get("teleprompterEn", ""),
@@ -466,17 +666,60 @@ def generate_update_curl_command(parsed_data, api_url, content_id):
         "tags": parsed_data.get("tags", [])
     }
 
-    # Generate JSON without escaping quotes
-    json_payload_str = json.dumps(payload, indent=2, ensure_ascii=False)
+def build_patch_payload(parsed_data, current):
+    """
+    Builds a sparse JSON body for PATCH /api/contents/:id.
+
+    Holds only the fields of the update payload that the document has (not
+    empty) and whose value differs from current, the content as the server
+    has it, so unchanged long texts are not sent again and fields missing
+    from the document are left alone. An empty dict means nothing changed.
+    """
+    return {
+        field: value for field, value in build_update_payload(parsed_data).items()
+        if parsed_data.get(field) and value != current.get(field)
+    }
+
+def generate_curl_command(parsed_data, api_url):
+    """
+    Generates a curl command to create a new content.
+
+    The JSON body is indented and its single quotes escaped for the shell
+    (' becomes '\\'').
+    """
+    return curl_command("POST", api_url, build_create_payload(parsed_data))
+
+def generate_update_curl_command(parsed_data, api_url, content_id):
+    """
+    Generates a curl command to update an existing content.
 
-    # Escape all single quotes in the final JSON
-    escaped_json = json_payload_str.replace("'", "'\\''")
+    Args:
+        parsed_data (dict): Parsed document data
+        api_url (str): Base API URL
+        content_id (str): ID of the content to update
 
-    # The curl command with consistent formatting using PUT for update
-    update_url = f"{api_url}/{content_id}"
-    curl_command = f"curl -X PUT {update_url} \\\n  -H \"Content-Type: application/json\" \\\n  -d '{escaped_json}'"
+    Returns:
+        str: Curl command to update the entry
+    """
+    return curl_command("PUT", f"{api_url}/{content_id}", build_update_payload(parsed_data))
 
-    return curl_command
+def generate_patch_curl_command(parsed_data, api_url, content_id, current):
+    """
+    Generates a curl command sending only the changed fields of a content.
+
+    Args:
+        parsed_data (dict): Parsed document data
+        api_url (str): Base API URL
+        content_id (str): ID of the content to update
+        current (dict): The content as the server has it
+
+    Returns:
+        str: Curl command for PATCH /api/contents/:id, or None if no field changed
+    """
+    payload = build_patch_payload(parsed_data, current)
+    if not payload:
+        return None
+    return curl_command("PATCH", f"{api_url}/{content_id}", payload)
 
 # --- Main execution ---
 if __name__ == "__main__":
@@ -273,9 +273,22 @@ const contentSchema = new mongoose.Schema({
     createdAt: {
         type: Date,
         default: Date.now
+    },
+    updatedAt: {
+        type: Date,
+        default: Date.now
     }
 });
 
+// Update the 'updatedAt' field on save, so clients can sync only what changed
+contentSchema.pre('save', function(next) {
+    this.updatedAt = Date.now();
+    next();
+});
+
+// Index for incremental sync (GET /api/contents?updatedSince=...)
+contentSchema.index({ updatedAt: 1 });
+
 // Indexes for search
 contentSchema.index({
     title: 'text',
@@ -21,6 +21,15 @@ router.get('/', async (req, res) => {
             filter.publishedEn = false;
         }
 
+        // Solo los contenidos modificados desde una fecha (sincronización incremental)
+        if (req.query.updatedSince) {
+            const updatedSince = new Date(req.query.updatedSince);
+            if (isNaN(updatedSince.getTime())) {
+                return res.status(400).json({ message: 'Invalid updatedSince date' });
+            }
+            filter.updatedAt = { $gte: updatedSince };
+        }
+
         const contents = await Content.find(filter).sort({ createdAt: -1 });
 
         // Asegurarse de que todos los contenidos tengan statusEs y statusEn
@@ -612,7 +621,7 @@ router.put('/:id', async (req, res) => {
     }
 });
 
-// Update publication status
+// Partial update: publication status and/or the document text fields
 router.patch('/:id', async (req, res) => {
     try {
         // Validar ID
@@ -629,6 +638,13 @@ router.patch('/:id', async (req, res) => {
 
         // Lista de campos permitidos para actualización parcial
         const allowedFields = ['publishedEs', 'publishedEn', 'publishedDateEs', 'publishedDateEn', 'statusEs', 'statusEn'];
+        // Campos de texto del documento: el parser solo envía los que cambiaron
+        const textFields = [
+            'teleprompterEs', 'teleprompterEn', 'videoDescriptionEs', 'videoDescriptionEn',
+            'tagsListEs', 'tagsListEn', 'pinnedCommentEs', 'pinnedCommentEn',
+            'tiktokDescriptionEs', 'tiktokDescriptionEn', 'twitterPostEs', 'twitterPostEn',
+            'facebookDescriptionEs', 'facebookDescriptionEn'
+        ];
         const updateData = {};
 
         // Log de datos recibidos para depuración
@@ -690,13 +706,31 @@ router.patch('/:id', async (req, res) => {
             }
         }
 
+        // Sanitizar los campos de texto igual que en PUT
+        if (req.body.title) {
+            updateData.title = String(req.body.title).trim();
+        }
+
+        for (const field of textFields) {
+            if (req.body[field] !== undefined) {
+                updateData[field] = String(req.body[field]);
+            }
+        }
+
+        if (req.body.tags !== undefined) {
+            const rawTags = Array.isArray(req.body.tags)
+                ? req.body.tags
+                : (typeof req.body.tags === 'string' ? req.body.tags.split(',') : []);
+            updateData.tags = rawTags.map(tag => String(tag).trim()).filter(tag => tag.length > 0);
+        }
+
         // Si no hay campos válidos para actualizar, retornar error
         if (Object.keys(updateData).length === 0) {
             logger.error(`No valid fields to update. ID: ${req.params.id}, Body: ${JSON.stringify(req.body)}`);
             return res.status(400).json({
                 message: 'No valid fields to update',
                 received: req.body,
-                allowed: allowedFields
+                allowed: [...allowedFields, 'title', ...textFields, 'tags']
             });
         }
 
@@ -719,9 +753,9 @@ router.patch('/:id', async (req, res) => {
 
         res.json(content);
     } catch (error) {
-        logger.error(`Error updating publication status. ID: ${req.params.id}`, error);
+        logger.error(`Error applying partial update. ID: ${req.params.id}`, error);
         res.status(400).json({
-            message: 'Error updating status',
+            message: 'Error updating content',
             error: error.message,
             id: req.params.id
         });